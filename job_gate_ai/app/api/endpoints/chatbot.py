@@ -1,20 +1,94 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse, HTMLResponse
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, ConfigDict
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set
+from pydantic import BaseModel, ConfigDict, ValidationError
+import asyncio
+import copy
 import uuid
+import hashlib
 import json
 import logging
 import os
+import random
 import re
 from datetime import datetime
 
 from app.services.llm_service import LLMService
 from app.services.database_service import DatabaseService
 from app.services.document_generator import DocumentGenerator
+from app.services.llm_ledger import set_llm_caller
+from app.services.chat_classifier import classifier_stats, classify_message, extraction_disagrees
+from app.services.session_cache import WriteBackCache
+from app.services.translation_memory import join_segments, split_segments
+from app.core.security import verify_websocket_auth
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
+# Included without the router-level HTTP auth dependency: the WebSocket authenticates once at connect.
+ws_router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
+
+# "single": one JSON completion per turn returns updates, flags, intent and the reply.
+# "multi": separate extraction, rewrite and reply completions.
+TURN_MODE = os.getenv("CHATBOT_TURN_MODE", "single").strip().lower()
+# "inline": rewrite changed sections during the turn. "background": after the reply is sent.
+# Either way, pending rewrites are applied before export.
+REWRITE_MODE = os.getenv("CHATBOT_REWRITE_MODE", "inline").strip().lower()
+# Raw messages sent with each prompt; older ones live in the rolling conversation summary, which
+# is refreshed once this many further messages have left the raw window.
+RAW_PROMPT_MESSAGES = int(os.getenv("CHATBOT_RAW_MESSAGES", "6"))
+SUMMARY_EVERY_MESSAGES = int(os.getenv("CHATBOT_SUMMARY_EVERY", "8"))
+DIGEST_TEXT_CHARS = 240
+SUMMARY_MAX_LINES = 12
+# Share of rule-handled turns that are also sent to the LLM extractor to measure disagreement.
+CLASSIFIER_AUDIT_RATE = float(os.getenv("CHAT_CLASSIFIER_AUDIT_RATE", "0.05"))
+
+STEP_QUESTIONS = {
+    "english": {
+        "personal_info": "What is your full name?",
+        "personal_info_contact": "What email address should employers use to contact you?",
+        "experience": "Tell me about your most recent job: title, company, dates and what you achieved.",
+        "education": "What is your highest degree, and where and when did you study?",
+        "skills": "Which key skills should your CV highlight? A comma-separated list is fine.",
+        "summary": "In two or three sentences, how would you describe yourself professionally?",
+        "review": "Your CV has everything it needs. Would you like to export it as PDF or DOCX?",
+    },
+    "arabic": {
+        "personal_info": "ما اسمك الكامل؟",
+        "personal_info_contact": "ما البريد الإلكتروني الذي يمكن لأصحاب العمل التواصل معك عليه؟",
+        "experience": "حدثني عن آخر وظيفة لك: المسمى الوظيفي والشركة والمدة وأهم إنجازاتك.",
+        "education": "ما أعلى مؤهل دراسي لديك، وأين ومتى درست؟",
+        "skills": "ما أهم المهارات التي تريد إبرازها في سيرتك الذاتية؟ يمكنك كتابتها مفصولة بفواصل.",
+        "summary": "في جملتين أو ثلاث، كيف تصف نفسك مهنيًا؟",
+        "review": "سيرتك الذاتية مكتملة. هل تريد تصديرها بصيغة PDF أو DOCX؟",
+    },
+}
+
+EXTRACTION_SCHEMA = """{
+  "updates": {
+    "personal_info": {
+      "full_name": "", "email": "", "phone": "", "location": "",
+      "linkedin": "", "github": "", "title": ""
+    },
+    "experience": [{"position":"", "company":"", "duration":"", "description":"", "achievements":[]}],
+    "education": [{"degree":"", "institution":"", "duration":"", "description":""}],
+    "skills": [],
+    "projects": [],
+    "certifications": [],
+    "languages": [],
+    "summary": ""
+  },
+  "flags": {
+    "no_experience": false,
+    "no_certifications": false,
+    "no_projects": false,
+    "no_education": false
+  },
+  "intent": {
+    "complete": false,
+    "request_export": false,
+    "output_language": null
+  }
+}"""
 
 db = DatabaseService()
 document_generator = DocumentGenerator()
@@ -160,14 +234,115 @@ def _is_cv_complete(cv_data: Dict[str, Any], skip_flags: Dict[str, bool]) -> boo
     return has_name and has_email and has_skills and (has_experience or has_education)
 
 
+def _clip(value: Any, limit: int = DIGEST_TEXT_CHARS) -> str:
+    text = " ".join(str(value or "").split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _cv_digest(cv_data: Dict[str, Any]) -> str:
+    """Compact plain-text view of the CV for prompts: filled fields only, long text clipped, no ``_meta``."""
+    personal = {key: value for key, value in (cv_data.get("personal_info") or {}).items() if value}
+    lines = ["Personal: " + ("; ".join(f"{key}: {value}" for key, value in personal.items()) or "(empty)")]
+
+    for label, key, fields in (
+        ("Experience", "experience", ("position", "company", "duration")),
+        ("Education", "education", ("degree", "institution", "duration")),
+        ("Projects", "projects", ("name", "title", "technologies")),
+    ):
+        entries = [entry for entry in cv_data.get(key) or [] if entry]
+        if not entries:
+            lines.append(f"{label}: (none)")
+            continue
+        lines.append(f"{label}:")
+        for entry in entries:
+            if not isinstance(entry, dict):
+                lines.append(f"- {_clip(entry)}")
+                continue
+            head = " | ".join(_clip(entry.get(field), 80) for field in fields if entry.get(field))
+            description = _clip(entry.get("description"))
+            lines.append(f"- {head}" + (f": {description}" if description else ""))
+
+    for label, key in (("Skills", "skills"), ("Certifications", "certifications"), ("Languages", "languages")):
+        items = [_clip(item, 60) for item in cv_data.get(key) or [] if item]
+        lines.append(f"{label}: " + (", ".join(items) if items else "(none)"))
+    lines.append("Summary: " + (_clip(cv_data.get("summary")) or "(none)"))
+    return "\n".join(lines)
+
+
+def _conversation_summary(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    stored = _get_meta(cv_data).get("conversation_summary")
+    if not isinstance(stored, dict):
+        return {"text": "", "through": 0}
+    return {"text": str(stored.get("text") or ""), "through": int(stored.get("through") or 0)}
+
+
+def _summarize_with_llm(llm: LLMService, previous: str, messages: List[Dict[str, Any]]) -> str:
+    transcript = "\n".join(f"{msg['role']}: {_clip(msg['content'], 400)}" for msg in messages)
+    prompt = f"""
+Update the running summary of a CV-building conversation.
+Keep it under 120 words. Keep the user's preferences, corrections, goals and any open questions.
+Leave out details that are plain CV fields (names, contacts, jobs, skills); those are stored separately.
+
+Current summary:
+{previous or "(none)"}
+
+New messages:
+{transcript}
+"""
+    try:
+        response = llm.client.chat.completions.create(
+            model=llm.model,
+            messages=[
+                {"role": "system", "content": "You maintain short conversation summaries. Return plain text."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            max_tokens=250,
+        )
+        return (response.choices[0].message.content or "").strip()
+    except Exception as e:
+        logger.warning(f"Conversation summary failed: {e}")
+        return ""
+
+
+def _update_conversation_summary(llm: LLMService, session: Dict[str, Any]) -> None:
+    """Fold messages that left the raw prompt window into ``_meta.conversation_summary``.
+
+    Runs only every ``SUMMARY_EVERY_MESSAGES`` messages, so most turns pay nothing. Without an LLM
+    the summary keeps the latest user statements instead.
+    """
+    cv_data = session.get("cv_data", {})
+    conversation = session.get("conversation") or []
+    offset = session.get("_conversation_offset", 0)
+    summary = _conversation_summary(cv_data)
+    fold_until = offset + len(conversation) - RAW_PROMPT_MESSAGES
+    if fold_until - summary["through"] < SUMMARY_EVERY_MESSAGES:
+        return
+
+    folded = conversation[max(0, summary["through"] - offset):fold_until - offset]
+    text = _summarize_with_llm(llm, summary["text"], folded) if llm.is_available() else ""
+    if not text:
+        lines = [line for line in summary["text"].splitlines() if line.strip()]
+        lines += [f"User said: {_clip(msg['content'], 160)}" for msg in folded if msg.get("role") == "user"]
+        text = "\n".join(lines[-SUMMARY_MAX_LINES:])
+    _get_meta(cv_data)["conversation_summary"] = {"text": text, "through": fold_until}
+
+
+def _prompt_messages(system_prompt: str, conversation: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": system_prompt}]
+    for msg in conversation[-RAW_PROMPT_MESSAGES:]:
+        messages.append({"role": msg["role"], "content": msg["content"]})
+    return messages
+
+
 def _build_system_prompt(
     cv_data: Dict[str, Any],
     current_step: str,
     language: str,
     job_requirements: Optional[str],
     skip_flags: Dict[str, bool],
+    conversation_summary: str = "",
 ) -> str:
-    cv_json_str = json.dumps(cv_data, ensure_ascii=False, indent=2)
     skip_json = json.dumps(skip_flags, ensure_ascii=False)
     requirements_text = job_requirements or ""
 
@@ -176,7 +351,10 @@ Respond in {language}. Ask only ONE clear question at a time.
 Be encouraging and focus on achievements with numbers.
 
 Current CV data:
-{cv_json_str}
+{_cv_digest(cv_data)}
+
+Earlier in this conversation:
+{conversation_summary or "(nothing beyond the recent messages)"}
 
 Skip flags: {skip_json}
 Current focus: {current_step}
@@ -212,24 +390,51 @@ def _normalize_rewrite_list(existing: Any, length: int) -> List[Optional[Dict[st
     return items[:length]
 
 
-def _rewrite_cv_sections(llm: LLMService, cv_data: Dict[str, Any]) -> None:
-    if not llm.is_available():
-        return
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _rewrite_hashes(rewrite_meta: Dict[str, Any], experience_len: int, projects_len: int) -> Dict[str, Any]:
+    """Hash of each section's text as of its last rewrite, kept in ``_meta.rewrite.hashes``."""
+    hashes = rewrite_meta.get("hashes") if isinstance(rewrite_meta.get("hashes"), dict) else {}
+    hashes["experience"] = _normalize_rewrite_list(hashes.get("experience"), experience_len)
+    hashes["projects"] = _normalize_rewrite_list(hashes.get("projects"), projects_len)
+    rewrite_meta["hashes"] = hashes
+    return hashes
+
 
+def _dirty_sections(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary and descriptions that are new or edited since they were last rewritten.
+
+    Returns ``{"summary": str, "experience": {index: text}, "projects": {index: text}}`` with only
+    the dirty items filled in.
+    """
+    rewrite_meta = (cv_data.get("_meta") or {}).get("rewrite") or {}
+    hashes = rewrite_meta.get("hashes") if isinstance(rewrite_meta.get("hashes"), dict) else {}
     summary_text = (cv_data.get("summary") or "").strip()
-    experience = cv_data.get("experience", []) or []
-    projects = cv_data.get("projects", []) or []
+    dirty: Dict[str, Any] = {
+        "summary": summary_text if summary_text and _text_hash(summary_text) != hashes.get("summary") else "",
+    }
+    for key in ["experience", "projects"]:
+        stored = hashes.get(key) if isinstance(hashes.get(key), list) else []
+        dirty[key] = {}
+        for idx, item in enumerate(cv_data.get(key, []) or []):
+            text = str(item.get("description", "") or "").strip() if isinstance(item, dict) else ""
+            if text and (idx >= len(stored) or stored[idx] != _text_hash(text)):
+                dirty[key][idx] = text
+    return dirty
 
-    experience_texts = [str(item.get("description", "") or "").strip() for item in experience]
-    project_texts = [str(item.get("description", "") or "").strip() for item in projects]
 
-    if not summary_text and not any(experience_texts) and not any(project_texts):
-        return
+def _has_dirty_sections(dirty: Dict[str, Any]) -> bool:
+    return bool(dirty["summary"] or dirty["experience"] or dirty["projects"])
 
+
+def _request_rewrites(llm: LLMService, dirty: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rewrite only the dirty items; returns the improved text keyed like ``dirty``, or None on failure."""
     payload = {
-        "summary": summary_text,
-        "experience": experience_texts,
-        "projects": project_texts,
+        "summary": dirty["summary"],
+        "experience": {str(idx): text for idx, text in dirty["experience"].items()},
+        "projects": {str(idx): text for idx, text in dirty["projects"].items()},
     }
 
     prompt = f"""
@@ -237,7 +442,7 @@ Rewrite the following CV content in English.
 Keep facts, names, titles, companies, dates, and numbers unchanged.
 Do NOT add new information. Do NOT remove important details.
 Make it professional, concise, and ATS-friendly.
-Return ONLY JSON with the same structure and array lengths.
+Return ONLY JSON with the same structure and keys.
 If an input is empty, return an empty string for that item.
 
 Input JSON:
@@ -258,13 +463,82 @@ Input JSON:
         parsed = _safe_json_loads(response.choices[0].message.content)
     except Exception as e:
         logger.warning(f"Rewrite failed: {e}")
-        return
+        return None
 
     if not isinstance(parsed, dict):
+        return None
+    improved: Dict[str, Any] = {"summary": str(parsed.get("summary", "") or "").strip() if dirty["summary"] else ""}
+    for key in ["experience", "projects"]:
+        returned = parsed.get(key) if isinstance(parsed.get(key), dict) else {}
+        improved[key] = {
+            idx: str(returned.get(str(idx), "") or "").strip() for idx in dirty[key]
+        }
+    return improved
+
+
+def _apply_dirty_rewrites(cv_data: Dict[str, Any], dirty: Dict[str, Any], improved: Dict[str, Any]) -> None:
+    """Apply rewrites of ``dirty`` items whose text has not changed since they were sent.
+
+    Items the model left empty are marked clean too, so they are not resent every turn.
+    """
+    experience = cv_data.get("experience", []) or []
+    projects = cv_data.get("projects", []) or []
+    aligned: Dict[str, Any] = {"summary": ""}
+    sent: Dict[str, Any] = {"summary": "", "experience": [""] * len(experience), "projects": [""] * len(projects)}
+    if dirty["summary"] and (cv_data.get("summary") or "").strip() == dirty["summary"]:
+        aligned["summary"] = improved.get("summary", "")
+        sent["summary"] = dirty["summary"]
+    for key, items in (("experience", experience), ("projects", projects)):
+        aligned[key] = [""] * len(items)
+        for idx, text in dirty[key].items():
+            current = items[idx] if idx < len(items) else None
+            if isinstance(current, dict) and str(current.get("description", "") or "").strip() == text:
+                aligned[key][idx] = improved.get(key, {}).get(idx, "")
+                sent[key][idx] = text
+
+    _mark_clean(cv_data, sent)
+    _apply_rewrites(cv_data, aligned)
+
+
+def _mark_clean(cv_data: Dict[str, Any], texts: Dict[str, Any]) -> None:
+    rewrite_meta = _ensure_rewrite_meta(_get_meta(cv_data))
+    hashes = _rewrite_hashes(
+        rewrite_meta, len(cv_data.get("experience", []) or []), len(cv_data.get("projects", []) or [])
+    )
+    if texts.get("summary"):
+        hashes["summary"] = _text_hash(texts["summary"])
+    for key in ["experience", "projects"]:
+        for idx, text in enumerate(texts.get(key) or []):
+            if text and idx < len(hashes[key]):
+                hashes[key][idx] = _text_hash(text)
+
+
+def _rewrite_cv_sections(llm: LLMService, cv_data: Dict[str, Any]) -> None:
+    if not llm.is_available():
         return
 
+    dirty = _dirty_sections(cv_data)
+    if not _has_dirty_sections(dirty):
+        return
+
+    improved = _request_rewrites(llm, dirty)
+    if improved is not None:
+        _apply_dirty_rewrites(cv_data, dirty, improved)
+
+
+def _apply_rewrites(cv_data: Dict[str, Any], parsed: Dict[str, Any]) -> None:
+    """Replace summary and descriptions with improved copies, keeping the originals in ``_meta.rewrite``.
+
+    ``parsed`` holds ``summary`` plus ``experience`` / ``projects`` lists aligned with the CV's
+    entries; empty items leave the matching text untouched. Every replaced item is marked clean.
+    """
+    summary_text = (cv_data.get("summary") or "").strip()
+    experience = cv_data.get("experience", []) or []
+    projects = cv_data.get("projects", []) or []
+
     meta = _get_meta(cv_data)
     rewrite_meta = _ensure_rewrite_meta(meta)
+    hashes = _rewrite_hashes(rewrite_meta, len(experience), len(projects))
 
     improved_summary = str(parsed.get("summary", "") or "").strip()
     if summary_text and improved_summary:
@@ -274,46 +548,68 @@ Input JSON:
             original = stored.get("original") or summary_text
         rewrite_meta["summary"] = {"original": original, "improved": improved_summary}
         cv_data["summary"] = improved_summary
-
-    improved_experience = parsed.get("experience", [])
-    exp_meta = _normalize_rewrite_list(rewrite_meta.get("experience"), len(experience))
-    for idx, original in enumerate(experience_texts):
-        if not original:
-            continue
-        improved = ""
-        if isinstance(improved_experience, list) and idx < len(improved_experience):
-            improved = str(improved_experience[idx] or "").strip()
-        if not improved:
-            continue
-        stored = exp_meta[idx] if idx < len(exp_meta) else None
-        base_original = original
-        if isinstance(stored, dict) and original == stored.get("improved"):
-            base_original = stored.get("original") or original
-        exp_meta[idx] = {"original": base_original, "improved": improved}
-        if isinstance(experience[idx], dict):
-            experience[idx]["description"] = improved
-    if exp_meta:
-        rewrite_meta["experience"] = exp_meta
-
-    improved_projects = parsed.get("projects", [])
-    proj_meta = _normalize_rewrite_list(rewrite_meta.get("projects"), len(projects))
-    for idx, original in enumerate(project_texts):
-        if not original:
-            continue
-        improved = ""
-        if isinstance(improved_projects, list) and idx < len(improved_projects):
-            improved = str(improved_projects[idx] or "").strip()
-        if not improved:
-            continue
-        stored = proj_meta[idx] if idx < len(proj_meta) else None
-        base_original = original
-        if isinstance(stored, dict) and original == stored.get("improved"):
-            base_original = stored.get("original") or original
-        proj_meta[idx] = {"original": base_original, "improved": improved}
-        if isinstance(projects[idx], dict):
-            projects[idx]["description"] = improved
-    if proj_meta:
-        rewrite_meta["projects"] = proj_meta
+        hashes["summary"] = _text_hash(improved_summary)
+
+    for key, items in (("experience", experience), ("projects", projects)):
+        improved_items = parsed.get(key, [])
+        section_meta = _normalize_rewrite_list(rewrite_meta.get(key), len(items))
+        for idx, item in enumerate(items):
+            original = str(item.get("description", "") or "").strip() if isinstance(item, dict) else ""
+            if not original:
+                continue
+            improved = ""
+            if isinstance(improved_items, list) and idx < len(improved_items):
+                improved = str(improved_items[idx] or "").strip()
+            if not improved:
+                continue
+            stored = section_meta[idx]
+            base_original = original
+            if isinstance(stored, dict) and original == stored.get("improved"):
+                base_original = stored.get("original") or original
+            section_meta[idx] = {"original": base_original, "improved": improved}
+            item["description"] = improved
+            hashes[key][idx] = _text_hash(improved)
+        if section_meta:
+            rewrite_meta[key] = section_meta
+
+
+async def _rewrite_session_in_background(session_id: str) -> None:
+    """Deferred rewrite for ``CHATBOT_REWRITE_MODE=background``, run after the turn has been answered.
+
+    The LLM call works on a snapshot without holding the session lock; results are applied under
+    the lock and only to items the user has not edited in the meantime.
+    """
+    llm = LLMService()
+    session = await session_cache.get(session_id)
+    if not session or not llm.is_available():
+        return
+    dirty = _dirty_sections(session.get("cv_data") or {})
+    if not _has_dirty_sections(dirty):
+        return
+    improved = await asyncio.to_thread(_request_rewrites, llm, dirty)
+    if improved is None:
+        return
+    async with session_cache.lock(session_id):
+        session = await session_cache.get(session_id)
+        if not session:
+            return
+        _apply_dirty_rewrites(session["cv_data"], dirty, improved)
+        await session_cache.mark_dirty(session_id, session)
+    logger.info(f"Background rewrite applied for {session_id}")
+    _notify(session_id, {"type": "rewrite_complete", "rewrites": _get_meta(session["cv_data"]).get("rewrite", {})})
+
+
+def _ensure_rewritten(session: Dict[str, Any]) -> bool:
+    """Apply pending rewrites before a document is rendered; returns whether anything changed."""
+    cv_data = session.get("cv_data") or {}
+    if not _has_dirty_sections(_dirty_sections(cv_data)):
+        return False
+    llm = LLMService()
+    if not llm.is_available():
+        return False
+    before = _fingerprint(cv_data)
+    _rewrite_cv_sections(llm, cv_data)
+    return _fingerprint(cv_data) != before
 
 
 def _extract_cv_updates_with_llm(llm: LLMService, message: str, cv_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -323,32 +619,7 @@ def _extract_cv_updates_with_llm(llm: LLMService, message: str, cv_data: Dict[st
     prompt = f"""
 Extract CV updates from the user's message.
 Return ONLY JSON with this schema:
-{{
-  "updates": {{
-    "personal_info": {{
-      "full_name": "", "email": "", "phone": "", "location": "",
-      "linkedin": "", "github": "", "title": ""
-    }},
-    "experience": [{{"position":"", "company":"", "duration":"", "description":"", "achievements":[]}}],
-    "education": [{{"degree":"", "institution":"", "duration":"", "description":""}}],
-    "skills": [],
-    "projects": [],
-    "certifications": [],
-    "languages": [],
-    "summary": ""
-  }},
-  "flags": {{
-    "no_experience": false,
-    "no_certifications": false,
-    "no_projects": false,
-    "no_education": false
-  }},
-  "intent": {{
-    "complete": false,
-    "request_export": false,
-    "output_language": null
-  }}
-}}
+{EXTRACTION_SCHEMA}
 
 User message:
 {message}
@@ -372,6 +643,180 @@ User message:
         return {}
 
 
+class _ReplyFieldStream:
+    """Forwards the characters of the ``"reply"`` string in a streamed JSON object as they arrive."""
+
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+    _START_RE = re.compile(r'"reply"\s*:\s*"')
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self.buffer = ""
+        self.pos: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> None:
+        self.buffer += chunk
+        if self.done:
+            return
+        if self.pos is None:
+            match = self._START_RE.search(self.buffer)
+            if not match:
+                return
+            self.pos = match.end()
+        text, i, buffer = [], self.pos, self.buffer
+        while i < len(buffer):
+            ch = buffer[i]
+            if ch == '"':
+                self.done = True
+                break
+            if ch != "\\":
+                text.append(ch)
+                i += 1
+                continue
+            # Escapes may be split across chunks; wait until the whole sequence has arrived.
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] != "u":
+                text.append(self._ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            code = int(buffer[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                if i + 12 > len(buffer):
+                    break
+                low = int(buffer[i + 8:i + 12], 16)
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                i += 6
+            text.append(chr(code))
+            i += 6
+        self.pos = i
+        if text:
+            self.on_token("".join(text))
+
+
+def _collect_stream(stream: Iterable[Any], on_token: Callable[[str], None], json_reply: bool = False) -> str:
+    """Concatenate a streamed completion, passing deltas (or just the JSON reply text) to ``on_token``."""
+    sink = _ReplyFieldStream(on_token).feed if json_reply else on_token
+    parts = []
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            sink(delta)
+    return "".join(parts)
+
+
+def _single_call_turn(
+    llm: LLMService,
+    session: Dict[str, Any],
+    skip_flags: Dict[str, bool],
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Extraction, section rewrites and the assistant reply in one JSON-mode completion.
+
+    Returns the extraction schema plus ``improved`` (rewritten summary and descriptions for the
+    entries in ``updates``) and ``reply``, or ``{}`` if the call fails. With ``on_token`` the
+    completion is streamed and the reply text is forwarded as it is generated.
+    """
+    cv_data = session.get("cv_data", {})
+    _update_conversation_summary(llm, session)
+    system_prompt = _build_system_prompt(
+        cv_data,
+        session.get("current_step") or _determine_current_step(cv_data, skip_flags),
+        session.get("language", "english"),
+        session.get("job_requirements"),
+        skip_flags,
+        _conversation_summary(cv_data)["text"],
+    )
+    system_prompt += f"""
+The CV data above does not yet include the user's latest message.
+Return ONLY JSON with this schema:
+{EXTRACTION_SCHEMA[:-1].rstrip()},
+  "improved": {{
+    "summary": "",
+    "experience": [""],
+    "projects": [""]
+  }},
+  "reply": ""
+}}
+- "updates": details found in the user's latest message only; leave everything else empty.
+- "improved": professional, concise, ATS-friendly English rewrites of the summary and of each
+  description in "updates.experience" / "updates.projects" (same order and length). Keep facts,
+  names, titles, companies, dates and numbers unchanged; use "" when there is nothing to rewrite.
+- "reply": your message to the user. Treat the updates as already applied, then ask for the next
+  missing item in this order: full name, email, experience, education, at least 3 skills, summary.
+"""
+    messages = _prompt_messages(system_prompt, session["conversation"])
+    try:
+        if on_token is None:
+            response = llm.client.chat.completions.create(
+                model=llm.model,
+                messages=messages,
+                temperature=0.4,
+                max_tokens=1400,
+                response_format={"type": "json_object"},
+            )
+            content = response.choices[0].message.content
+        else:
+            stream = llm.client.chat.completions.create(
+                model=llm.model,
+                messages=messages,
+                temperature=0.4,
+                max_tokens=1400,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            content = _collect_stream(stream, on_token, json_reply=True)
+        parsed = _safe_json_loads(content)
+        return parsed if isinstance(parsed, dict) else {}
+    except Exception as e:
+        logger.warning(f"Single-call turn failed: {e}")
+        return {}
+
+
+def _align_improved(cv_data: Dict[str, Any], updates: Dict[str, Any], improved: Any) -> Dict[str, Any]:
+    """Map rewrites of the entries in ``updates`` onto CV indexes, as ``_apply_rewrites`` expects.
+
+    Call before ``_merge_cv_data`` so existing entries get empty slots and the new ones line up with
+    the positions the merge appends them to.
+    """
+    improved = improved if isinstance(improved, dict) else {}
+    aligned: Dict[str, Any] = {"summary": improved.get("summary", "") if updates.get("summary") else ""}
+    for key in ["experience", "projects"]:
+        rewrites = improved.get(key) if isinstance(improved.get(key), list) else []
+        slots = [""] * len(cv_data.get(key, []) or [])
+        for idx, entry in enumerate(updates.get(key) or []):
+            if isinstance(entry, dict) and entry:
+                slots.append(rewrites[idx] if idx < len(rewrites) else "")
+        aligned[key] = slots
+    return aligned
+
+
+def _step_reply(current_step: str, language: str) -> str:
+    """Canned acknowledgement plus the next question, for turns that never reach the LLM."""
+    arabic = language == "arabic"
+    questions = STEP_QUESTIONS["arabic" if arabic else "english"]
+    question = questions.get(current_step, questions["review"])
+    return f"{'شكرًا!' if arabic else 'Thanks!'} {question}"
+
+
+def _audit_rule_extraction(llm: LLMService, message: str, rule_result: Dict[str, Any]) -> None:
+    extracted = _extract_cv_updates_with_llm(llm, message, {})
+    if extracted:
+        classifier_stats.record_audit(extraction_disagrees(rule_result, extracted), rule_result.get("rule"))
+
+
+def _default_reply(language: str) -> str:
+    return (
+        "Thanks! Tell me more about your experience."
+        if language == "english"
+        else "شكرًا! أخبرني أكثر عن خبراتك."
+    )
+
+
 def _fallback_extract(message: str) -> Dict[str, Any]:
     updates: Dict[str, Any] = {"personal_info": {}, "skills": []}
     if "@" in message and "." in message:
@@ -460,71 +905,201 @@ Job requirements:
         return {}
 
 
+# Sections of the CV that are translated for export, and fields inside them that stay verbatim.
+TRANSLATED_SECTIONS = ("summary", "experience", "education", "skills", "projects", "certifications", "languages")
+VERBATIM_FIELDS = {"email", "phone", "linkedin", "github", "url", "link", "website", "duration", "start_date",
+                   "end_date", "date", "year", "gpa"}
+
+
+def _map_cv_text(value: Any, fn: Callable[[str], str]) -> Any:
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, list):
+        return [_map_cv_text(item, fn) for item in value]
+    if isinstance(value, dict):
+        return {key: item if key in VERBATIM_FIELDS else _map_cv_text(item, fn) for key, item in value.items()}
+    return value
+
+
 def _translate_cv_payload(llm: LLMService, cv_data: Dict[str, Any], target_language: str) -> Dict[str, Any]:
-    if not llm.is_available():
-        return cv_data
+    """Translate the user-written sections of ``cv_data`` line by line through the translation memory.
+
+    Only lines the memory has not seen in ``target_language`` reach the LLM, so re-exporting a CV
+    costs a call per edited line. Lines that could not be translated are left as they were.
+    """
+    segments: List[str] = []
+
+    def collect(text: str) -> str:
+        segments.extend(split_segments(text))
+        return text
+
+    for section in TRANSLATED_SECTIONS:
+        _map_cv_text(cv_data.get(section), collect)
+    translations = llm.translate_segments(segments, target_language)
+    for section in TRANSLATED_SECTIONS:
+        if section in cv_data:
+            cv_data[section] = _map_cv_text(cv_data[section], lambda text: join_segments(text, translations))
+    return cv_data
 
-    payload = {
-        "summary": cv_data.get("summary", ""),
-        "experience": cv_data.get("experience", []),
-        "education": cv_data.get("education", []),
-        "skills": cv_data.get("skills", []),
-        "projects": cv_data.get("projects", []),
-        "certifications": cv_data.get("certifications", []),
-        "languages": cv_data.get("languages", []),
-    }
 
-    prompt = f"""
-Translate all user-written text to {target_language}.
-Keep names, emails, URLs, and numbers unchanged.
-Return ONLY JSON with the same structure.
-{json.dumps(payload, ensure_ascii=False)}
-"""
+async def _complete_session_in_background(session_id: str) -> None:
+    """Score the finished CV and write the final summary once the completing turn has been answered.
+
+    Works on a snapshot without holding the session lock. The result is dropped if the CV changed in
+    the meantime, because the turn that changed it queued a fresh job.
+    """
+    session = await session_cache.get(session_id)
+    if not session or session.get("summary_status") != "pending":
+        return
+    cv_data = copy.deepcopy(session.get("cv_data") or {})
+    version = _fingerprint(cv_data)
     try:
-        response = llm.client.chat.completions.create(
-            model=llm.model,
-            messages=[
-                {"role": "system", "content": "You are a professional translator. Return only JSON."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            max_tokens=1000,
-            response_format={"type": "json_object"},
+        score_data = _score_cv(cv_data)
+        final_summary = await asyncio.to_thread(
+            _generate_final_summary, LLMService(), cv_data, session.get("job_requirements")
         )
-        parsed = _safe_json_loads(response.choices[0].message.content)
-        if parsed:
-            cv_data["summary"] = parsed.get("summary", cv_data.get("summary", ""))
-            cv_data["experience"] = parsed.get("experience", cv_data.get("experience", []))
-            cv_data["education"] = parsed.get("education", cv_data.get("education", []))
-            cv_data["skills"] = parsed.get("skills", cv_data.get("skills", []))
-            cv_data["projects"] = parsed.get("projects", cv_data.get("projects", []))
-            cv_data["certifications"] = parsed.get("certifications", cv_data.get("certifications", []))
-            cv_data["languages"] = parsed.get("languages", cv_data.get("languages", []))
     except Exception as e:
-        logger.warning(f"Translation JSON failed: {e}")
-    return cv_data
+        logger.error(f"Final summary failed for {session_id}: {e}")
+        score_data, final_summary = None, None
+    # The next completing turn retries a failed summary.
+    status = "ready" if final_summary else "failed"
+
+    async with session_cache.lock(session_id):
+        session = await session_cache.get(session_id)
+        if not session or _fingerprint(session.get("cv_data") or {}) != version:
+            return
+        if score_data is not None:
+            session["score_data"] = score_data
+        if final_summary:
+            session["final_summary"] = final_summary
+        session["summary_status"] = status
+        await session_cache.mark_dirty(session_id, session)
+    await session_cache.flush(session_id)
+    logger.info(f"Final summary {status} for {session_id}")
+
+    _notify(session_id, {
+        "type": "score",
+        "summary_status": status,
+        "score": session.get("score_data", {}),
+        "final_summary": session.get("final_summary"),
+    })
+    waiter = _summary_waiters.pop(session_id, None)
+    if waiter is not None:
+        waiter.set()
+
+
+def resume_pending_summaries() -> None:
+    """Re-queue final summaries that were still pending when the process stopped."""
+    async def run() -> None:
+        for session_id in await asyncio.to_thread(db.list_pending_summary_sessions):
+            await _complete_session_in_background(session_id)
+
+    _spawn(run())
+
+
+def _fingerprint(value: Any) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _session_columns(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "language": session.get("language", "english"),
+        "output_language": session.get("output_language", session.get("language", "english")),
+        "current_step": session.get("current_step"),
+        "cv_data": session.get("cv_data"),
+        "job_requirements": session.get("job_requirements"),
+        "job_posting_meta": session.get("job_posting_meta"),
+        "score_data": session.get("score_data"),
+        # The summary is a JSON object but the column is text.
+        "final_summary": _encode_final_summary(session.get("final_summary")),
+        "summary_status": session.get("summary_status"),
+        "is_complete": 1 if session.get("is_complete") else 0,
+    }
+
+
+def _encode_final_summary(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _decode_final_summary(value: Optional[str]) -> Any:
+    if isinstance(value, str) and value.lstrip().startswith("{"):
+        parsed = _safe_json_loads(value)
+        if parsed is not None:
+            return parsed
+    return value
+
 
+def _load_session(session_id: str, conversation: str = "window") -> Optional[Dict[str, Any]]:
+    """Load a session with part of its conversation.
 
-def _load_session(session_id: str) -> Optional[Dict[str, Any]]:
+    ``conversation`` is ``"window"`` (the raw prompt window plus any messages the rolling summary
+    has yet to fold), ``"full"`` or ``"none"``. ``session["conversation"]`` then starts at
+    message ``_conversation_offset``.
+    """
     record = db.get_chatbot_session(session_id)
     if not record:
         return None
-    return {
+    cv_data = record.cv_data or {}
+    message_count = record.message_count or 0
+    if conversation == "full":
+        start = 0
+    elif conversation == "none":
+        start = message_count
+    else:
+        start = max(0, min(_conversation_summary(cv_data)["through"], message_count - RAW_PROMPT_MESSAGES))
+    session = {
         "session_id": record.session_id,
         "user_id": record.user_id,
         "language": record.language,
         "output_language": record.output_language,
         "current_step": record.current_step,
-        "cv_data": record.cv_data or {},
-        "conversation": record.conversation or [],
+        "cv_data": cv_data,
+        "conversation": db.get_chat_messages(session_id, since_seq=start) if start < message_count else [],
+        "message_count": message_count,
         "job_requirements": record.job_requirements,
         "job_posting_meta": record.job_posting_meta or {},
         "score_data": record.score_data or {},
-        "final_summary": record.final_summary,
+        "final_summary": _decode_final_summary(record.final_summary),
+        "summary_status": record.summary_status,
         "is_complete": bool(record.is_complete),
         "created_at": record.created_at.isoformat() if record.created_at else None,
         "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+        "_conversation_offset": start,
     }
+    session["_saved"] = {key: _fingerprint(value) for key, value in _session_columns(session).items()}
+    return session
+
+
+SESSION_FIELDS = (
+    "session_id", "user_id", "language", "output_language", "current_step", "cv_data", "conversation",
+    "message_count", "job_requirements", "job_posting_meta", "score_data", "final_summary", "summary_status",
+    "is_complete", "created_at", "updated_at",
+)
+
+
+def _public_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in session.items() if not key.startswith("_")}
+
+
+def _next_seq(session: Dict[str, Any]) -> int:
+    return session.get("_conversation_offset", 0) + len(session.get("conversation") or [])
+
+
+def _append_message(session: Dict[str, Any], role: str, content: str) -> None:
+    session["conversation"].append({
+        "seq": _next_seq(session),
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now().isoformat(),
+    })
+
+
+def _session_etag(session: Dict[str, Any], fields: List[str], since_seq: int) -> str:
+    """Changes whenever a message is added or any stored column changes; no message rows are read."""
+    version = f"{_next_seq(session)}:{_fingerprint(_session_columns(session))}:{','.join(fields)}:{since_seq}"
+    return '"' + hashlib.sha1(version.encode("utf-8")).hexdigest()[:20] + '"'
 
 
 def _ensure_job_meta(session: Dict[str, Any]) -> Dict[str, Any]:
@@ -536,20 +1111,50 @@ def _ensure_job_meta(session: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _save_session(session: Dict[str, Any]) -> None:
-    updates = {
-        "language": session.get("language", "english"),
-        "output_language": session.get("output_language", session.get("language", "english")),
-        "current_step": session.get("current_step"),
-        "cv_data": session.get("cv_data"),
-        "conversation": session.get("conversation"),
-        "job_requirements": session.get("job_requirements"),
-        "job_posting_meta": session.get("job_posting_meta"),
-        "score_data": session.get("score_data"),
-        "final_summary": session.get("final_summary"),
-        "is_complete": 1 if session.get("is_complete") else 0,
-        "completed_at": datetime.utcnow() if session.get("is_complete") else None,
-    }
-    db.update_chatbot_session(session["session_id"], updates)
+    """Write only the columns that changed since load and append the messages added this turn."""
+    columns = _session_columns(session)
+    fingerprints = {key: _fingerprint(value) for key, value in columns.items()}
+    saved = session.get("_saved") or {}
+    updates = {key: value for key, value in columns.items() if saved.get(key) != fingerprints[key]}
+    if "is_complete" in updates:
+        updates["completed_at"] = datetime.utcnow() if session.get("is_complete") else None
+
+    persisted = session.get("message_count", 0) - session.get("_conversation_offset", 0)
+    new_messages = (session.get("conversation") or [])[max(0, persisted):]
+    if not updates and not new_messages:
+        return
+    # Raise rather than return, so the write-back cache keeps the session dirty and retries.
+    if not db.update_chatbot_session(session["session_id"], updates, new_messages):
+        raise RuntimeError(f"Could not save chatbot session {session['session_id']}")
+    session["_saved"] = fingerprints
+    session["message_count"] = session.get("message_count", 0) + len(new_messages)
+
+
+def _trim_conversation(session: Dict[str, Any]) -> None:
+    """Drop saved messages the next prompt no longer needs, so cached sessions stay small."""
+    offset = session.get("_conversation_offset", 0)
+    total = offset + len(session.get("conversation") or [])
+    keep_from = max(0, min(_conversation_summary(session.get("cv_data", {}))["through"], total - RAW_PROMPT_MESSAGES))
+    drop = min(keep_from, session.get("message_count", 0)) - offset
+    if drop > 0:
+        session["conversation"] = session["conversation"][drop:]
+        session["_conversation_offset"] = offset + drop
+
+
+def _persist_session(session: Dict[str, Any]) -> None:
+    _save_session(session)
+    _trim_conversation(session)
+
+
+# Hot sessions stay in memory between turns; changes reach the database on the flush interval,
+# when a session completes, and at shutdown.
+session_cache = WriteBackCache(
+    loader=_load_session,
+    saver=_persist_session,
+    max_entries=int(os.getenv("CHATBOT_SESSION_CACHE_SIZE", "1000")),
+    ttl_seconds=float(os.getenv("CHATBOT_SESSION_CACHE_TTL_SECONDS", "1800")),
+    flush_interval=float(os.getenv("CHATBOT_SESSION_FLUSH_SECONDS", "5")),
+)
 
 
 @router.post("/start")
@@ -580,12 +1185,13 @@ async def start_chatbot(request: ChatbotStartRequest):
         "current_step": current_step,
         "cv_data": cv_data,
         "conversation": [
-            {"role": "assistant", "content": welcome_msg, "timestamp": datetime.now().isoformat()}
+            {"seq": 0, "role": "assistant", "content": welcome_msg, "timestamp": datetime.now().isoformat()}
         ],
         "job_requirements": job_requirements,
         "job_posting_meta": job_posting_meta,
         "score_data": {},
         "final_summary": None,
+        "summary_status": None,
         "is_complete": False,
     }
 
@@ -599,28 +1205,212 @@ async def start_chatbot(request: ChatbotStartRequest):
     }
 
 
-@router.post("/chat")
-async def chat_with_cv_bot(request: ChatbotMessageRequest):
-    session = _load_session(request.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+# Event queues of the WebSockets open on each session, for pushing server-side events.
+_session_listeners: Dict[str, Set[asyncio.Queue]] = {}
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run.
+_background_jobs: Set[asyncio.Task] = set()
+# Set when a session's pending final summary lands; awaited by ``/insights?wait=``.
+_summary_waiters: Dict[str, asyncio.Event] = {}
+
+
+def _notify(session_id: str, event: Dict[str, Any]) -> None:
+    """Push ``event`` to every WebSocket open on the session; call from the event loop."""
+    for events in _session_listeners.get(session_id, ()):
+        events.put_nowait(event)
+
+
+def _spawn(coro: Any) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_jobs.add(task)
+    task.add_done_callback(_background_jobs.discard)
+    return task
+
+
+async def _locked_chat_turn(
+    request: ChatbotMessageRequest,
+    message: str,
+    background_tasks: BackgroundTasks,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Run one turn under the session lock; ``None`` if the session does not exist.
+
+    The turn works on a copy of the cached session in a worker thread, so the event loop keeps
+    serving other sessions (and streaming this one's tokens) during LLM calls, readers never see a
+    half-applied turn, and a failed turn leaves the cached state untouched.
+    """
+    session_id = request.session_id
+    async with session_cache.lock(session_id):
+        session = await session_cache.get(session_id)
+        if not session:
+            return None
+        working = copy.deepcopy(session)
+        result = await asyncio.to_thread(_run_chat_turn, working, message, request, background_tasks, on_token)
+        session.clear()
+        session.update(working)
+        await session_cache.mark_dirty(session_id, session)
+    if session["is_complete"]:
+        await session_cache.flush(session_id)
+    return result
 
+
+@router.post("/chat")
+async def chat_with_cv_bot(request: ChatbotMessageRequest, background_tasks: BackgroundTasks):
     message = request.message.strip()
     if not message:
         raise HTTPException(status_code=400, detail="Message is required")
 
-    session["conversation"].append({
-        "role": "user",
-        "content": message,
-        "timestamp": datetime.now().isoformat(),
+    result = await _locked_chat_turn(request, message, background_tasks)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return result
+
+
+async def _send_events(websocket: WebSocket, events: asyncio.Queue) -> None:
+    while True:
+        event = await events.get()
+        try:
+            await websocket.send_json(event)
+        except Exception:
+            return
+
+
+async def _websocket_turn(session_id: str, data: Dict[str, Any], events: asyncio.Queue) -> None:
+    message = str(data.get("message") or "").strip()
+    if not message:
+        events.put_nowait({"type": "error", "error": "Message is required"})
+        return
+    try:
+        request = ChatbotMessageRequest(
+            session_id=session_id,
+            message=message,
+            job_description=data.get("job_description"),
+            job_posting=data.get("job_posting"),
+        )
+    except ValidationError as e:
+        events.put_nowait({"type": "error", "error": str(e)})
+        return
+
+    loop = asyncio.get_running_loop()
+
+    def on_token(delta: str) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, {"type": "token", "delta": delta})
+
+    background_tasks = BackgroundTasks()
+    try:
+        result = await _locked_chat_turn(request, message, background_tasks, on_token)
+    except Exception as e:
+        logger.error(f"WebSocket turn failed for {session_id}: {e}")
+        events.put_nowait({"type": "error", "error": "Turn failed"})
+        return
+    if result is None:
+        events.put_nowait({"type": "error", "error": "Session not found"})
+        return
+    events.put_nowait({"type": "reply", **result})
+    if background_tasks.tasks:
+        _spawn(background_tasks())
+
+
+@ws_router.websocket("/ws/{session_id}")
+async def chatbot_websocket(websocket: WebSocket, session_id: str):
+    """Chat over one long-lived connection.
+
+    Authentication happens once, at connect, and the session stays pinned in the cache until the
+    socket closes. Client frames are ``{"type": "message", "message": ...}`` (plus the optional
+    ``job_description`` / ``job_posting`` of ``POST /chat``) and ``{"type": "ping"}``. The server
+    sends ``session`` on connect, ``token`` deltas while the reply is generated, ``reply`` with the
+    same fields as ``POST /chat``, ``rewrite_complete`` and ``score`` when background work lands,
+    ``pong`` and ``error``.
+    """
+    await websocket.accept()
+    try:
+        await verify_websocket_auth(websocket)
+    except HTTPException as e:
+        await websocket.close(code=4401, reason=str(e.detail))
+        return
+    session = await session_cache.get(session_id)
+    if not session:
+        await websocket.close(code=4404, reason="Session not found")
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+    session_cache.pin(session_id)
+    _session_listeners.setdefault(session_id, set()).add(events)
+    sender = asyncio.create_task(_send_events(websocket, events))
+    events.put_nowait({
+        "type": "session",
+        "session_id": session_id,
+        "current_step": session.get("current_step"),
+        "is_complete": session.get("is_complete"),
+        "next_seq": _next_seq(session),
     })
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                events.put_nowait({"type": "error", "error": "Frames must be JSON objects"})
+                continue
+            kind = data.get("type", "message")
+            if kind == "ping":
+                events.put_nowait({"type": "pong"})
+            elif kind == "message":
+                await _websocket_turn(session_id, data, events)
+            else:
+                events.put_nowait({"type": "error", "error": f"Unknown frame type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        listeners = _session_listeners.get(session_id)
+        if listeners is not None:
+            listeners.discard(events)
+            if not listeners:
+                _session_listeners.pop(session_id, None)
+        session_cache.unpin(session_id)
+        sender.cancel()
+
+
+def _run_chat_turn(
+    session: Dict[str, Any],
+    message: str,
+    request: ChatbotMessageRequest,
+    background_tasks: BackgroundTasks,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Apply one user message to ``session`` in place and return the ``POST /chat`` response.
+
+    With ``on_token`` the reply is passed on as it is generated; canned replies arrive in one piece.
+    """
+    set_llm_caller(user_id=session.get("user_id"))
+
+    _append_message(session, "user", message)
 
     llm_service = LLMService()
     cv_data = session.get("cv_data", {})
+    was_complete = bool(session.get("is_complete"))
+    cv_version = _fingerprint(cv_data)
     meta = _get_meta(cv_data)
     skip_flags = meta.get("skip_flags", {})
 
-    extracted = _extract_cv_updates_with_llm(llm_service, message, cv_data)
+    rule_result = classify_message(
+        message,
+        session.get("current_step") or _determine_current_step(cv_data, skip_flags),
+        cv_data.get("personal_info"),
+    )
+    classifier_stats.record_message(rule_result["rule"] if rule_result else None)
+
+    single_call = TURN_MODE == "single" and llm_service.is_available() and rule_result is None
+    turn: Dict[str, Any] = {}
+    if rule_result is not None:
+        extracted = rule_result
+        if llm_service.is_available() and random.random() < CLASSIFIER_AUDIT_RATE:
+            background_tasks.add_task(_audit_rule_extraction, llm_service, message, rule_result)
+    elif single_call:
+        turn = _single_call_turn(llm_service, session, skip_flags, on_token)
+        extracted = turn
+    else:
+        extracted = _extract_cv_updates_with_llm(llm_service, message, cv_data)
     if not extracted:
         extracted = _fallback_extract(message)
 
@@ -636,8 +1426,14 @@ async def chat_with_cv_bot(request: ChatbotMessageRequest):
         skip_flags.update(flags)
         meta["skip_flags"] = skip_flags
 
-    _merge_cv_data(cv_data, updates)
-    _rewrite_cv_sections(llm_service, cv_data)
+    if single_call:
+        improved = _align_improved(cv_data, updates, turn.get("improved"))
+        _merge_cv_data(cv_data, updates)
+        _apply_rewrites(cv_data, improved)
+    else:
+        _merge_cv_data(cv_data, updates)
+        if REWRITE_MODE != "background":
+            _rewrite_cv_sections(llm_service, cv_data)
 
     if request.job_description:
         session["job_requirements"] = request.job_description
@@ -652,54 +1448,64 @@ async def chat_with_cv_bot(request: ChatbotMessageRequest):
         is_complete = True
     session["is_complete"] = is_complete
 
-    system_prompt = _build_system_prompt(
-        cv_data,
-        current_step,
-        session.get("language", "english"),
-        session.get("job_requirements"),
-        skip_flags,
-    )
-
     response_text = ""
-    if llm_service.is_available():
+    streamed = False
+    if single_call:
+        streamed = bool(str(turn.get("reply") or "").strip())
+        response_text = str(turn.get("reply") or "").strip() or _default_reply(session.get("language"))
+    elif rule_result is not None and TURN_MODE == "single":
+        response_text = _step_reply(current_step, session.get("language"))
+    elif llm_service.is_available():
+        _update_conversation_summary(llm_service, session)
+        system_prompt = _build_system_prompt(
+            cv_data,
+            current_step,
+            session.get("language", "english"),
+            session.get("job_requirements"),
+            skip_flags,
+            _conversation_summary(cv_data)["text"],
+        )
         try:
-            messages = [{"role": "system", "content": system_prompt}]
-            for msg in session["conversation"][-12:]:
-                messages.append({"role": msg["role"], "content": msg["content"]})
-            response_obj = llm_service.client.chat.completions.create(
-                model=llm_service.model,
-                messages=messages,
-                temperature=0.6,
-                max_tokens=600,
-            )
-            response_text = response_obj.choices[0].message.content.strip()
+            messages = _prompt_messages(system_prompt, session["conversation"])
+            if on_token is None:
+                response_obj = llm_service.client.chat.completions.create(
+                    model=llm_service.model,
+                    messages=messages,
+                    temperature=0.6,
+                    max_tokens=600,
+                )
+                response_text = response_obj.choices[0].message.content.strip()
+            else:
+                stream = llm_service.client.chat.completions.create(
+                    model=llm_service.model,
+                    messages=messages,
+                    temperature=0.6,
+                    max_tokens=600,
+                    stream=True,
+                )
+                response_text = _collect_stream(stream, on_token).strip()
+                streamed = bool(response_text)
         except Exception as llm_error:
             logger.warning(f"LLM error: {llm_error}")
-            response_text = (
-                "Thanks! Tell me more about your experience."
-                if session.get("language") == "english"
-                else "شكرًا! أخبرني أكثر عن خبراتك."
-            )
+            response_text = _default_reply(session.get("language"))
     else:
-        response_text = (
-            "Thanks! Tell me more about your experience."
-            if session.get("language") == "english"
-            else "شكرًا! أخبرني أكثر عن خبراتك."
-        )
+        response_text = _default_reply(session.get("language"))
+    if on_token is not None and not streamed:
+        on_token(response_text)
 
-    session["conversation"].append({
-        "role": "assistant",
-        "content": response_text,
-        "timestamp": datetime.now().isoformat(),
-    })
+    _append_message(session, "assistant", response_text)
 
-    if session["is_complete"]:
-        score_data = _score_cv(cv_data)
-        final_summary = _generate_final_summary(llm_service, cv_data, session.get("job_requirements"))
-        session["score_data"] = score_data
-        session["final_summary"] = final_summary
+    # Scoring and the final summary run after the reply, so the completing turn is as fast as any other.
+    if session["is_complete"] and (
+        not was_complete
+        or session.get("summary_status") in (None, "failed")
+        or _fingerprint(cv_data) != cv_version
+    ):
+        session["summary_status"] = "pending"
+        background_tasks.add_task(_complete_session_in_background, session["session_id"])
 
-    _save_session(session)
+    if not single_call and REWRITE_MODE == "background":
+        background_tasks.add_task(_rewrite_session_in_background, session["session_id"])
 
     return {
         "success": True,
@@ -709,33 +1515,65 @@ async def chat_with_cv_bot(request: ChatbotMessageRequest):
         "is_complete": session["is_complete"],
         "score": session.get("score_data", {}),
         "final_summary": session.get("final_summary"),
+        "summary_status": session.get("summary_status"),
     }
 
 
 @router.get("/session/{session_id}")
-async def get_chatbot_session(session_id: str):
-    session = _load_session(session_id)
+async def get_chatbot_session(
+    session_id: str,
+    since_seq: int = Query(0, ge=0, description="Only return messages with seq >= since_seq"),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SESSION_FIELDS)}"),
+    if_none_match: Optional[str] = Header(None),
+):
+    selected = list(SESSION_FIELDS)
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in SESSION_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    session = await session_cache.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return {
-        "success": True,
-        "session": session,
-    }
+
+    etag = _session_etag(session, selected, since_seq)
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    payload = {field: session.get(field) for field in selected if field != "conversation"}
+    if "message_count" in payload:
+        payload["message_count"] = _next_seq(session)
+    if "conversation" in selected:
+        if since_seq >= session.get("_conversation_offset", 0):
+            offset = session.get("_conversation_offset", 0)
+            payload["conversation"] = session["conversation"][since_seq - offset:]
+        else:
+            # Older messages than the cached window: make the stored copy current, then read the rows.
+            await session_cache.flush(session_id)
+            payload["conversation"] = db.get_chat_messages(session_id, since_seq=since_seq)
+    response = Response(
+        content=json.dumps({"success": True, "session": payload, "next_seq": _next_seq(session)},
+                           ensure_ascii=False, default=str),
+        media_type="application/json",
+    )
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.patch("/session/{session_id}")
 async def update_chatbot_session(session_id: str, request: ChatbotSessionUpdateRequest):
-    session = _load_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    if session.get("user_id") != request.user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-
-    meta = _ensure_job_meta(session)
-    if request.title is not None:
-        meta["session_title"] = request.title.strip()
-
-    _save_session(session)
+    async with session_cache.lock(session_id):
+        session = await session_cache.get(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session.get("user_id") != request.user_id:
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        meta = _ensure_job_meta(session)
+        if request.title is not None:
+            meta["session_title"] = request.title.strip()
+        await session_cache.mark_dirty(session_id, session)
     return {
         "success": True,
         "session_id": session_id,
@@ -745,13 +1583,15 @@ async def update_chatbot_session(session_id: str, request: ChatbotSessionUpdateR
 
 @router.delete("/session/{session_id}")
 async def delete_chatbot_session(session_id: str, user_id: str = Query(..., min_length=1)):
-    session = _load_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    if session.get("user_id") != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-
-    ok = db.delete_chatbot_session(session_id)
+    async with session_cache.lock(session_id):
+        session = await session_cache.get(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        session_cache.discard(session_id)
+        ok = db.delete_chatbot_session(session_id)
     if not ok:
         raise HTTPException(status_code=500, detail="Failed to delete session")
     return {"success": True, "session_id": session_id}
@@ -767,12 +1607,23 @@ async def list_chatbot_sessions(user_id: str = Query(..., min_length=1)):
 
 
 @router.get("/insights/{session_id}")
-async def get_chatbot_insights(session_id: str, user_id: str = Query(..., min_length=1)):
-    session = _load_session(session_id)
+async def get_chatbot_insights(
+    session_id: str,
+    user_id: str = Query(..., min_length=1),
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for a pending final summary"),
+):
+    session = await session_cache.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if session.get("user_id") != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
+    if wait and session.get("summary_status") == "pending":
+        waiter = _summary_waiters.setdefault(session_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        session = await session_cache.get(session_id) or session
 
     return {
         "success": True,
@@ -781,6 +1632,7 @@ async def get_chatbot_insights(session_id: str, user_id: str = Query(..., min_le
         "current_step": session.get("current_step"),
         "score": session.get("score_data", {}),
         "final_summary": session.get("final_summary"),
+        "summary_status": session.get("summary_status"),
         "rewrites": (session.get("cv_data") or {}).get("_meta", {}).get("rewrite", {}),
         "session_title": (session.get("job_posting_meta") or {}).get("session_title"),
     }
@@ -788,13 +1640,18 @@ async def get_chatbot_insights(session_id: str, user_id: str = Query(..., min_le
 
 @router.post("/export")
 async def export_cv_document(request: ChatbotExportRequest):
-    session = _load_session(request.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    language = "english"
-    llm_service = LLMService()
-    cv_data = json.loads(json.dumps(session.get("cv_data", {})))
+    async with session_cache.lock(request.session_id):
+        session = await session_cache.get(request.session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if await asyncio.to_thread(_ensure_rewritten, session):
+            await session_cache.mark_dirty(request.session_id, session)
+        cv_data = json.loads(json.dumps(session.get("cv_data", {})))
+
+    # English unless the request asks for another language; translations come from the memory.
+    language = _normalize_language(request.language) if request.language else "english"
+    if language != "english":
+        cv_data = await asyncio.to_thread(_translate_cv_payload, LLMService(), cv_data, language)
 
     cv_data["summary_professional"] = cv_data.get("summary", "")
 
@@ -816,13 +1673,14 @@ async def export_cv_document(request: ChatbotExportRequest):
 
 @router.get("/preview/{session_id}")
 async def preview_cv_document(session_id: str, language: Optional[str] = None):
-    session = _load_session(session_id)
+    session = await session_cache.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    resolved_language = "english"
-    llm_service = LLMService()
+    resolved_language = _normalize_language(language) if language else "english"
     cv_data = json.loads(json.dumps(session.get("cv_data", {})))
+    if resolved_language != "english":
+        cv_data = await asyncio.to_thread(_translate_cv_payload, LLMService(), cv_data, resolved_language)
 
     cv_data["summary_professional"] = cv_data.get("summary", "")
     html = document_generator.generate_html(cv_data, resolved_language)
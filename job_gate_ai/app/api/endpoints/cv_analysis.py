@@ -6,16 +6,24 @@ import traceback
 from datetime import datetime 
 from typing import Dict ,Optional, Union, List 
 
-from fastapi import APIRouter ,File ,HTTPException ,UploadFile ,Form, Request
+from fastapi import APIRouter ,File ,HTTPException ,UploadFile ,Form, Request, Query
 from fastapi .responses import JSONResponse 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app .models .schemas import CVStructuredData ,CVAnalysisResponse 
 from app .services .database_service import DatabaseService 
 from app .services .file_parser import FileParserService 
 from app .services .ats_scorer import ATSScorer 
 from app .services .llm_service import LLMService 
-from app .services .fallback_service import FallbackCVProcessor 
+from app .services .fallback_service import FallbackCVProcessor 
+from app.services.candidate_index import get_candidate_index
+from app.services.cv_document import CVDocument, normalize_structured_data
+from app.services.cv_search import get_cv_search_index, searchable_text
+from app.services.job_index import get_job_index
+from app.services.llm_ledger import set_llm_caller
+from app.services.near_duplicates import (
+    WARM_START_THRESHOLD, get_near_duplicate_index, minhash_signature, signature_to_bytes
+)
 
 router =APIRouter (prefix ="/cv",tags =["CV Analysis"])
 
@@ -29,95 +37,15 @@ cv_metrics ={
     "cv_analyze_success_total":0,
 }
 
-def _normalize_structured_data(structured_data: Dict) -> Dict:
-
-    if isinstance(structured_data, str):
-        text = structured_data.strip()
-        if text:
-            try:
-                decoded = json.loads(text)
-                if isinstance(decoded, str):
-                    decoded = json.loads(decoded)
-                if isinstance(decoded, dict):
-                    structured_data = decoded
-            except Exception:
-                structured_data = {}
-
-    if not isinstance(structured_data, dict):
-
-        structured_data = {}
-
-    def as_dict(v):
-        return v if isinstance(v, dict) else {}
-
-    def as_list(v):
-        return v if isinstance(v, list) else []
-
-    def as_dict_list(v, item_key: str = "value"):
-        if v is None:
-            return []
-        if isinstance(v, list):
-            out = []
-            for item in v:
-                if isinstance(item, dict):
-                    out.append(item)
-                elif isinstance(item, str):
-                    s = item.strip()
-                    if s:
-                        out.append({item_key: s})
-                else:
-                    s = str(item).strip()
-                    if s and s.lower() != "none":
-                        out.append({item_key: s})
-            return out
-        if isinstance(v, dict):
-            return [v]
-        if isinstance(v, str):
-            s = v.strip()
-            return [{item_key: s}] if s else []
-        s = str(v).strip()
-        return [{item_key: s}] if s else []
-
-    def as_str_list(v):
-        if v is None:
-            return []
-        if isinstance(v, list):
-            out = []
-            for item in v:
-                if isinstance(item, str):
-                    s = item.strip()
-                    if s:
-                        out.append(s)
-                else:
-                    s = str(item).strip()
-                    if s and s.lower() != "none":
-                        out.append(s)
-            return out
-        if isinstance(v, str):
-            return [s.strip() for s in v.split(",") if s.strip()]
-        return [str(v).strip()] if str(v).strip() else []
-
-    normalized = {
-        "personal_info": as_dict(structured_data.get("personal_info")),
-        "education": as_dict_list(structured_data.get("education"), item_key="entry"),
-        "experience": as_dict_list(structured_data.get("experience"), item_key="entry"),
-        "skills": as_str_list(structured_data.get("skills")),
-        "achievements": as_str_list(structured_data.get("achievements")),
-        "certifications": as_str_list(structured_data.get("certifications")),
-        "projects": as_dict_list(structured_data.get("projects"), item_key="entry"),
-        "languages": as_dict_list(structured_data.get("languages"), item_key="name"),
-        "summary": structured_data.get("summary") if isinstance(structured_data.get("summary"), str) else "",
-    }
-
-    return normalized
-
 @router .post ("/analyze",response_model =CVAnalysisResponse )
 async def analyze_cv (
 user_id :str ,
 file :UploadFile =File (...),
 use_ai :bool =True ,
 job_description :Optional [str ]=Form (None ),
-
+job_id :Optional [str ]=Form (None ),
+force_refresh :bool =False ,
+reuse_near_duplicate :bool =False ,
 request: Request = None
 ):
     """
@@ -125,6 +53,7 @@ request: Request = None
     """
     try :
         request_id = (request.headers.get("x-request-id") if request else None) or "n/a"
+        set_llm_caller (user_id =user_id )
         file_ext = os.path.splitext(file.filename or "")[1].lower()
         print (f"[CV Analysis] request_id={request_id} start filename={file .filename }, user={user_id}, AI={use_ai }")
 
@@ -169,8 +98,16 @@ request: Request = None
         await file .seek (0 )
 
 
-        file_hash =hashlib .md5 (file_content ).hexdigest ()
-        print (f"File hash: {file_hash[:8]}..., Size: {file_size} bytes")
+        file_hash =hashlib .md5 (file_content ).hexdigest ()
+        print (f"File hash: {file_hash[:8]}..., Size: {file_size} bytes")
+
+        # Re-uploads of the same file skip extraction and parsing; only JD-dependent stages re-run.
+        import asyncio 
+        cached =None 
+        if not force_refresh :
+            cached =await asyncio .to_thread (db_service .get_cached_parse ,file_hash ,use_ai and llm_service .is_available ())
+        if cached :
+            print (f"[CV Analysis] request_id={request_id} parse_cache=hit reuse_count={cached['reuse_count']}")
 
 
         suffix =".pdf"if "pdf"in file .content_type else ".docx"
@@ -181,7 +118,10 @@ request: Request = None
                 temp_path =temp_file .name 
 
 
-            raw_text =await file_parser .parse_file (file_content ,file .content_type )
+            if cached :
+                raw_text =cached ["extracted_text"]
+            else :
+                raw_text =await file_parser .parse_file (file_content ,file .content_type )
             if not raw_text or len (raw_text .strip ())<10 :
                 cv_metrics["cv_extract_fail_total"] +=1
                 print(
@@ -193,12 +133,23 @@ request: Request = None
                 content ={"success":False ,"error":"Could not extract text from file"}
                 )
 
-            print (f"Extracted {len(raw_text)} characters")
-
-
-            start_time =datetime .now ()
-
-            if use_ai and llm_service .is_available ():
+            print (f"Extracted {len(raw_text)} characters")
+
+            text_signature ,near_duplicate ,warm_start =await asyncio .to_thread (
+            _check_near_duplicate ,raw_text ,reuse_near_duplicate and not cached ,user_id 
+            )
+
+
+            start_time =datetime .now ()
+
+            if cached :
+                structured_data =cached ["structured_data"]
+                analysis_method =cached ["analysis_method"]
+            elif warm_start :
+                print (f"Warm start from near-duplicate analysis {near_duplicate['analysis_id']}")
+                structured_data =_warm_start_parse (warm_start ,raw_text )
+                analysis_method ="near_duplicate"
+            elif use_ai and llm_service .is_available ():
                 print ("Using AI parsing...")
                 try :
                     structured_data =llm_service .parse_cv_text (raw_text ,use_ai =True )
@@ -216,24 +167,21 @@ request: Request = None
             print (f"Parsing took {processing_time:.2f} seconds")
 
 
-            normalized_structured_data = _normalize_structured_data(structured_data)
+            cv_doc = CVDocument.from_structured(structured_data)
             cleaned_job_description =llm_service .clean_job_description (job_description or "") if job_description else ""
-            ats_result =ats_scorer .calculate_score (normalized_structured_data ,cleaned_job_description )
+            ats_result =ats_scorer .calculate_score (cv_doc ,cleaned_job_description )
             ats_score =ats_result .get ("score",0.0 )
             print (f"ATS Score: {ats_score}")
 
 
-            features =ats_scorer .extract_cv_features (normalized_structured_data )
+            features =ats_scorer .extract_cv_features (cv_doc )
             features .update (ats_result .get ("features",{}))
 
 
-            structured_data = normalized_structured_data
-            cv_structured_data =CVStructuredData (**structured_data )
-            required_skills = llm_service.extract_required_skills(cleaned_job_description)
-            competency_matrix = llm_service.build_competency_matrix(
-                structured_data.get("skills", []),
-                required_skills
-            )
+            structured_data = cv_doc.data
+            cv_structured_data =CVStructuredData (**structured_data )
+            required_skills = llm_service.extract_required_skills(cleaned_job_description)
+            competency_matrix = llm_service.build_competency_matrix(cv_doc, required_skills)
 
 
             try :
@@ -247,14 +195,23 @@ request: Request = None
                 "features":features ,
                 "analysis_method":analysis_method ,
                 "processing_time":processing_time ,
-                "file_path":temp_path 
-                }))
+                "file_path":temp_path ,
+                "extracted_text":raw_text ,
+                "job_id":job_id ,
+                "competency_matrix":competency_matrix ,
+                "text_signature":text_signature ,
+                "near_duplicate_of":near_duplicate ["analysis_id"] if near_duplicate else None 
+                }))
+                if not cached :
+                    asyncio.create_task(asyncio.to_thread(
+                    db_service.store_cached_parse ,file_hash ,raw_text ,structured_data ,analysis_method ,processing_time 
+                    ))
                 print ("Database save queued")
             except Exception as db_error :
                 print (f"Database save error (non-critical): {db_error}")
 
 
-            ai_intelligence =llm_service .generate_ai_intelligence (raw_text ,cleaned_job_description ) if use_ai else {}
+            ai_intelligence =llm_service .generate_ai_intelligence (raw_text ,cleaned_job_description ,cv_doc ) if use_ai else {}
             try :
                 if isinstance (ai_intelligence ,dict ):
                     print (f"[CV Analysis] AI intelligence keys: {list (ai_intelligence .keys ())}")
@@ -281,9 +238,11 @@ request: Request = None
             competency_matrix =competency_matrix ,
             cleaned_job_description =cleaned_job_description ,
             industry_ranking_score =ai_intelligence .get ("industry_ranking_score") if isinstance (ai_intelligence ,dict ) else None ,
-            industry_ranking_label =ai_intelligence .get ("industry_ranking_label") if isinstance (ai_intelligence ,dict ) else None 
-            )
-
+            industry_ranking_label =ai_intelligence .get ("industry_ranking_label") if isinstance (ai_intelligence ,dict ) else None ,
+            parse_cache =_parse_cache_info (cached ,force_refresh ),
+            near_duplicate =_near_duplicate_info (near_duplicate ,user_id ,warm_start )
+            )
+
         finally :
 
             if temp_path and os .path .exists (temp_path ):
@@ -318,11 +277,59 @@ request: Request = None
         error_message =str (e )
         )
 
-class CVTextAnalyzeRequest(BaseModel):
-    user_id: Union[str, int]
-    cv_text: str
-    use_ai: bool = True
-    job_description: Optional[str] = None
+def _parse_cache_info(cached: Optional[Dict], force_refresh: bool) -> Dict:
+    if not cached:
+        return {"hit": False, "force_refresh": force_refresh}
+    return {
+        "hit": True,
+        "force_refresh": False,
+        "cached_at": cached["created_at"],
+        "age_seconds": cached["age_seconds"],
+        "reuse_count": cached["reuse_count"],
+        "original_processing_time": cached["processing_time"],
+    }
+
+def _check_near_duplicate(raw_text: str, allow_warm_start: bool, user_id: str):
+    """MinHash the text, find the closest stored CV via LSH and, if allowed, load its parse.
+
+    Only the uploader's own analyses are reused, so a parse never carries data across accounts.
+    """
+    signature = minhash_signature(raw_text)
+    near_duplicate = get_near_duplicate_index().nearest(signature)
+    warm_start = None
+    if (allow_warm_start and near_duplicate and near_duplicate["similarity"] >= WARM_START_THRESHOLD
+            and str(near_duplicate["user_id"]) == str(user_id)):
+        prior = db_service.get_stored_analyses([near_duplicate["analysis_id"]]).get(near_duplicate["analysis_id"])
+        if prior and str(prior["user_id"]) == str(user_id):
+            warm_start = prior["structured_data"]
+    return signature_to_bytes(signature), near_duplicate, warm_start
+
+def _warm_start_parse(prior_structured_data: Dict, raw_text: str) -> Dict:
+    # The prior parse supplies the sections; contact details come only from this upload, even when
+    # the fallback parser finds none there.
+    data = normalize_structured_data(prior_structured_data)
+    fresh = FallbackCVProcessor.structure_cv_fallback(raw_text).get("personal_info") or {}
+    data["personal_info"] = normalize_structured_data({"personal_info": fresh})["personal_info"]
+    return data
+
+def _near_duplicate_info(near_duplicate: Optional[Dict], user_id: str, warm_start: Optional[Dict]) -> Optional[Dict]:
+    if not near_duplicate:
+        return None
+    return {
+        "analysis_id": near_duplicate["analysis_id"],
+        "similarity": near_duplicate["similarity"],
+        "same_user": str(near_duplicate["user_id"]) == str(user_id),
+        "warm_start": warm_start is not None,
+    }
+
+class CVTextAnalyzeRequest(BaseModel):
+    user_id: Union[str, int]
+    cv_text: str
+    use_ai: bool = True
+    job_description: Optional[str] = None
+    force_refresh: bool = False
+    reuse_near_duplicate: bool = False
+    job_id: Optional[Union[str, int]] = None
 
 class GeneratePitchRequest(BaseModel):
     cv_text: str
@@ -337,14 +344,196 @@ class HRRecommendationRequest(BaseModel):
     stored_ats_score: Optional[float] = None
     language: Optional[str] = "en"
 
+class RankCandidatesRequest(BaseModel):
+    job_description: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+    top_k: int = Field(10, ge=1, le=200)
+    min_skill_overlap: int = Field(1, ge=1)
+    weights: Optional[Dict[str, float]] = None
+
+class RescoreRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    include_ai_intelligence: bool = False
+    # LLM cleanup of the JD is off by default so a re-score stays a local, millisecond operation.
+    clean_job_description: bool = False
+    # When set, each result also updates that job's analytics.
+    job_id: Optional[Union[str, int]] = None
+
+class BatchRescoreRequest(RescoreRequest):
+    analysis_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+def _rescore_analyses(stored: List[Dict], job_description: str, include_ai_intelligence: bool) -> List[Dict]:
+    docs = [CVDocument.from_structured(item["structured_data"]) for item in stored]
+    required_skills = llm_service.extract_required_skills(job_description)
+    scores = ats_scorer.calculate_scores(
+        docs, job_description, cv_vectors=[item.get("semantic_vector") for item in stored]
+    )
+
+    results = []
+    for item, doc, ats_result in zip(stored, docs, scores):
+        features = ats_scorer.extract_cv_features(doc)
+        features.update(ats_result.get("features", {}))
+        result = {
+            "analysis_id": item["analysis_id"],
+            "user_id": item["user_id"],
+            "file_name": item["file_name"],
+            "stored_ats_score": item["stored_ats_score"],
+            "ats_score": ats_result.get("score", 0.0),
+            "feedback": ats_result.get("feedback", []),
+            "features": features,
+            "required_skills": required_skills,
+            "competency_matrix": llm_service.build_competency_matrix(doc, required_skills),
+        }
+        if include_ai_intelligence:
+            cv_text = get_cv_search_index().get_text(item["analysis_id"]) or searchable_text(doc)
+            result["ai_intelligence"] = llm_service.generate_ai_intelligence(cv_text, job_description, doc)
+        results.append(result)
+    return results
+
+def _record_job_results(job_id, results: List[Dict]) -> None:
+    for result in results:
+        db_service.record_job_analysis(job_id, result["analysis_id"], result["ats_score"], result["competency_matrix"])
+
+def _rescore_job_description(request: RescoreRequest) -> str:
+    if request.clean_job_description:
+        return llm_service.clean_job_description(request.job_description)
+    return request.job_description
+
+@router.post("/analyses/score")
+async def rescore_analyses(request: BatchRescoreRequest):
+    try:
+        import asyncio
+        stored = await asyncio.to_thread(db_service.get_stored_analyses, request.analysis_ids)
+        job_description = await asyncio.to_thread(_rescore_job_description, request)
+        found = [stored[i] for i in dict.fromkeys(request.analysis_ids) if i in stored]
+        results = await asyncio.to_thread(
+            _rescore_analyses, found, job_description, request.include_ai_intelligence
+        )
+        if request.job_id is not None:
+            await asyncio.to_thread(_record_job_results, request.job_id, results)
+        return {
+            "success": True,
+            "job_description": job_description,
+            "results": results,
+            "missing_ids": [i for i in dict.fromkeys(request.analysis_ids) if i not in stored],
+        }
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@router.post("/analyses/{analysis_id}/score")
+async def rescore_analysis(analysis_id: int, request: RescoreRequest):
+    try:
+        import asyncio
+        stored = await asyncio.to_thread(db_service.get_stored_analyses, [analysis_id])
+        if analysis_id not in stored:
+            return JSONResponse(
+                status_code=404,
+                content={"success": False, "error": "CV analysis not found"}
+            )
+        job_description = await asyncio.to_thread(_rescore_job_description, request)
+        results = await asyncio.to_thread(
+            _rescore_analyses, [stored[analysis_id]], job_description, request.include_ai_intelligence
+        )
+        if request.job_id is not None:
+            await asyncio.to_thread(_record_job_results, request.job_id, results)
+        return {"success": True, "job_description": job_description, **results[0]}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+class JobPostingIn(BaseModel):
+    job_id: Union[str, int]
+    title: Optional[str] = None
+    description: str = Field(..., min_length=1)
+    required_skills: Optional[List[str]] = None
+
+class UpsertJobsRequest(BaseModel):
+    jobs: List[JobPostingIn] = Field(..., min_length=1, max_length=1000)
+
+@router.post("/jobs")
+async def upsert_jobs(request: UpsertJobsRequest):
+    try:
+        import asyncio
+        jobs = [
+            {
+                "job_id": str(job.job_id),
+                "title": job.title,
+                "description": job.description,
+                "required_skills": job.required_skills or llm_service.extract_required_skills(job.description),
+            }
+            for job in request.jobs
+        ]
+        upserted = await asyncio.to_thread(db_service.upsert_job_postings, jobs)
+        return {"success": True, "upserted": upserted, "open_jobs": len(get_job_index())}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@router.delete("/jobs/{job_id}")
+async def close_job(job_id: str):
+    import asyncio
+    if not await asyncio.to_thread(db_service.close_job_posting, job_id):
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "Job posting not found"}
+        )
+    return {"success": True, "job_id": job_id, "open_jobs": len(get_job_index())}
+
+@router.get("/jobs/{job_id}/analytics")
+async def get_job_analytics(job_id: str, top_missing: int = Query(10, ge=1, le=100)):
+    import asyncio
+    analytics = await asyncio.to_thread(db_service.get_job_analytics, job_id, top_missing)
+    if analytics is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "No analyses recorded for this job"}
+        )
+    return {"success": True, "job_id": job_id, **analytics}
+
+@router.get("/analyses/{analysis_id}/recommended-jobs")
+async def recommend_jobs(
+    analysis_id: int,
+    top_k: int = Query(10, ge=1, le=100),
+    min_skill_overlap: int = Query(0, ge=0),
+):
+    try:
+        import asyncio
+        stored = await asyncio.to_thread(db_service.get_stored_analyses, [analysis_id])
+        if analysis_id not in stored:
+            return JSONResponse(
+                status_code=404,
+                content={"success": False, "error": "CV analysis not found"}
+            )
+        recommendations = await asyncio.to_thread(
+            get_job_index().recommend,
+            stored[analysis_id]["structured_data"],
+            limit=top_k,
+            min_skill_overlap=min_skill_overlap,
+            cv_vector=stored[analysis_id].get("semantic_vector"),
+        )
+        return {"success": True, "analysis_id": analysis_id, **recommendations}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
 @router .post ("/analyze-text")
 async def analyze_cv_text (request: CVTextAnalyzeRequest):
     """
     Analyze CV text directly
     """
     try :
-        user_id = str(request.user_id)
-        cv_text = request.cv_text
+        user_id = str(request.user_id)
+        set_llm_caller(user_id=user_id)
+        cv_text = request.cv_text
         use_ai = request.use_ai
 
         print (f"Analyzing CV text for user: {user_id}, AI: {use_ai}")
@@ -355,10 +544,25 @@ async def analyze_cv_text (request: CVTextAnalyzeRequest):
             content ={"success":False ,"error":"Text is too short or empty"}
             )
 
-        start_time =datetime .now ()
-
-
-        if use_ai and llm_service .is_available ():
+        import asyncio 
+        file_hash =hashlib .md5 (cv_text .encode ()).hexdigest ()
+        cached =None 
+        if not request.force_refresh :
+            cached =await asyncio .to_thread (db_service .get_cached_parse ,file_hash ,use_ai and llm_service .is_available ())
+        text_signature ,near_duplicate ,warm_start =await asyncio .to_thread (
+        _check_near_duplicate ,cv_text ,request.reuse_near_duplicate and not cached ,user_id 
+        )
+
+        start_time =datetime .now ()
+
+
+        if cached :
+            structured_data =cached ["structured_data"]
+            analysis_method =cached ["analysis_method"]
+        elif warm_start :
+            structured_data =_warm_start_parse (warm_start ,cv_text )
+            analysis_method ="near_duplicate"
+        elif use_ai and llm_service .is_available ():
             print ("Using AI parsing for text...")
             try :
                 structured_data =llm_service .parse_cv_text (cv_text ,use_ai =True )
@@ -375,24 +579,19 @@ async def analyze_cv_text (request: CVTextAnalyzeRequest):
         processing_time =(datetime .now ()-start_time ).total_seconds ()
 
 
-        normalized_structured_data = _normalize_structured_data(structured_data)
+        cv_doc = CVDocument.from_structured(structured_data)
         cleaned_job_description =llm_service .clean_job_description (request.job_description or "") if request.job_description else ""
-        ats_result =ats_scorer .calculate_score (normalized_structured_data ,cleaned_job_description )
-        required_skills = llm_service.extract_required_skills(cleaned_job_description)
-        competency_matrix = llm_service.build_competency_matrix(
-            normalized_structured_data.get("skills", []),
-            required_skills
-        )
+        ats_result =ats_scorer .calculate_score (cv_doc ,cleaned_job_description )
+        required_skills = llm_service.extract_required_skills(cleaned_job_description)
+        competency_matrix = llm_service.build_competency_matrix(cv_doc, required_skills)
 
 
-        features =ats_scorer .extract_cv_features (normalized_structured_data )
+        features =ats_scorer .extract_cv_features (cv_doc )
         features .update (ats_result .get ("features",{}))
-        structured_data = normalized_structured_data
+        structured_data = cv_doc.data
 
 
-        try :
-            import asyncio 
-            file_hash =hashlib .md5 (cv_text .encode ()).hexdigest ()
+        try :
             asyncio.create_task(asyncio.to_thread(db_service.save_cv_analysis, {
             "user_id":user_id ,
             "file_name":"text_input.txt",
@@ -402,12 +601,21 @@ async def analyze_cv_text (request: CVTextAnalyzeRequest):
             "features":features ,
             "analysis_method":analysis_method ,
             "processing_time":processing_time ,
-            "file_path":None 
-            }))
+            "file_path":None ,
+            "extracted_text":cv_text ,
+            "job_id":request.job_id ,
+            "competency_matrix":competency_matrix ,
+            "text_signature":text_signature ,
+            "near_duplicate_of":near_duplicate ["analysis_id"] if near_duplicate else None 
+            }))
+            if not cached :
+                asyncio.create_task(asyncio.to_thread(
+                db_service.store_cached_parse ,file_hash ,cv_text ,structured_data ,analysis_method ,processing_time 
+                ))
         except Exception as db_error :
             print (f"Database save error: {db_error}")
 
-        ai_intelligence =llm_service .generate_ai_intelligence (cv_text ,cleaned_job_description ) if use_ai else {}
+        ai_intelligence =llm_service .generate_ai_intelligence (cv_text ,cleaned_job_description ,cv_doc ) if use_ai else {}
         try :
             if isinstance (ai_intelligence ,dict ):
                 print (f"[CV Text Analysis] AI intelligence keys: {list (ai_intelligence .keys ())}")
@@ -430,10 +638,12 @@ async def analyze_cv_text (request: CVTextAnalyzeRequest):
         "ai_intelligence":ai_intelligence ,
         "cleaned_job_description":cleaned_job_description ,
         "industry_ranking_score":ai_intelligence .get ("industry_ranking_score") if isinstance (ai_intelligence ,dict ) else None ,
-        "industry_ranking_label":ai_intelligence .get ("industry_ranking_label") if isinstance (ai_intelligence ,dict ) else None 
-        }
-
-    except Exception as e :
+        "industry_ranking_label":ai_intelligence .get ("industry_ranking_label") if isinstance (ai_intelligence ,dict ) else None ,
+        "parse_cache":_parse_cache_info (cached ,request.force_refresh ),
+        "near_duplicate":_near_duplicate_info (near_duplicate ,user_id ,warm_start )
+        }
+
+    except Exception as e :
         print (f"Text analysis error: {e}")
         traceback .print_exc ()
 
@@ -484,9 +694,10 @@ async def generate_match_pitch(request: GeneratePitchRequest):
 @router.post("/hr-recommendation")
 async def generate_hr_recommendation(request: HRRecommendationRequest):
     try:
+        cv_doc = CVDocument.from_structured(request.cv_structured_data)
         payload = {
-            "cv_structured_data": request.cv_structured_data or {},
-            "cv_features_analytics": request.cv_features_analytics or {},
+            "cv_structured_data": cv_doc.data,
+            "cv_features_analytics": request.cv_features_analytics or ats_scorer.extract_cv_features(cv_doc),
             "existing_ai_intelligence": request.existing_ai_intelligence or {},
             "job_context": request.job_context or {},
             "stored_ats_score": request.stored_ats_score,
@@ -505,6 +716,110 @@ async def generate_hr_recommendation(request: HRRecommendationRequest):
             content={"success": False, "error": str(e)}
         )
 
+@router.post("/rank")
+async def rank_candidates(request: RankCandidatesRequest):
+    try:
+        required_skills = request.required_skills or llm_service.extract_required_skills(request.job_description or "")
+        if not required_skills:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": "Provide required_skills or a job_description with recognizable skills"}
+            )
+
+        ranking = get_candidate_index().rank(
+            required_skills,
+            limit=request.top_k,
+            weights=request.weights,
+            min_skill_overlap=request.min_skill_overlap,
+        )
+        return {"success": True, "indexed_analyses": len(get_candidate_index()), **ranking}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@router.get("/search")
+async def search_cvs(
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    min_ats: Optional[float] = Query(None, ge=0, le=100),
+    max_ats: Optional[float] = Query(None, ge=0, le=100),
+    match: str = Query("all", pattern="^(all|any)$"),
+):
+    try:
+        import asyncio
+        result = await asyncio.to_thread(
+            get_cv_search_index().search,
+            q,
+            page=page,
+            page_size=page_size,
+            min_ats=min_ats,
+            max_ats=max_ats,
+            match_all=match == "all",
+        )
+        return {"success": True, **result}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@router.get("/analyses")
+async def filter_cv_analyses(
+    min_years: Optional[float] = Query(None, ge=0),
+    min_ats: Optional[float] = Query(None, ge=0, le=100),
+    max_ats: Optional[float] = Query(None, ge=0, le=100),
+    has_certifications: Optional[bool] = Query(None),
+    min_projects: Optional[int] = Query(None, ge=0),
+    min_achievements: Optional[int] = Query(None, ge=0),
+    min_skills: Optional[int] = Query(None, ge=0),
+    skills: Optional[str] = Query(None, description="Comma-separated skills"),
+    match: str = Query("all", pattern="^(all|any)$"),
+    user_id: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+):
+    try:
+        import asyncio
+        result = await asyncio.to_thread(
+            db_service.find_cv_analyses,
+            min_years=min_years,
+            min_ats=min_ats,
+            max_ats=max_ats,
+            has_certifications=has_certifications,
+            min_projects=min_projects,
+            min_achievements=min_achievements,
+            min_skills=min_skills,
+            skills=[s.strip() for s in (skills or "").split(",") if s.strip()],
+            match_all_skills=match == "all",
+            user_id=user_id,
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+        return {"success": True, "page": page, "page_size": page_size, **result}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@router.get("/skills/top")
+async def get_top_skills(
+    limit: int = Query(50, ge=1, le=500),
+    min_ats: Optional[float] = Query(None, ge=0, le=100),
+):
+    try:
+        import asyncio
+        skills = await asyncio.to_thread(db_service.skill_frequencies, limit, min_ats)
+        return {"success": True, "skills": skills}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
 @router .get ("/history/{user_id}")
 async def get_cv_history (user_id :str ,limit :int =20 ):
     """
@@ -553,8 +868,9 @@ async def get_cv_analysis_status ():
         "services":{
         "file_parsing":"available"if hasattr (file_parser ,'parse_file')else "unavailable",
         "ats_scoring":"available"if hasattr (ats_scorer ,'calculate_score')else "unavailable",
-        "llm_service":"available"if llm_service .is_available ()else "unavailable"
-        },
+        "llm_service":"available"if llm_service .is_available ()else "unavailable"
+        },
+        "parse_cache":db_service .parse_cache_stats (),
         "timestamp":datetime .now ().isoformat (),
         "version":"1.0.0"
         }
@@ -573,24 +889,31 @@ async def get_cv_features (cv_id :int ):
     """
     Get extracted features for a specific CV analysis
     """
-    try :
-
-
-        return {
-        "success":True ,
-        "cv_id":cv_id ,
-        "features":{
-        "key_skills":["Python","FastAPI","Machine Learning"],
-        "years_experience":3.5 ,
-        "achievement_count":8 ,
-        "ats_score":78.5 ,
-        "has_quantifiable_results":True ,
-        "sections_complete":["experience","education","skills"]
-        },
-        "metadata":{
-        "retrieved_at":datetime .now ().isoformat (),
-        "placeholder":True 
-        }
+    try :
+        analysis =db_service .get_cv_analysis_features (cv_id )
+        if not analysis :
+            return JSONResponse (
+            status_code =404 ,
+            content ={"success":False ,"error":"CV analysis not found"}
+            )
+
+        return {
+        "success":True ,
+        "cv_id":cv_id ,
+        "features":{
+        "key_skills":analysis ["skills"],
+        "years_experience":analysis ["total_years_experience"],
+        "achievement_count":analysis ["achievement_count"],
+        "ats_score":analysis ["ats_score"],
+        "has_quantifiable_results":bool (analysis ["achievement_count"]),
+        "has_certifications":analysis ["has_certifications"],
+        "project_count":analysis ["project_count"],
+        "skills_count":analysis ["skills_count"]
+        },
+        "metadata":{
+        "retrieved_at":datetime .now ().isoformat (),
+        "analysis_created_at":analysis ["created_at"]
+        }
         }
     except Exception as e :
         print (f"Error getting features: {e}")
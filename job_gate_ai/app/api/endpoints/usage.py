@@ -0,0 +1,43 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+
+from app.services.llm_ledger import GROUP_BY_COLUMNS, current_llm_caller, get_llm_ledger
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+
+@router.get("/llm")
+async def get_llm_usage(
+    group_by: str = Query("day,call_site", description=f"Comma-separated: {', '.join(GROUP_BY_COLUMNS)}"),
+    day_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    day_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    user_id: Optional[str] = None,
+    key_id: Optional[str] = None,
+):
+    columns = [column.strip() for column in group_by.split(",") if column.strip()]
+    unknown = [column for column in columns if column not in GROUP_BY_COLUMNS]
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": f"Unknown group_by columns: {', '.join(unknown)}"}
+        )
+    try:
+        rows = await asyncio.to_thread(
+            get_llm_ledger().aggregate, columns, day_from, day_to, user_id, key_id
+        )
+        return {"success": True, "group_by": columns, "results": rows}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+
+@router.get("/llm/budget")
+async def get_llm_budget():
+    """Today's spend and remaining budget for the API key making this request."""
+    status = await asyncio.to_thread(get_llm_ledger().budget_status, current_llm_caller().get("key_id"))
+    return {"success": True, **status}
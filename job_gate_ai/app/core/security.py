@@ -1,8 +1,10 @@
 import os 
-from fastapi import HTTPException ,Security 
+from fastapi import HTTPException ,Security ,WebSocket 
 from fastapi .security import APIKeyHeader ,APIKeyQuery ,HTTPBearer ,HTTPAuthorizationCredentials 
 import jwt 
 
+from app.services.llm_ledger import set_llm_caller
+
 api_key_header =APIKeyHeader (name ="X-API-Key",auto_error =False )
 api_key_query =APIKeyQuery (name ="api_key",auto_error =False )
 bearer_scheme =HTTPBearer (auto_error =False )
@@ -27,6 +29,7 @@ async def verify_api_key (api_key :str ):
 
     valid_keys =os .getenv ("API_KEYS","test-key-123").split (",")
     if api_key in valid_keys :
+        set_llm_caller (api_key =api_key )
         return True 
 
     raise HTTPException (
@@ -54,7 +57,7 @@ credentials :HTTPAuthorizationCredentials
     audience =os .getenv ("AI_CORE_JWT_AUDIENCE","jobgate-ai-core" )
     token =credentials .credentials
     try :
-        jwt .decode (
+        claims =jwt .decode (
         token ,
         secret ,
         algorithms =["HS256"],
@@ -62,6 +65,7 @@ credentials :HTTPAuthorizationCredentials
         audience =audience ,
         options ={ "require" :["exp","iat","iss","aud"]}
         )
+        set_llm_caller (api_key =f"jwt:{claims .get ('sub')or issuer }")
         return True
     except Exception :
         raise HTTPException (
@@ -81,4 +85,15 @@ api_key :str =Security (get_api_key ),
             return await verify_internal_jwt (credentials )
         except HTTPException :
             return await verify_api_key (api_key )
-    return await verify_api_key (api_key )
\ No newline at end of file
+    return await verify_api_key (api_key )
+
+async def verify_websocket_auth (websocket :WebSocket ):
+    """verify_ai_auth for a WebSocket handshake. Browsers cannot set headers on WebSockets, so the
+    JWT may also come as the ``token`` query parameter next to ``api_key``."""
+    authorization =websocket .headers .get ("authorization","")
+    scheme ,_ ,token =authorization .partition (" ")
+    if scheme .lower ()!="bearer" :
+        token =websocket .query_params .get ("token","")
+    credentials =HTTPAuthorizationCredentials (scheme ="Bearer",credentials =token )if token else None 
+    api_key =websocket .headers .get ("x-api-key")or websocket .query_params .get ("api_key")
+    return await verify_ai_auth (credentials =credentials ,api_key =api_key )
@@ -2,10 +2,12 @@
 from fastapi import FastAPI, Security 
 from fastapi .middleware .cors import CORSMiddleware 
 from datetime import datetime 
+import asyncio
 import os 
 from dotenv import load_dotenv
-from app .api .endpoints import cv_analysis ,chatbot ,interactive_builder ,export 
+from app .api .endpoints import cv_analysis ,chatbot ,interactive_builder ,export ,usage 
 from app.core.security import verify_ai_auth
+from app.services.llm_ledger import get_llm_ledger
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"), override=False)
 
@@ -35,6 +37,36 @@ allow_headers =["*"],
 )
 
 
+@app.on_event("startup")
+async def build_search_indexes():
+    await asyncio.to_thread(cv_analysis.db_service.backfill_cv_feature_columns)
+    await asyncio.to_thread(cv_analysis.db_service.load_candidate_index)
+    await asyncio.to_thread(cv_analysis.db_service.load_job_index)
+    await asyncio.to_thread(cv_analysis.db_service.sync_cv_search_index)
+    await asyncio.to_thread(cv_analysis.db_service.load_near_duplicate_index)
+    await asyncio.to_thread(chatbot.db.migrate_chat_conversations)
+
+
+@app.on_event("startup")
+async def start_chat_session_cache():
+    chatbot.session_cache.start()
+
+
+@app.on_event("startup")
+async def resume_chat_summaries():
+    chatbot.resume_pending_summaries()
+
+
+@app.on_event("shutdown")
+async def flush_chat_sessions():
+    await chatbot.session_cache.close()
+
+
+@app.on_event("shutdown")
+async def flush_llm_ledger():
+    await asyncio.to_thread(get_llm_ledger().close)
+
+
 @app .get ("/")
 async def root ():
     return {
@@ -64,12 +96,14 @@ async def debug_auth ():
 
 
 try :
-    from app .api .endpoints import cv_analysis ,chatbot ,interactive_builder ,export 
+    from app .api .endpoints import cv_analysis ,chatbot ,interactive_builder ,export ,usage 
 
     app .include_router (cv_analysis .router, dependencies=[Security(verify_ai_auth)] )
     app .include_router (chatbot .router, dependencies=[Security(verify_ai_auth)] )
+    app .include_router (chatbot .ws_router )
     app .include_router (interactive_builder .router, dependencies=[Security(verify_ai_auth)] )
     app .include_router (export .router, dependencies=[Security(verify_ai_auth)] )
+    app .include_router (usage .router, dependencies=[Security(verify_ai_auth)] )
 
     print ("✅ All routers loaded successfully")
     print ("Available endpoints:")
@@ -79,6 +113,7 @@ try :
     print ("- GET    /cv/status          - Service status")
     print ("- POST   /chatbot/start      - Start chatbot")
     print ("- POST   /chatbot/chat       - Chat with bot")
+    print ("- WS     /chatbot/ws/{session_id} - Streaming chat")
     print ("- POST   /builder/start      - Start CV builder")
     print ("- GET    /health             - Health check")
 
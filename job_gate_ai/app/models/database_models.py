@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column ,Integer ,String ,JSON ,DateTime ,Float ,ForeignKey ,UniqueConstraint ,Text 
+from sqlalchemy import Column ,Integer ,String ,JSON ,DateTime ,Float ,ForeignKey ,UniqueConstraint ,Text ,Index ,LargeBinary 
 from sqlalchemy .ext .declarative import declarative_base 
 from sqlalchemy .orm import relationship 
 from datetime import datetime 
@@ -45,11 +45,27 @@ class CVAnalysis (Base ):
 
     file_path =Column (String (512 ))
 
+    # Hot values from ``ATSScorer.extract_cv_features`` kept as typed columns so filters run in SQL.
+    # NULL means the row predates these columns and has not been backfilled yet.
+    total_years_experience =Column (Float ,nullable =True ,index =True )
+    achievement_count =Column (Integer ,nullable =True ,index =True )
+    has_certifications =Column (Integer ,nullable =True ,index =True )
+    project_count =Column (Integer ,nullable =True ,index =True )
+    skills_count =Column (Integer ,nullable =True ,index =True )
+
+    # MinHash of the extracted text (512 bytes) and the closest earlier analysis it nearly duplicates.
+    text_signature =Column (LargeBinary ,nullable =True )
+    near_duplicate_of =Column (Integer ,nullable =True ,index =True )
+    # float32 embedding of ``CVDocument.semantic_text`` so re-scoring and job matching skip re-embedding.
+    semantic_vector =Column (LargeBinary ,nullable =True )
+
 
     user =relationship ("User",back_populates ="cv_analyses")
+    skills =relationship ("CVSkill",back_populates ="analysis",cascade ="all, delete-orphan")
 
     __table_args__ =(
     UniqueConstraint ('user_id','file_hash',name ='uix_user_file'),
+    Index ('ix_cv_analyses_ats_years','ats_score','total_years_experience'),
     )
 
     def to_dict (self ):
@@ -63,9 +79,90 @@ class CVAnalysis (Base ):
         "features":self .features ,
         "processing_time":self .processing_time ,
         "has_file":bool (self .file_path ),
-        "structured_data_keys":list (self .structured_data .keys ())if self .structured_data else []
+        "structured_data_keys":list (self .structured_data .keys ())if self .structured_data else [],
+        "total_years_experience":self .total_years_experience ,
+        "achievement_count":self .achievement_count ,
+        "has_certifications":None if self .has_certifications is None else bool (self .has_certifications ),
+        "project_count":self .project_count ,
+        "skills_count":self .skills_count ,
+        "near_duplicate_of":self .near_duplicate_of 
+        }
+
+class CVSkill (Base ):
+    __tablename__ ="cv_skills"
+
+    id =Column (Integer ,primary_key =True )
+    analysis_id =Column (Integer ,ForeignKey ('cv_analyses.id',ondelete ="CASCADE"),nullable =False ,index =True )
+    # Normalized key (taxonomy canonical form, folded) used for matching; ``name`` is the CV's own spelling.
+    skill_key =Column (String (255 ),nullable =False )
+    name =Column (String (255 ),nullable =False )
+
+    analysis =relationship ("CVAnalysis",back_populates ="skills")
+
+    __table_args__ =(
+    UniqueConstraint ('analysis_id','skill_key',name ='uix_cv_skill'),
+    Index ('ix_cv_skills_key_analysis','skill_key','analysis_id'),
+    )
+
+class CVParseCache (Base ):
+    """Extracted text and normalized parse for one file content hash, shared across uploads."""
+    __tablename__ ="cv_parse_cache"
+
+    file_hash =Column (String (255 ),primary_key =True )
+    extracted_text =Column (Text ,nullable =False )
+    structured_data =Column (JSON ,nullable =False )
+    analysis_method =Column (String (100 ),default ="fallback")
+    processing_time =Column (Float ,default =0.0 )
+    reuse_count =Column (Integer ,nullable =False ,default =0 )
+    created_at =Column (DateTime ,default =datetime .utcnow ,index =True )
+    last_used_at =Column (DateTime ,default =datetime .utcnow )
+
+class JobPosting (Base ):
+    """Open postings pushed by the backend; the in-memory job index is rebuilt from these."""
+    __tablename__ ="job_postings"
+
+    job_id =Column (String (255 ),primary_key =True )
+    title =Column (String (255 ),nullable =True )
+    description =Column (Text ,nullable =False )
+    required_skills =Column (JSON ,nullable =False ,default =list )
+    is_open =Column (Integer ,default =1 ,index =True )
+    created_at =Column (DateTime ,default =datetime .utcnow )
+    updated_at =Column (DateTime ,default =datetime .utcnow ,onupdate =datetime .utcnow )
+
+    def to_dict (self ):
+        return {
+        "job_id":self .job_id ,
+        "title":self .title ,
+        "description":self .description ,
+        "required_skills":self .required_skills or [],
+        "is_open":bool (self .is_open ),
+        "updated_at":self .updated_at .isoformat () if self .updated_at else None 
         }
 
+class JobAnalysisResult (Base ):
+    """One analysis scored against one job; the source rows that job analytics are rebuilt from."""
+    __tablename__ ="job_analysis_results"
+
+    id =Column (Integer ,primary_key =True )
+    job_id =Column (String (255 ),nullable =False ,index =True )
+    analysis_id =Column (Integer ,ForeignKey ('cv_analyses.id',ondelete ="CASCADE"),nullable =False ,index =True )
+    ats_score =Column (Float ,default =0.0 )
+    competency_matrix =Column (JSON ,nullable =False ,default =list )
+    created_at =Column (DateTime ,default =datetime .utcnow )
+    updated_at =Column (DateTime ,default =datetime .utcnow ,onupdate =datetime .utcnow )
+
+    __table_args__ =(
+    UniqueConstraint ('job_id','analysis_id',name ='uix_job_analysis'),
+    )
+
+class JobAnalytics (Base ):
+    """Running score histogram, moments and skill-gap counters per job (see ``job_analytics``)."""
+    __tablename__ ="job_analytics"
+
+    job_id =Column (String (255 ),primary_key =True )
+    aggregate =Column (JSON ,nullable =False ,default =dict )
+    updated_at =Column (DateTime ,default =datetime .utcnow ,onupdate =datetime .utcnow )
+
 class BuilderSession (Base ):
     __tablename__ ="builder_sessions"
 
@@ -136,12 +233,17 @@ class ChatbotSession (Base ):
     current_step =Column (String (100 ),default ="personal_info")
 
     cv_data =Column (JSON ,nullable =False ,default =dict )
+    # Legacy whole-conversation column; messages now live in chat_messages and this stays empty
+    # once a session is migrated (message_count is set).
     conversation =Column (JSON ,nullable =False ,default =list )
+    message_count =Column (Integer ,nullable =True )
 
     job_requirements =Column (Text ,nullable =True )
     job_posting_meta =Column (JSON ,nullable =True ,default =dict )
     score_data =Column (JSON ,nullable =True ,default =dict )
     final_summary =Column (Text ,nullable =True )
+    # Completion work runs after the final reply: NULL until complete, then pending, ready or failed.
+    summary_status =Column (String (20 ),nullable =True ,index =True )
 
     is_complete =Column (Integer ,default =0 )
     created_at =Column (DateTime ,default =datetime .utcnow )
@@ -163,12 +265,37 @@ class ChatbotSession (Base ):
         "created_at":self .created_at .isoformat () if self .created_at else None ,
         "updated_at":self .updated_at .isoformat () if self .updated_at else None ,
         "completed_at":self .completed_at .isoformat () if self .completed_at else None ,
-        "conversation_length":len (self .conversation or []),
+        "conversation_length":self .message_count if self .message_count is not None else len (self .conversation or []),
         "score":self .score_data or {},
+        "summary_status":self .summary_status ,
         "job_posting_meta":self .job_posting_meta or {}
         }
 
 
+class ChatMessage (Base ):
+    """One chatbot message; sessions only ever append, at ``seq`` = position in the conversation."""
+    __tablename__ ="chat_messages"
+
+    id =Column (Integer ,primary_key =True )
+    session_id =Column (String (255 ),ForeignKey ('ai_cv_chat_sessions.session_id',ondelete ="CASCADE"),nullable =False )
+    seq =Column (Integer ,nullable =False )
+    role =Column (String (20 ),nullable =False )
+    content =Column (Text ,nullable =False )
+    ts =Column (DateTime ,default =datetime .utcnow )
+
+    __table_args__ =(
+    UniqueConstraint ('session_id','seq',name ='uix_chat_message_seq'),
+    )
+
+    def to_dict (self ):
+        return {
+        "seq":self .seq ,
+        "role":self .role ,
+        "content":self .content ,
+        "timestamp":self .ts .isoformat () if self .ts else None ,
+        }
+
+
 class FileType (str ,Enum ):
     PDF ="application/pdf"
     DOCX ="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -34,6 +34,8 @@ class CVAnalysisResponse (BaseModel ):
     cleaned_job_description :Optional [str ]=None 
     industry_ranking_score :Optional [float ]=None 
     industry_ranking_label :Optional [str ]=None 
+    parse_cache :Optional [Dict [str ,Any ]]=None 
+    near_duplicate :Optional [Dict [str ,Any ]]=None 
 
 class ContentGenerationRequest (BaseModel ):
     user_id :str 
@@ -1,8 +1,16 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.services.cv_document import CVDocument
+from app.services.skill_taxonomy import get_skill_taxonomy
+from app.services.text_embedding import cosine_similarity, embed_job_description, get_text_embedder
 
 
 ARABIC_CHARS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
 
+CVInput = Union[CVDocument, Dict[str, Any]]
+
 
 class ATSScorer:
     def __init__(self):
@@ -17,94 +25,40 @@ class ATSScorer:
             "keyword_density": 20,
         }
 
-    def _ensure_dict(self, value: Any) -> Dict[str, Any]:
-        return value if isinstance(value, dict) else {}
-
-    def _ensure_list(self, value: Any) -> List[Any]:
-        if isinstance(value, list):
-            return value
-        if value is None:
-            return []
-        if isinstance(value, dict):
-            return [value]
-        if isinstance(value, str):
-            v = value.strip()
-            return [v] if v else []
-        return [value]
-
-    def _dict_list(self, value: Any) -> List[Dict[str, Any]]:
-        out = []
-        for item in self._ensure_list(value):
-            if isinstance(item, dict):
-                out.append(item)
-            elif isinstance(item, str):
-                s = item.strip()
-                if s:
-                    out.append({"entry": s})
-            else:
-                s = str(item).strip()
-                if s:
-                    out.append({"entry": s})
-        return out
-
-    def _string_list(self, value: Any) -> List[str]:
-        out = []
-        for item in self._ensure_list(value):
-            if isinstance(item, str):
-                s = item.strip()
-                if s:
-                    out.append(s)
-            else:
-                s = str(item).strip()
-                if s and s.lower() != "none":
-                    out.append(s)
-        return out
-
-    def _project_names(self, projects: Any) -> List[str]:
-        names = []
-        for p in self._dict_list(projects):
-            title = p.get("title") or p.get("name") or p.get("entry") or ""
-            if isinstance(title, str) and title.strip():
-                names.append(title.strip())
-        return names
-
-    def extract_cv_features(self, structured_data: Dict[str, Any]) -> Dict[str, Any]:
-        structured_data = self._ensure_dict(structured_data)
-        skills = self._string_list(structured_data.get("skills"))
-        experience = self._dict_list(structured_data.get("experience"))
-        projects = self._dict_list(structured_data.get("projects"))
-        project_names = self._project_names(projects)
+    def _document(self, cv: Any) -> CVDocument:
+        return CVDocument.from_structured(cv)
 
+    def extract_cv_features(self, structured_data: CVInput) -> Dict[str, Any]:
+        doc = self._document(structured_data)
         return {
-            "key_skills": skills,
-            "total_years_experience": self._calculate_years_experience(experience, projects),
-            "achievement_count": self._count_quantifiable_achievements(structured_data),
-            "has_education": len(self._dict_list(structured_data.get("education"))) > 0,
-            "has_certifications": len(self._string_list(structured_data.get("certifications"))) > 0,
-            "has_languages": len(self._dict_list(structured_data.get("languages"))) > 0,
-            "project_count": len(projects),
-            "project_names": project_names,
+            "key_skills": doc.skills,
+            "total_years_experience": doc.years_experience,
+            "achievement_count": doc.achievement_count,
+            "has_education": len(doc.education) > 0,
+            "has_certifications": len(doc.certifications) > 0,
+            "has_languages": len(doc.languages) > 0,
+            "project_count": len(doc.projects),
+            "project_names": doc.project_names,
         }
 
     def calculate_score(
         self,
-        structured_cv: Dict[str, Any],
+        structured_cv: CVInput,
         job_description: str = "",
         weights: Dict[str, float] = None,
     ) -> Dict[str, Any]:
-        structured_cv = self._ensure_dict(structured_cv)
-        personal_info = self._ensure_dict(structured_cv.get("personal_info"))
-        experience = self._dict_list(structured_cv.get("experience"))
-        education = self._dict_list(structured_cv.get("education"))
-        skills = self._string_list(structured_cv.get("skills"))
-        projects = self._dict_list(structured_cv.get("projects"))
+        doc = self._document(structured_cv)
+        experience = doc.experience
+        education = doc.education
+        skills = doc.skills
+        projects = doc.projects
 
         score = 0
         feedback = []
         features = {}
         _ = weights or {}
 
-        if personal_info.get("email"):
+        if doc.email:
             score += self.rules["has_contact_info"]
             feedback.append("Has contact information")
         else:
@@ -113,7 +67,7 @@ class ATSScorer:
         if len(experience) > 0:
             score += self.rules["has_work_experience"]
             feedback.append("Has work experience section")
-            features["years_experience"] = self._calculate_years_experience(experience)
+            features["years_experience"] = doc.years_experience
         else:
             feedback.append("Missing work experience section")
 
@@ -135,11 +89,11 @@ class ATSScorer:
             score += self.rules["has_projects"]
             feedback.append(f"Has projects ({len(projects)})")
             features["project_count"] = len(projects)
-            features["project_names"] = self._project_names(projects)
+            features["project_names"] = doc.project_names
         else:
             feedback.append("Missing projects section")
 
-        quantifiable_count = self._count_quantifiable_achievements(structured_cv)
+        quantifiable_count = doc.achievement_count
         if quantifiable_count > 0:
             score += self.rules["has_quantifiable_achievements"]
             feedback.append(f"Has {quantifiable_count} quantifiable achievements")
@@ -148,14 +102,16 @@ class ATSScorer:
             feedback.append("Missing quantifiable achievements")
 
         if job_description and skills:
-            job_lower = str(job_description).lower()
-            matched = [skill for skill in skills if skill.lower() in job_lower]
+            matched = self._match_job_keywords(skills, str(job_description))
             if matched:
                 keyword_bonus = min(10, len(matched) * 2)
                 score += keyword_bonus
                 features["keyword_matches"] = matched
                 feedback.append(f"Matched {len(matched)} job keywords")
 
+        if job_description:
+            features["semantic_match_score"] = self.semantic_match_score(doc, str(job_description))
+
         if quantifiable_count > 0:
             impact_bonus = round(score * 0.1, 2)
             score += impact_bonus
@@ -163,35 +119,165 @@ class ATSScorer:
 
         return {"score": min(score, 100), "feedback": feedback, "features": features}
 
-    def _calculate_years_experience(self, experience: List[Dict[str, Any]], projects: List[Dict[str, Any]] = None) -> float:
-        exp_years = len(self._dict_list(experience)) * 1.5
-        if exp_years > 0:
-            return exp_years
-        project_count = len(self._dict_list(projects or []))
-        # Project-heavy early-career profiles should not be treated as zero experience.
-        return round(project_count * 0.5, 1)
-
-    def _count_quantifiable_achievements(self, cv: Dict[str, Any]) -> int:
-        count = 0
-        cv = self._ensure_dict(cv)
-
-        for exp in self._dict_list(cv.get("experience")):
-            achievements = exp.get("achievements", [])
-            for achievement in self._string_list(achievements):
-                if any(ch.isdigit() for ch in achievement):
-                    count += 1
-        return count
-
-    def check_arabic_specific_rules(self, structured_data: Dict[str, Any]) -> List[str]:
+    def calculate_scores(
+        self,
+        structured_cvs: Sequence[CVInput],
+        job_description: str = "",
+        weights: Dict[str, float] = None,
+        cv_vectors: Optional[Sequence[Optional[np.ndarray]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Score many CVs against one job; each result equals ``calculate_score`` for that CV.
+
+        ``cv_vectors`` may hold each CV's stored embedding (or None); only the missing ones are embedded.
+
+        Each CV is reduced to section counts, an achievement count and a run of skill ids. Rule points and keyword bonuses are then computed for the whole batch with NumPy.
+        Keyword matching runs once per distinct skill string rather than once per CV.
+        """
+        docs = [self._document(cv) for cv in structured_cvs or []]
+        n = len(docs)
+        if not n:
+            return []
+        _ = weights or {}
+
+        # Columns: email, experience, education, skills, projects, quantifiable achievements.
+        rows: List[tuple] = []
+        vocab: Dict[str, int] = {}
+        skill_ids: List[int] = []
+        skill_rows: List[int] = []
+
+        for i, doc in enumerate(docs):
+            rows.append((
+                bool(doc.email),
+                len(doc.experience),
+                len(doc.education),
+                len(doc.skills),
+                len(doc.projects),
+                doc.achievement_count,
+            ))
+            for skill in doc.skills:
+                skill_ids.append(vocab.setdefault(skill, len(vocab)))
+                skill_rows.append(i)
+
+        rule_points = np.array([
+            self.rules["has_contact_info"],
+            self.rules["has_work_experience"],
+            self.rules["has_education"],
+            self.rules["has_skills_section"],
+            self.rules["has_projects"],
+            self.rules["has_quantifiable_achievements"],
+        ], dtype=np.int64)
+        present = np.array(rows, dtype=np.int64) > 0
+        scores = present.astype(np.int64) @ rule_points
+
+        occurrence_hits = np.zeros(len(skill_ids), dtype=bool)
+        if job_description and vocab:
+            matches = self._job_keyword_predicate(str(job_description))
+            vocab_hits = np.fromiter((matches(skill) for skill in vocab), dtype=bool, count=len(vocab))
+            occurrence_hits = vocab_hits[np.asarray(skill_ids, dtype=np.intp)]
+        matched_counts = np.bincount(
+            np.asarray(skill_rows, dtype=np.intp), weights=occurrence_hits, minlength=n
+        ).astype(np.int64)
+        scores = scores + np.minimum(10, matched_counts * 2)
+
+        impact_bonus = np.where(present[:, 5], np.round(scores * 0.1, 2), 0.0)
+
+        semantic = None
+        if job_description:
+            job_vector = embed_job_description(str(job_description))
+            vectors = list(cv_vectors) if cv_vectors is not None else [None] * n
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            if missing:
+                embedded = get_text_embedder().embed_many([docs[i].semantic_text for i in missing])
+                for i, vector in zip(missing, embedded):
+                    vectors[i] = vector
+            semantic = [round(max(0.0, cosine_similarity(vector, job_vector)), 4) for vector in vectors]
+
+        scores = scores.tolist()
+        matched_counts = matched_counts.tolist()
+        impact_bonus = impact_bonus.tolist()
+        occurrence_hits = occurrence_hits.tolist()
+
+        results = []
+        offset = 0
+        for i in range(n):
+            email, n_exp, n_edu, n_skills, n_projects, n_achievements = rows[i]
+            doc = docs[i]
+            skills = doc.skills
+            hits = occurrence_hits[offset:offset + n_skills]
+            offset += n_skills
+            feedback = []
+            features: Dict[str, Any] = {}
+
+            feedback.append("Has contact information" if email else "Missing contact information")
+            if n_exp:
+                feedback.append("Has work experience section")
+                features["years_experience"] = doc.years_experience
+            else:
+                feedback.append("Missing work experience section")
+            feedback.append("Has education section" if n_edu else "Missing education section")
+            if n_skills:
+                feedback.append("Has skills section")
+                features["skills_count"] = n_skills
+                features["key_skills"] = skills[:10]
+            else:
+                feedback.append("Missing skills section")
+            if n_projects:
+                feedback.append(f"Has projects ({n_projects})")
+                features["project_count"] = n_projects
+                features["project_names"] = doc.project_names
+            else:
+                feedback.append("Missing projects section")
+            if n_achievements:
+                feedback.append(f"Has {n_achievements} quantifiable achievements")
+                features["achievement_count"] = n_achievements
+            else:
+                feedback.append("Missing quantifiable achievements")
+            if matched_counts[i]:
+                features["keyword_matches"] = [skill for skill, hit in zip(skills, hits) if hit]
+                feedback.append(f"Matched {matched_counts[i]} job keywords")
+            if semantic is not None:
+                features["semantic_match_score"] = semantic[i]
+
+            score = scores[i]
+            if n_achievements:
+                features["impact_bonus"] = impact_bonus[i]
+                score += features["impact_bonus"]
+            results.append({"score": min(score, 100), "feedback": feedback, "features": features})
+        return results
+
+    def _match_job_keywords(self, skills: List[str], job_description: str) -> List[str]:
+        matches = self._job_keyword_predicate(job_description)
+        return [skill for skill in skills if matches(skill)]
+
+    def _job_keyword_predicate(self, job_description: str) -> Callable[[str], bool]:
+        taxonomy = get_skill_taxonomy()
+        job_skills = set(taxonomy.extract(job_description))
+        job_lower = job_description.lower()
+
+        def matches(skill: str) -> bool:
+            canonical = taxonomy.canonical(skill)
+            # Skills outside the taxonomy keep the plain containment check.
+            return (canonical in job_skills) if canonical else (skill.lower() in job_lower)
+
+        return matches
+
+    def semantic_match_score(self, structured_cv: CVInput, job_description: str) -> float:
+        cv_vector = get_text_embedder().embed(self._document(structured_cv).semantic_text)
+        similarity = cosine_similarity(cv_vector, embed_job_description(job_description))
+        return round(max(0.0, similarity), 4)
+
+    def _count_quantifiable_achievements(self, cv: CVInput) -> int:
+        return self._document(cv).achievement_count
+
+    def check_arabic_specific_rules(self, structured_data: CVInput) -> List[str]:
         feedback = []
-        structured_data = self._ensure_dict(structured_data)
-        personal_info = self._ensure_dict(structured_data.get("personal_info"))
+        doc = self._document(structured_data)
 
-        full_name = str(personal_info.get("full_name", ""))
+        full_name = str(doc.personal_info.get("full_name", ""))
         if full_name and not any(ch in full_name for ch in ARABIC_CHARS):
             feedback.append("Name might not be in Arabic format")
 
-        skills = self._string_list(structured_data.get("skills"))
+        skills = doc.skills
         arabic_skills = [s for s in skills if any(ch in s for ch in ARABIC_CHARS)]
         if skills and len(arabic_skills) < len(skills) / 2:
             feedback.append("Consider adding Arabic skill descriptions")
@@ -0,0 +1,181 @@
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.services.cv_document import CVDocument
+from app.services.skill_taxonomy import get_skill_taxonomy, normalize_skill_text
+from app.services.text_embedding import top_k
+
+DEFAULT_RANK_WEIGHTS = {"skills": 0.6, "ats": 0.3, "experience": 0.1}
+# Years beyond this add nothing to the experience component of the rank score.
+EXPERIENCE_CAP_YEARS = 10.0
+
+
+def skill_key(skill: Any) -> str:
+    return _skill_key(str(skill or ""))
+
+
+@lru_cache(maxsize=65536)
+def _skill_key(skill: str) -> str:
+    return normalize_skill_text(get_skill_taxonomy().normalize(skill))
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CandidateIndex:
+    """In-process inverted index from normalized skills to stored ``CVAnalysis`` ids.
+
+    Each analysis gets a dense slot; postings map a skill key to the set of slots that list it.
+    Ranking only touches slots reachable from the job's skills, so a query costs time
+    proportional to the matching postings rather than to the number of stored CVs.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slot_by_id: Dict[int, int] = {}
+        self._records: List[Optional[Dict[str, Any]]] = []
+        # Per-slot numeric columns, grown geometrically so ranking can gather them with NumPy.
+        self._ats = np.zeros(1024, dtype=np.float64)
+        self._years = np.zeros(1024, dtype=np.float64)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace the index contents with ``rows`` (see ``add_analysis`` for the row shape)."""
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self.add_analysis(**row)
+            return len(self)
+
+    def add_analysis(
+        self,
+        analysis_id: int,
+        user_id: Any = None,
+        file_name: Optional[str] = None,
+        ats_score: Any = 0.0,
+        features: Optional[Dict[str, Any]] = None,
+        structured_data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        features = features if isinstance(features, dict) else {}
+        structured_data = structured_data if isinstance(structured_data, dict) else {}
+        # features["key_skills"] is capped at the first 10 skills; index the full parsed list.
+        skills = CVDocument.from_structured(structured_data).skills if structured_data.get("skills") else []
+        skills = skills or features.get("key_skills") or []
+        if isinstance(skills, str):
+            skills = skills.split(",")
+        years = features.get("total_years_experience", features.get("years_experience"))
+
+        by_key: Dict[str, str] = {}
+        for skill in skills:
+            key = skill_key(skill)
+            if key:
+                by_key.setdefault(key, str(skill).strip())
+
+        with self._lock:
+            if analysis_id in self._slot_by_id:
+                self.remove_analysis(analysis_id)
+            slot = len(self._records)
+            self._slot_by_id[analysis_id] = slot
+            self._records.append({
+                "analysis_id": analysis_id,
+                "user_id": user_id,
+                "file_name": file_name,
+                "skills": by_key,
+            })
+            if slot >= len(self._ats):
+                self._ats = np.resize(self._ats, 2 * len(self._ats))
+                self._years = np.resize(self._years, 2 * len(self._years))
+            self._ats[slot] = _as_float(ats_score)
+            self._years[slot] = _as_float(years)
+            for key in by_key:
+                self._postings[key].add(slot)
+
+    def remove_analysis(self, analysis_id: int) -> bool:
+        with self._lock:
+            slot = self._slot_by_id.pop(analysis_id, None)
+            if slot is None:
+                return False
+            for key in self._records[slot]["skills"]:
+                postings = self._postings.get(key)
+                if postings is not None:
+                    postings.discard(slot)
+                    if not postings:
+                        del self._postings[key]
+            self._records[slot] = None
+            return True
+
+    def rank(
+        self,
+        required_skills: Iterable[Any],
+        limit: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        min_skill_overlap: int = 1,
+    ) -> Dict[str, Any]:
+        """Top candidates by weighted skill overlap, stored ATS score and capped experience."""
+        w = dict(DEFAULT_RANK_WEIGHTS)
+        w.update({k: float(v) for k, v in (weights or {}).items() if k in w})
+
+        required: Dict[str, str] = {}
+        for skill in required_skills or []:
+            key = skill_key(skill)
+            if key:
+                required.setdefault(key, str(skill).strip())
+        if not required:
+            return {"required_skills": [], "total_candidates": 0, "results": []}
+
+        with self._lock:
+            postings = [np.fromiter(self._postings[k], dtype=np.intp) for k in required if k in self._postings]
+            if not postings:
+                return {"required_skills": list(required.values()), "total_candidates": 0, "results": []}
+            slots, overlap = np.unique(np.concatenate(postings), return_counts=True)
+            keep = overlap >= max(1, int(min_skill_overlap))
+            slots, overlap = slots[keep], overlap[keep]
+
+            ats = self._ats[slots]
+            years = self._years[slots]
+            scores = (
+                w["skills"] * overlap / len(required)
+                + w["ats"] * np.clip(ats, 0.0, 100.0) / 100.0
+                + w["experience"] * np.minimum(years, EXPERIENCE_CAP_YEARS) / EXPERIENCE_CAP_YEARS
+            )
+
+            results = []
+            for i in top_k(scores, limit):
+                record = self._records[int(slots[i])]
+                candidate_skills = record["skills"]
+                results.append({
+                    "analysis_id": record["analysis_id"],
+                    "user_id": record["user_id"],
+                    "file_name": record["file_name"],
+                    "rank_score": round(float(scores[i]), 4),
+                    "skill_overlap": int(overlap[i]),
+                    "matched_skills": [candidate_skills[k] for k in required if k in candidate_skills],
+                    "missing_skills": [name for k, name in required.items() if k not in candidate_skills],
+                    "ats_score": float(ats[i]),
+                    "years_experience": float(years[i]),
+                })
+            return {
+                "required_skills": list(required.values()),
+                "total_candidates": int(len(slots)),
+                "results": results,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_candidate_index() -> CandidateIndex:
+    """Process-wide index shared by every ``DatabaseService`` instance."""
+    return CandidateIndex()
@@ -0,0 +1,251 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.services.skill_taxonomy import get_skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+# Log skip and disagreement rates every this many classified messages.
+STATS_LOG_INTERVAL = 100
+MAX_SKILL_WORDS = 4
+MAX_SKILL_CHARS = 40
+
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_PHONE_RE = re.compile(r"(?<![\w@])\+?\(?\d[\d .\-()]{7,}\d\b")
+_LINKEDIN_RE = re.compile(r"\b(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/[^\s,;]+", re.IGNORECASE)
+_GITHUB_RE = re.compile(r"\b(?:https?://)?github\.com/[^\s,;]+", re.IGNORECASE)
+# Words that may surround contact details without carrying information of their own.
+_CONTACT_FILLER_RE = re.compile(
+    r"\b(?:my|email|e-mail|mail|phone|number|mobile|tel|is|and|it's|its|linkedin|github|profile|here|"
+    r"البريد|الإلكتروني|الالكتروني|ايميلي|إيميلي|رقمي|رقم|الهاتف|الجوال|هو|و)\b",
+    re.IGNORECASE,
+)
+_NAME_PREFIX_RE = re.compile(r"^(?:my name is|my name's|name:|اسمي)\s+", re.IGNORECASE)
+# "I am ..." introduces a name only when the bot has just asked for one.
+_SELF_PREFIX_RE = re.compile(r"^(?:i am|i'm|انا|أنا)\s+", re.IGNORECASE)
+_NAME_RE = re.compile(r"^[^\W\d_]+(?:[ '\-][^\W\d_]+){1,3}$")
+_NAME_TOKEN_SPLIT_RE = re.compile(r"[ '\-]")
+# Lowercase particles that belong inside a capitalized Latin name.
+_NAME_PARTICLES = {"bin", "bint", "ibn", "abu", "al", "el", "de", "da", "van", "von"}
+_SKILLS_PREFIX_RE = re.compile(r"^(?:my skills are|skills:|i know|مهاراتي|مهاراتي هي)\s*:?\s*", re.IGNORECASE)
+_LIST_SPLIT_RE = re.compile(r"\s*(?:,|;|\n|،|\band\b|\s&\s)\s*", re.IGNORECASE)
+_SKILL_ITEM_RE = re.compile(r"^[\w+#./\- ]+$")
+_SENTENCE_WORD_RE = re.compile(
+    r"\b(?:i|we|was|were|worked|work|have|has|had|did|my|the|at|for|from|years?|company|university)\b",
+    re.IGNORECASE,
+)
+# Conversational replies that would otherwise pass for a two-word name or a one-item skill list.
+# Job titles, degrees and places also look like "two to four capitalized words".
+_NOT_NAME_RE = re.compile(
+    r"\b(?:senior|junior|lead|principal|chief|head|manager|engineer|engineering|developer|designer|analyst|"
+    r"consultant|specialist|intern|software|data|web|student|teacher|director|officer|architect|accountant|"
+    r"nurse|doctor|technician|assistant|administrator|coordinator|executive|bachelor|bachelors|master|masters|"
+    r"phd|diploma|degree|science|arts|of|in|riyadh|jeddah|dammam|mecca|makkah|medina|cairo|alexandria|giza|"
+    r"dubai|saudi|arabia|egypt|uae|emirates|jordan|amman|kuwait|qatar|doha|bahrain|oman|city|street|"
+    r"مهندس|مطور|مدير|محاسب|طالب|بكالوريوس|ماجستير|دكتوراه|الرياض|جدة|الدمام|السعودية|مصر|القاهرة|دبي)\b",
+    re.IGNORECASE,
+)
+_CHATTER_RE = re.compile(
+    r"\b(?:yes|yeah|yep|no|ok|okay|sure|hi|hello|hey|thanks|thank|please|good|great|fine|done|next|"
+    r"morning|evening|there|not|don't|dont|what|why|how|help|نعم|مرحبا|اهلا|شكرا|تمام)\b",
+    re.IGNORECASE,
+)
+_LATIN_LETTER_RE = re.compile(r"[A-Za-z]")
+_DATE_RANGE_RE = re.compile(r"^\d{4}\s*-\s*(?:\d{4}|present)$", re.IGNORECASE)
+_CONTACT_STEPS = {"personal_info", "personal_info_contact"}
+_BARE_NO_RE = re.compile(r"^(?:no|none|nope|nothing|n/?a|skip|not yet|لا|لا يوجد|لا شيء)[.!]?$", re.IGNORECASE)
+_SKIP_PATTERNS = {
+    "no_experience": re.compile(r"^(?:i have )?no (?:work )?experience(?: yet)?[.!]?$", re.IGNORECASE),
+    "no_certifications": re.compile(r"^(?:i have )?no (?:certifications|certificates)(?: yet)?[.!]?$", re.IGNORECASE),
+    "no_projects": re.compile(r"^(?:i have )?no projects(?: yet)?[.!]?$", re.IGNORECASE),
+    "no_education": re.compile(r"^(?:i have )?no (?:education|degree)(?: yet)?[.!]?$", re.IGNORECASE),
+}
+# A bare "no" answers whatever section the bot just asked about.
+_STEP_SKIP_FLAG = {"experience": "no_experience", "education": "no_education"}
+
+
+def _result(rule: str, personal_info: Optional[Dict[str, str]] = None, skills: Optional[List[str]] = None,
+            flags: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+    return {
+        "updates": {"personal_info": personal_info or {}, "skills": skills or []},
+        "flags": flags or {},
+        "intent": {},
+        "rule": rule,
+    }
+
+
+def _looks_like_phone(value: str, current_step: str) -> bool:
+    digits = sum(ch.isdigit() for ch in value)
+    if not 8 <= digits <= 15 or _DATE_RANGE_RE.match(value):
+        return False
+    return value.startswith(("+", "(", "0")) or current_step in _CONTACT_STEPS
+
+
+def _contact_details(message: str, current_step: str) -> Optional[Dict[str, str]]:
+    found: Dict[str, str] = {}
+    remainder = message
+    for field, pattern in (("linkedin", _LINKEDIN_RE), ("github", _GITHUB_RE),
+                           ("email", _EMAIL_RE), ("phone", _PHONE_RE)):
+        match = pattern.search(remainder)
+        if match:
+            if field == "phone" and not _looks_like_phone(match.group(0).strip(), current_step):
+                continue
+            found[field] = match.group(0).strip()
+            remainder = remainder[:match.start()] + " " + remainder[match.end():]
+    if not found:
+        return None
+    # Everything that is not a detail must be filler or punctuation, or the message says more.
+    leftover = _CONTACT_FILLER_RE.sub(" ", remainder)
+    if re.search(r"\w", leftover):
+        return None
+    return found
+
+
+def _capitalized_name(text: str) -> bool:
+    """Every Latin word starts with a capital letter; Arabic script has no case to check."""
+    for i, token in enumerate(_NAME_TOKEN_SPLIT_RE.split(text)):
+        if not _LATIN_LETTER_RE.search(token) or token[0].isupper():
+            continue
+        if i == 0 or token not in _NAME_PARTICLES:
+            return False
+    return True
+
+
+def _name(message: str, current_step: str) -> Optional[str]:
+    text = message.strip(" .!")
+    stripped = _NAME_PREFIX_RE.sub("", text)
+    if current_step == "personal_info":
+        stripped = _SELF_PREFIX_RE.sub("", stripped)
+    elif stripped == text:
+        return None
+    if not _NAME_RE.match(stripped) or not _capitalized_name(stripped):
+        return None
+    if _SENTENCE_WORD_RE.search(stripped) or _CHATTER_RE.search(stripped) or _NOT_NAME_RE.search(stripped):
+        return None
+    return stripped
+
+
+def _skill_list(message: str, current_step: str) -> Optional[List[str]]:
+    text = _SKILLS_PREFIX_RE.sub("", message).strip(" .")
+    has_prefix = text != message.strip(" .")
+    items = [item.strip() for item in _LIST_SPLIT_RE.split(text) if item and item.strip()]
+    if current_step != "skills" and not has_prefix:
+        return None
+    if not items:
+        return None
+    for item in items:
+        if (len(item) > MAX_SKILL_CHARS or len(item.split()) > MAX_SKILL_WORDS
+                or not _SKILL_ITEM_RE.match(item) or _SENTENCE_WORD_RE.search(item)
+                or _CHATTER_RE.search(item)):
+            return None
+    # A lone word such as "continue" or "everything" is only a skill if the taxonomy knows it.
+    if len(items) == 1 and not get_skill_taxonomy().canonical(items[0]):
+        return None
+    return items
+
+
+def classify_message(
+    message: str, current_step: str, personal_info: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Deterministic extraction for messages that are obviously just one kind of answer.
+
+    Returns the same ``updates`` / ``flags`` / ``intent`` shape as the LLM extractor plus the name
+    of the ``rule`` that fired, or ``None`` when the message needs the LLM. Rules only fire when
+    the whole message is accounted for, so anything with extra free text goes to the LLM.
+    ``personal_info`` is what the CV already holds; a name that is already filled is never
+    replaced by a rule, since the message is more likely something else or a correction.
+    """
+    text = (message or "").strip()
+    if not text or len(text) > 300:
+        return None
+
+    for flag, pattern in _SKIP_PATTERNS.items():
+        if pattern.match(text):
+            return _result("skip_flag", flags={flag: True})
+    if _BARE_NO_RE.match(text) and current_step in _STEP_SKIP_FLAG:
+        return _result("skip_flag", flags={_STEP_SKIP_FLAG[current_step]: True})
+
+    contact = _contact_details(text, current_step)
+    if contact:
+        return _result("contact", personal_info=contact)
+
+    name = None if (personal_info or {}).get("full_name") else _name(text, current_step)
+    if name:
+        return _result("name", personal_info={"full_name": name})
+
+    skills = _skill_list(text, current_step)
+    if skills:
+        return _result("skills", skills=skills)
+    return None
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[\s\-().]", "", str(value or "")).lower()
+
+
+def extraction_disagrees(rules: Dict[str, Any], llm: Dict[str, Any]) -> bool:
+    """Whether the LLM read any field the rules set differently."""
+    rule_updates, llm_updates = rules.get("updates") or {}, llm.get("updates") or {}
+    llm_personal = llm_updates.get("personal_info") or {}
+    for field, value in (rule_updates.get("personal_info") or {}).items():
+        if _normalize(value) != _normalize(llm_personal.get(field)):
+            return True
+    rule_skills = {_normalize(s) for s in rule_updates.get("skills") or []}
+    if rule_skills and rule_skills != {_normalize(s) for s in llm_updates.get("skills") or [] if s}:
+        return True
+    llm_flags = llm.get("flags") or {}
+    return any(value and not llm_flags.get(flag) for flag, value in (rules.get("flags") or {}).items())
+
+
+class ClassifierStats:
+    """Running counts of rule hits and audit disagreements, for tuning the rules."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.rule_handled = 0
+        self.audited = 0
+        self.disagreements = 0
+        self.by_rule: Dict[str, int] = {}
+
+    def record_message(self, rule: Optional[str]) -> None:
+        with self._lock:
+            self.messages += 1
+            if rule:
+                self.rule_handled += 1
+                self.by_rule[rule] = self.by_rule.get(rule, 0) + 1
+            should_log = self.messages % STATS_LOG_INTERVAL == 0
+        if should_log:
+            self.log()
+
+    def record_audit(self, disagreed: bool, rule: Optional[str] = None) -> None:
+        with self._lock:
+            self.audited += 1
+            if disagreed:
+                self.disagreements += 1
+        if disagreed:
+            logger.info(f"Chat classifier rule '{rule}' disagreed with the LLM extraction")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "messages": self.messages,
+                "rule_handled": self.rule_handled,
+                "skip_rate": round(self.rule_handled / self.messages, 4) if self.messages else 0.0,
+                "audited": self.audited,
+                "disagreement_rate": round(self.disagreements / self.audited, 4) if self.audited else 0.0,
+                "by_rule": dict(self.by_rule),
+            }
+
+    def log(self) -> None:
+        stats = self.snapshot()
+        logger.info(
+            f"Chat classifier: {stats['rule_handled']}/{stats['messages']} turns skipped the LLM "
+            f"(skip rate {stats['skip_rate']:.1%}), disagreement {stats['disagreement_rate']:.1%} "
+            f"over {stats['audited']} audits, by rule {stats['by_rule']}"
+        )
+
+
+classifier_stats = ClassifierStats()
@@ -0,0 +1,204 @@
+import json
+import re
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from app.services.skill_matcher import SkillMatcher
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def as_dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def as_dict_list(value: Any, item_key: str = "value") -> List[Dict[str, Any]]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        out = []
+        for item in value:
+            if isinstance(item, dict):
+                out.append(item)
+            elif isinstance(item, str):
+                s = item.strip()
+                if s:
+                    out.append({item_key: s})
+            else:
+                s = str(item).strip()
+                if s and s.lower() != "none":
+                    out.append({item_key: s})
+        return out
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, str):
+        s = value.strip()
+        return [{item_key: s}] if s else []
+    s = str(value).strip()
+    return [{item_key: s}] if s else []
+
+
+def as_str_list(value: Any, split_commas: bool = True) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        out = []
+        for item in value:
+            if isinstance(item, str):
+                s = item.strip()
+                if s:
+                    out.append(s)
+            else:
+                s = str(item).strip()
+                if s and s.lower() != "none":
+                    out.append(s)
+        return out
+    if isinstance(value, str):
+        if split_commas:
+            return [s.strip() for s in value.split(",") if s.strip()]
+        return [value.strip()] if value.strip() else []
+    s = str(value).strip()
+    return [s] if s else []
+
+
+def normalize_structured_data(structured_data: Any) -> Dict[str, Any]:
+    """Coerce parser or LLM output (possibly a JSON string) into the canonical CV shape."""
+    if isinstance(structured_data, str):
+        text = structured_data.strip()
+        if text:
+            try:
+                decoded = json.loads(text)
+                if isinstance(decoded, str):
+                    decoded = json.loads(decoded)
+                if isinstance(decoded, dict):
+                    structured_data = decoded
+            except Exception:
+                structured_data = {}
+
+    if not isinstance(structured_data, dict):
+        structured_data = {}
+
+    return {
+        "personal_info": as_dict(structured_data.get("personal_info")),
+        "education": as_dict_list(structured_data.get("education"), item_key="entry"),
+        "experience": as_dict_list(structured_data.get("experience"), item_key="entry"),
+        "skills": as_str_list(structured_data.get("skills")),
+        "achievements": as_str_list(structured_data.get("achievements")),
+        "certifications": as_str_list(structured_data.get("certifications")),
+        "projects": as_dict_list(structured_data.get("projects"), item_key="entry"),
+        "languages": as_dict_list(structured_data.get("languages"), item_key="name"),
+        "summary": structured_data.get("summary") if isinstance(structured_data.get("summary"), str) else "",
+    }
+
+
+class CVDocument:
+    """A normalized CV, built once per request and passed to every consumer.
+
+    Sections are normalized up front; derived views (skill set, tokens, achievement count,
+    project names, the text used for embeddings, the fuzzy skill matcher) are computed on
+    first access and cached on the instance.
+    """
+
+    __slots__ = (
+        "data",
+        "personal_info",
+        "education",
+        "experience",
+        "skills",
+        "certifications",
+        "projects",
+        "languages",
+        "_skill_set",
+        "_token_set",
+        "_achievement_count",
+        "_project_names",
+        "_semantic_text",
+        "_skill_matcher",
+    )
+
+    def __init__(self, data: Dict[str, Any]):
+        """``data`` must already be in the shape returned by ``normalize_structured_data``."""
+        self.data = data
+        self.personal_info: Dict[str, Any] = data["personal_info"]
+        self.education: List[Dict[str, Any]] = data["education"]
+        self.experience: List[Dict[str, Any]] = data["experience"]
+        self.skills: List[str] = data["skills"]
+        self.certifications: List[str] = data["certifications"]
+        self.projects: List[Dict[str, Any]] = data["projects"]
+        self.languages: List[Dict[str, Any]] = data["languages"]
+        self._skill_set: Optional[FrozenSet[str]] = None
+        self._token_set: Optional[FrozenSet[str]] = None
+        self._achievement_count: Optional[int] = None
+        self._project_names: Optional[List[str]] = None
+        self._semantic_text: Optional[str] = None
+        self._skill_matcher: Optional[SkillMatcher] = None
+
+    @classmethod
+    def from_structured(cls, structured_data: Any) -> "CVDocument":
+        if isinstance(structured_data, cls):
+            return structured_data
+        return cls(normalize_structured_data(structured_data))
+
+    @property
+    def email(self) -> Any:
+        return self.personal_info.get("email")
+
+    @property
+    def skill_set(self) -> FrozenSet[str]:
+        if self._skill_set is None:
+            self._skill_set = frozenset(skill.lower() for skill in self.skills)
+        return self._skill_set
+
+    @property
+    def token_set(self) -> FrozenSet[str]:
+        if self._token_set is None:
+            self._token_set = frozenset(_TOKEN_RE.findall(self.semantic_text.lower()))
+        return self._token_set
+
+    @property
+    def achievement_count(self) -> int:
+        """Experience achievements containing a number."""
+        if self._achievement_count is None:
+            count = 0
+            for exp in self.experience:
+                for achievement in as_str_list(exp.get("achievements", []), split_commas=False):
+                    if any(ch.isdigit() for ch in achievement):
+                        count += 1
+            self._achievement_count = count
+        return self._achievement_count
+
+    @property
+    def project_names(self) -> List[str]:
+        if self._project_names is None:
+            names = []
+            for project in self.projects:
+                title = project.get("title") or project.get("name") or project.get("entry") or ""
+                if isinstance(title, str) and title.strip():
+                    names.append(title.strip())
+            self._project_names = names
+        return self._project_names
+
+    @property
+    def years_experience(self) -> float:
+        if self.experience:
+            return len(self.experience) * 1.5
+        # Project-heavy early-career profiles should not be treated as zero experience.
+        return round(len(self.projects) * 0.5, 1)
+
+    @property
+    def semantic_text(self) -> str:
+        """Skills, certifications and section text joined for embedding and search."""
+        if self._semantic_text is None:
+            parts = list(self.skills) + list(self.certifications)
+            for section in (self.experience, self.projects, self.education):
+                for item in section:
+                    for value in item.values():
+                        if isinstance(value, (list, str)):
+                            parts += as_str_list(value, split_commas=False)
+            self._semantic_text = "\n".join(parts)
+        return self._semantic_text
+
+    @property
+    def skill_matcher(self) -> SkillMatcher:
+        if self._skill_matcher is None:
+            self._skill_matcher = SkillMatcher(self.skills)
+        return self._skill_matcher
@@ -0,0 +1,215 @@
+import os
+import re
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.cv_document import CVDocument
+from app.services.skill_taxonomy import normalize_skill_text
+
+DEFAULT_SEARCH_DB_PATH = os.path.join(".", "data", "cv_search.sqlite3")
+
+_ARABIC_DIACRITICS_RE = re.compile(r"[\u064b-\u0652\u0670]")
+_TOKEN_RE = re.compile(r"\w+")
+# Definite article and the clitics that attach to it, longest first.
+_ARABIC_ARTICLES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cv_search_docs (
+        analysis_id INTEGER PRIMARY KEY,
+        user_id TEXT,
+        file_name TEXT,
+        ats_score REAL NOT NULL DEFAULT 0,
+        extracted_text BLOB,
+        indexed_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_cv_search_docs_ats ON cv_search_docs (ats_score)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cv_search_fts USING fts5(body, tokenize='unicode61 remove_diacritics 2')",
+)
+
+
+def _strip_article(token: str) -> str:
+    if "\u0600" <= token[0] <= "\u06ff":
+        for prefix in _ARABIC_ARTICLES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                return token[len(prefix):]
+    return token
+
+
+def search_tokens(text: Any) -> List[str]:
+    """Lowercase, fold Arabic letter variants, drop harakat and the definite article."""
+    norm = _ARABIC_DIACRITICS_RE.sub("", normalize_skill_text(text))
+    return [_strip_article(token) for token in _TOKEN_RE.findall(norm)]
+
+
+def searchable_text(structured_data: Any) -> str:
+    """Stand-in for extracted text on analyses stored before raw text was kept."""
+    doc = CVDocument.from_structured(structured_data)
+    header = [str(v) for v in doc.personal_info.values() if isinstance(v, (str, int, float))]
+    return "\n".join(header + [doc.data.get("summary") or "", doc.semantic_text])
+
+
+class CVSearchIndex:
+    """BM25 full-text search over extracted CV text, kept in its own SQLite FTS5 file.
+
+    The file is separate from ``DATABASE_URL`` so search works the same whether the main
+    store is SQLite or MySQL. Raw extracted text is kept zlib-compressed next to the index;
+    the FTS table holds the normalized tokens that both documents and queries go through.
+    """
+
+    def __init__(self, path: str = DEFAULT_SEARCH_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add_document(
+        self,
+        analysis_id: int,
+        text: str,
+        user_id: Any = None,
+        file_name: Optional[str] = None,
+        ats_score: Any = 0.0,
+    ) -> None:
+        body = " ".join(search_tokens(text))
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cv_search_fts WHERE rowid = ?", (analysis_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO cv_search_docs "
+                "(analysis_id, user_id, file_name, ats_score, extracted_text, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_id,
+                    None if user_id is None else str(user_id),
+                    file_name,
+                    float(ats_score or 0.0),
+                    zlib.compress((text or "").encode("utf-8")),
+                    datetime.utcnow().isoformat(),
+                ),
+            )
+            conn.execute("INSERT INTO cv_search_fts (rowid, body) VALUES (?, ?)", (analysis_id, body))
+
+    def remove_document(self, analysis_id: int) -> bool:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cv_search_fts WHERE rowid = ?", (analysis_id,))
+            return conn.execute("DELETE FROM cv_search_docs WHERE analysis_id = ?", (analysis_id,)).rowcount > 0
+
+    def get_text(self, analysis_id: int) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT extracted_text FROM cv_search_docs WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def indexed_ids(self) -> Set[int]:
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute("SELECT analysis_id FROM cv_search_docs")}
+
+    def search(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = 20,
+        min_ats: Optional[float] = None,
+        max_ats: Optional[float] = None,
+        match_all: bool = True,
+    ) -> Dict[str, Any]:
+        """Rank matches by BM25; ``match_all=False`` accepts documents with any query term."""
+        tokens = list(dict.fromkeys(search_tokens(query)))
+        page = max(1, int(page))
+        page_size = max(1, int(page_size))
+        empty = {"query_terms": tokens, "total": 0, "page": page, "page_size": page_size, "results": []}
+        if not tokens:
+            return empty
+
+        match = (" AND " if match_all else " OR ").join(f'"{token}"' for token in tokens)
+        filters: List[str] = []
+        params: List[Any] = [match]
+        if min_ats is not None:
+            filters.append("d.ats_score >= ?")
+            params.append(float(min_ats))
+        if max_ats is not None:
+            filters.append("d.ats_score <= ?")
+            params.append(float(max_ats))
+        offset = (page - 1) * page_size
+
+        with closing(self._connect()) as conn:
+            if filters:
+                base = (
+                    " FROM cv_search_fts JOIN cv_search_docs d ON d.analysis_id = cv_search_fts.rowid"
+                    " WHERE cv_search_fts MATCH ? AND " + " AND ".join(filters)
+                )
+                total = conn.execute("SELECT COUNT(*)" + base, params).fetchone()[0]
+                page_sql = (
+                    "SELECT cv_search_fts.rowid, bm25(cv_search_fts) AS score" + base
+                    + " ORDER BY score LIMIT ? OFFSET ?"
+                )
+            else:
+                # Without an ATS filter both the count and the ranking stay inside the FTS index.
+                total = conn.execute(
+                    "SELECT COUNT(*) FROM cv_search_fts WHERE cv_search_fts MATCH ?", params
+                ).fetchone()[0]
+                page_sql = (
+                    "SELECT rowid, bm25(cv_search_fts) AS score"
+                    " FROM cv_search_fts WHERE cv_search_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?"
+                )
+            if not total:
+                return empty
+            hits = conn.execute(page_sql, params + [page_size, offset]).fetchall()
+            # Document rows and snippets are only read for the requested page, not every match.
+            ids = [hit[0] for hit in hits]
+            placeholders = ", ".join("?" * len(ids))
+            docs, snippets = {}, {}
+            if ids:
+                docs = {
+                    row[0]: row[1:]
+                    for row in conn.execute(
+                        "SELECT analysis_id, user_id, file_name, ats_score FROM cv_search_docs"
+                        f" WHERE analysis_id IN ({placeholders})",
+                        ids,
+                    )
+                }
+                snippets = dict(conn.execute(
+                    "SELECT rowid, snippet(cv_search_fts, 0, '[', ']', '...', 12) FROM cv_search_fts"
+                    f" WHERE cv_search_fts MATCH ? AND rowid IN ({placeholders})",
+                    [match] + ids,
+                ))
+
+        results = []
+        for analysis_id, score in hits:
+            user_id, file_name, ats_score = docs.get(analysis_id, (None, None, None))
+            results.append({
+                "analysis_id": analysis_id,
+                "user_id": user_id,
+                "file_name": file_name,
+                "ats_score": ats_score,
+                # SQLite's bm25() is lower-is-better; flip it so larger means more relevant.
+                "relevance": round(-score, 4),
+                "snippet": snippets.get(analysis_id),
+            })
+
+        return {
+            "query_terms": tokens,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "results": results,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_cv_search_index() -> CVSearchIndex:
+    return CVSearchIndex(os.getenv("CV_SEARCH_DB_PATH") or DEFAULT_SEARCH_DB_PATH)
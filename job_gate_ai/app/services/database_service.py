@@ -1,13 +1,51 @@
 import os
+import threading
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, func, or_, text
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import sessionmaker
-
-from app.models.database_models import Base, User, CVAnalysis, BuilderSession, ChatbotSession
+from sqlalchemy.orm import defer, sessionmaker
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.models.database_models import (
+    Base, User, CVAnalysis, CVSkill, CVParseCache, JobPosting, JobAnalysisResult, JobAnalytics,
+    BuilderSession, ChatbotSession, ChatMessage,
+)
+from app.services.ats_scorer import ATSScorer
+from app.services.candidate_index import get_candidate_index, skill_key
+from app.services.cv_document import CVDocument
+from app.services.cv_search import get_cv_search_index, searchable_text
+from app.services import job_analytics
+from app.services.job_index import get_job_index
+from app.services.near_duplicates import (
+    get_near_duplicate_index, minhash_signature, signature_from_bytes, signature_to_bytes
+)
+from app.services.schema_migrations import add_missing_columns
+from app.services.text_embedding import get_text_embedder, vector_from_bytes, vector_to_bytes
+
+_feature_extractor = ATSScorer()
+
+
+def materialized_features(structured_data: Any) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Typed ``CVAnalysis`` feature columns and the ``{skill_key: name}`` rows for ``cv_skills``."""
+    doc = CVDocument.from_structured(structured_data)
+    features = _feature_extractor.extract_cv_features(doc)
+    skills: Dict[str, str] = {}
+    for name in features["key_skills"]:
+        key = skill_key(name)[:255]
+        if key:
+            skills.setdefault(key, name[:255])
+    columns = {
+        "total_years_experience": float(features["total_years_experience"]),
+        "achievement_count": int(features["achievement_count"]),
+        "has_certifications": 1 if features["has_certifications"] else 0,
+        "project_count": int(features["project_count"]),
+        "skills_count": len(skills),
+        "semantic_vector": vector_to_bytes(get_text_embedder().embed(doc.semantic_text)),
+    }
+    return columns, skills
 
 
 class DatabaseService:
@@ -24,8 +62,16 @@ class DatabaseService:
             expire_on_commit=False,
             bind=self.engine,
         )
+        # Cached parses older than this are ignored and replaced on the next upload.
+        self.parse_cache_ttl = timedelta(hours=float(os.getenv("CV_PARSE_CACHE_TTL_HOURS", "720")))
+        # Serializes read-modify-write of job aggregates within the process; SELECT ... FOR UPDATE
+        # covers other processes on databases that support it.
+        self._job_analytics_lock = threading.Lock()
 
         Base.metadata.create_all(bind=self.engine)
+        added = add_missing_columns(self.engine)
+        if added:
+            print(f"? Added database columns: {', '.join(added)}")
         self._test_connection()
 
     def _test_connection(self):
@@ -62,6 +108,18 @@ class DatabaseService:
             return self._get_or_create_user(session, user_id, email)
 
     def save_cv_analysis(self, analysis_data: Dict) -> Optional[CVAnalysis]:
+        """Store an analysis; with ``job_id`` in ``analysis_data`` it also feeds that job's analytics."""
+        cv_analysis = self._save_cv_analysis(analysis_data)
+        if cv_analysis is not None and analysis_data.get("job_id"):
+            self.record_job_analysis(
+                analysis_data["job_id"],
+                cv_analysis.id,
+                analysis_data.get("ats_score", 0.0),
+                analysis_data.get("competency_matrix") or [],
+            )
+        return cv_analysis
+
+    def _save_cv_analysis(self, analysis_data: Dict) -> Optional[CVAnalysis]:
         try:
             with self.get_session() as session:
                 user = self._get_or_create_user(session, analysis_data["user_id"])
@@ -88,12 +146,18 @@ class DatabaseService:
                     analysis_method=analysis_data.get("analysis_method", "fallback"),
                     processing_time=analysis_data.get("processing_time", 0.0),
                     file_path=analysis_data.get("file_path"),
+                    text_signature=analysis_data.get("text_signature"),
+                    near_duplicate_of=analysis_data.get("near_duplicate_of"),
                 )
+                self._materialize_features(cv_analysis)
 
                 session.add(cv_analysis)
                 session.flush()
                 print(f"? Saved CV analysis: {cv_analysis.id}")
-                return cv_analysis
+
+            # Index only after the commit so searches never return a rolled-back row.
+            self._index_cv_analysis(cv_analysis, analysis_data["user_id"], analysis_data.get("extracted_text"))
+            return cv_analysis
         except IntegrityError as e:
             print(f"Integrity error saving CV analysis: {e}")
             return None
@@ -101,6 +165,502 @@ class DatabaseService:
             print(f"Error saving CV analysis: {e}")
             return None
 
+    def _index_cv_analysis(self, cv_analysis: CVAnalysis, user_id: str, extracted_text: Optional[str] = None):
+        get_candidate_index().add_analysis(
+            analysis_id=cv_analysis.id,
+            user_id=user_id,
+            file_name=cv_analysis.file_name,
+            ats_score=cv_analysis.ats_score,
+            features=cv_analysis.features,
+            structured_data=cv_analysis.structured_data,
+        )
+        if cv_analysis.text_signature:
+            get_near_duplicate_index().add(
+                cv_analysis.id, signature_from_bytes(cv_analysis.text_signature), user_id
+            )
+        try:
+            get_cv_search_index().add_document(
+                cv_analysis.id,
+                extracted_text or searchable_text(cv_analysis.structured_data),
+                user_id=user_id,
+                file_name=cv_analysis.file_name,
+                ats_score=cv_analysis.ats_score,
+            )
+        except Exception as e:
+            print(f"Error indexing CV text for search: {e}")
+
+    def get_cached_parse(self, file_hash: str, require_ai: bool = False) -> Optional[Dict[str, Any]]:
+        """Cached text and structured data for ``file_hash``, counting the reuse.
+
+        ``require_ai`` skips entries produced by the fallback parser so an AI request is not
+        served a lower-quality parse.
+        """
+        if not file_hash:
+            return None
+        try:
+            with self.get_session() as session:
+                entry = session.get(CVParseCache, file_hash)
+                if not entry:
+                    return None
+                now = datetime.utcnow()
+                if now - entry.created_at > self.parse_cache_ttl:
+                    return None
+                if require_ai and entry.analysis_method != "ai":
+                    return None
+                session.query(CVParseCache).filter_by(file_hash=file_hash).update(
+                    {
+                        CVParseCache.reuse_count: CVParseCache.reuse_count + 1,
+                        CVParseCache.last_used_at: now,
+                    },
+                    synchronize_session=False,
+                )
+                return {
+                    "file_hash": file_hash,
+                    "extracted_text": entry.extracted_text,
+                    "structured_data": entry.structured_data,
+                    "analysis_method": entry.analysis_method,
+                    "processing_time": entry.processing_time,
+                    "reuse_count": (entry.reuse_count or 0) + 1,
+                    "created_at": entry.created_at.isoformat(),
+                    "age_seconds": round((now - entry.created_at).total_seconds(), 1),
+                }
+        except Exception as e:
+            print(f"Error reading parse cache: {e}")
+            return None
+
+    def store_cached_parse(
+        self,
+        file_hash: str,
+        extracted_text: str,
+        structured_data: Dict,
+        analysis_method: str,
+        processing_time: float = 0.0,
+    ) -> bool:
+        if not file_hash:
+            return False
+        try:
+            with self.get_session() as session:
+                entry = session.get(CVParseCache, file_hash) or CVParseCache(file_hash=file_hash)
+                now = datetime.utcnow()
+                entry.extracted_text = extracted_text
+                entry.structured_data = structured_data
+                entry.analysis_method = analysis_method
+                entry.processing_time = processing_time
+                entry.reuse_count = 0
+                entry.created_at = now
+                entry.last_used_at = now
+                session.add(entry)
+            return True
+        except IntegrityError:
+            # A concurrent upload of the same file stored it first; either copy is fine.
+            return False
+        except Exception as e:
+            print(f"Error writing parse cache: {e}")
+            return False
+
+    def parse_cache_stats(self) -> Dict[str, Any]:
+        try:
+            with self.get_session() as session:
+                entries, reuses, oldest = session.query(
+                    func.count(CVParseCache.file_hash),
+                    func.coalesce(func.sum(CVParseCache.reuse_count), 0),
+                    func.min(CVParseCache.created_at),
+                ).one()
+                return {
+                    "entries": entries,
+                    "total_reuses": int(reuses),
+                    "oldest_entry": oldest.isoformat() if oldest else None,
+                    "ttl_hours": self.parse_cache_ttl.total_seconds() / 3600,
+                }
+        except Exception as e:
+            print(f"Error reading parse cache stats: {e}")
+            return {}
+
+    def _materialize_features(self, cv_analysis: CVAnalysis):
+        columns, skills = materialized_features(cv_analysis.structured_data)
+        for name, value in columns.items():
+            setattr(cv_analysis, name, value)
+        cv_analysis.skills = [CVSkill(skill_key=key, name=name) for key, name in skills.items()]
+
+    def backfill_cv_feature_columns(self, batch_size: int = 500) -> int:
+        """Fill feature columns, the semantic vector and ``cv_skills`` for analyses saved before they existed."""
+        total = 0
+        try:
+            while True:
+                with self.get_session() as session:
+                    rows = (
+                        session.query(CVAnalysis)
+                        .filter(or_(CVAnalysis.skills_count.is_(None), CVAnalysis.semantic_vector.is_(None)))
+                        .order_by(CVAnalysis.id)
+                        .limit(batch_size)
+                        .all()
+                    )
+                    for cv_analysis in rows:
+                        session.query(CVSkill).filter_by(analysis_id=cv_analysis.id).delete()
+                        self._materialize_features(cv_analysis)
+                    total += len(rows)
+                if len(rows) < batch_size:
+                    break
+            if total:
+                print(f"? Backfilled CV feature columns: {total} analyses")
+            return total
+        except Exception as e:
+            print(f"Error backfilling CV feature columns: {e}")
+            return total
+
+    def find_cv_analyses(
+        self,
+        min_years: Optional[float] = None,
+        min_ats: Optional[float] = None,
+        max_ats: Optional[float] = None,
+        has_certifications: Optional[bool] = None,
+        min_projects: Optional[int] = None,
+        min_achievements: Optional[int] = None,
+        min_skills: Optional[int] = None,
+        skills: Optional[Iterable[str]] = None,
+        match_all_skills: bool = True,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Filter stored analyses on the materialized columns, best ATS score first."""
+        try:
+            with self.get_session() as session:
+                query = session.query(CVAnalysis)
+                if user_id is not None:
+                    query = query.join(User, CVAnalysis.user_id == User.id).filter(User.user_id == user_id)
+                if min_years is not None:
+                    query = query.filter(CVAnalysis.total_years_experience >= min_years)
+                if min_ats is not None:
+                    query = query.filter(CVAnalysis.ats_score >= min_ats)
+                if max_ats is not None:
+                    query = query.filter(CVAnalysis.ats_score <= max_ats)
+                if has_certifications is not None:
+                    query = query.filter(CVAnalysis.has_certifications == (1 if has_certifications else 0))
+                if min_projects is not None:
+                    query = query.filter(CVAnalysis.project_count >= min_projects)
+                if min_achievements is not None:
+                    query = query.filter(CVAnalysis.achievement_count >= min_achievements)
+                if min_skills is not None:
+                    query = query.filter(CVAnalysis.skills_count >= min_skills)
+
+                keys = list(dict.fromkeys(k for k in (skill_key(s)[:255] for s in skills or []) if k))
+                if keys:
+                    matching = (
+                        session.query(CVSkill.analysis_id)
+                        .filter(CVSkill.skill_key.in_(keys))
+                        .group_by(CVSkill.analysis_id)
+                        .having(func.count(CVSkill.skill_key) >= (len(keys) if match_all_skills else 1))
+                    )
+                    query = query.filter(CVAnalysis.id.in_(matching))
+
+                total = query.count()
+                analyses = (
+                    query.order_by(CVAnalysis.ats_score.desc(), CVAnalysis.id.desc())
+                    .offset(offset)
+                    .limit(limit)
+                    .all()
+                )
+                return {"total": total, "results": [analysis.to_dict() for analysis in analyses]}
+        except Exception as e:
+            print(f"Error filtering CV analyses: {e}")
+            return {"total": 0, "results": []}
+
+    def get_cv_analysis_features(self, analysis_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            with self.get_session() as session:
+                analysis = session.query(CVAnalysis).filter_by(id=analysis_id).first()
+                if not analysis:
+                    return None
+                data = analysis.to_dict()
+                data["skills"] = [skill.name for skill in analysis.skills]
+                return data
+        except Exception as e:
+            print(f"Error getting CV analysis features: {e}")
+            return None
+
+    def get_stored_analyses(self, analysis_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Stored structured data for re-scoring, keyed by analysis id; unknown ids are left out."""
+        ids = list(dict.fromkeys(int(i) for i in analysis_ids))
+        if not ids:
+            return {}
+        try:
+            with self.get_session() as session:
+                rows = (
+                    session.query(
+                        CVAnalysis.id,
+                        User.user_id,
+                        CVAnalysis.file_name,
+                        CVAnalysis.ats_score,
+                        CVAnalysis.structured_data,
+                        CVAnalysis.semantic_vector,
+                    )
+                    .join(User, CVAnalysis.user_id == User.id)
+                    .filter(CVAnalysis.id.in_(ids))
+                    .all()
+                )
+                return {
+                    analysis_id: {
+                        "analysis_id": analysis_id,
+                        "user_id": user_id,
+                        "file_name": file_name,
+                        "stored_ats_score": ats_score,
+                        "structured_data": structured_data,
+                        "semantic_vector": vector_from_bytes(semantic_vector),
+                    }
+                    for analysis_id, user_id, file_name, ats_score, structured_data, semantic_vector in rows
+                }
+        except Exception as e:
+            print(f"Error loading stored analyses: {e}")
+            return {}
+
+    def skill_frequencies(self, limit: int = 50, min_ats: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Most common skills across stored analyses, counted in SQL from ``cv_skills``."""
+        try:
+            with self.get_session() as session:
+                query = session.query(
+                    CVSkill.skill_key,
+                    func.min(CVSkill.name),
+                    func.count(CVSkill.analysis_id).label("analyses"),
+                )
+                if min_ats is not None:
+                    query = query.join(CVAnalysis, CVSkill.analysis_id == CVAnalysis.id).filter(
+                        CVAnalysis.ats_score >= min_ats
+                    )
+                rows = (
+                    query.group_by(CVSkill.skill_key)
+                    .order_by(func.count(CVSkill.analysis_id).desc(), CVSkill.skill_key)
+                    .limit(limit)
+                    .all()
+                )
+                return [{"skill_key": key, "name": name, "analyses": count} for key, name, count in rows]
+        except Exception as e:
+            print(f"Error counting skills: {e}")
+            return []
+
+    def iter_candidate_index_rows(self, batch_size: int = 500):
+        with self.get_session() as session:
+            query = (
+                session.query(
+                    CVAnalysis.id,
+                    User.user_id,
+                    CVAnalysis.file_name,
+                    CVAnalysis.ats_score,
+                    CVAnalysis.features,
+                    CVAnalysis.structured_data,
+                )
+                .join(User, CVAnalysis.user_id == User.id)
+                .yield_per(batch_size)
+            )
+            for analysis_id, user_id, file_name, ats_score, features, structured_data in query:
+                yield {
+                    "analysis_id": analysis_id,
+                    "user_id": user_id,
+                    "file_name": file_name,
+                    "ats_score": ats_score,
+                    "features": features,
+                    "structured_data": structured_data,
+                }
+
+    def load_candidate_index(self) -> int:
+        try:
+            count = get_candidate_index().build(self.iter_candidate_index_rows())
+            print(f"? Candidate index built: {count} analyses")
+            return count
+        except Exception as e:
+            print(f"Error building candidate index: {e}")
+            return 0
+
+    def load_near_duplicate_index(self, batch_size: int = 500) -> int:
+        """Fill the LSH index from stored signatures, computing any that are missing.
+
+        Older rows get a signature from the extracted text kept by the search index, or from
+        text rebuilt from structured data, and it is written back so this happens once.
+        """
+        index = get_near_duplicate_index()
+        try:
+            computed = 0
+            with self.get_session() as session:
+                query = (
+                    session.query(CVAnalysis.id, User.user_id, CVAnalysis.text_signature)
+                    .join(User, CVAnalysis.user_id == User.id)
+                    .yield_per(batch_size)
+                )
+                missing = []
+                for analysis_id, user_id, signature in query:
+                    if signature:
+                        index.add(analysis_id, signature_from_bytes(signature), user_id)
+                    else:
+                        missing.append((analysis_id, user_id))
+
+            search_index = get_cv_search_index()
+            for start in range(0, len(missing), batch_size):
+                with self.get_session() as session:
+                    for analysis_id, user_id in missing[start:start + batch_size]:
+                        analysis = session.get(CVAnalysis, analysis_id)
+                        text_value = search_index.get_text(analysis_id) or searchable_text(analysis.structured_data)
+                        signature = minhash_signature(text_value)
+                        analysis.text_signature = signature_to_bytes(signature)
+                        index.add(analysis_id, signature, user_id)
+                        computed += 1
+            print(f"? Near-duplicate index built: {len(index)} analyses ({computed} signatures computed)")
+            return len(index)
+        except Exception as e:
+            print(f"Error building near-duplicate index: {e}")
+            return len(index)
+
+    def sync_cv_search_index(self, batch_size: int = 500) -> int:
+        """Index analyses saved before text search existed, using text rebuilt from structured data."""
+        try:
+            search_index = get_cv_search_index()
+            indexed = search_index.indexed_ids()
+            with self.get_session() as session:
+                missing = [row[0] for row in session.query(CVAnalysis.id) if row[0] not in indexed]
+                for start in range(0, len(missing), batch_size):
+                    rows = (
+                        session.query(CVAnalysis, User.user_id)
+                        .join(User, CVAnalysis.user_id == User.id)
+                        .filter(CVAnalysis.id.in_(missing[start:start + batch_size]))
+                        .all()
+                    )
+                    for analysis, user_id in rows:
+                        search_index.add_document(
+                            analysis.id,
+                            searchable_text(analysis.structured_data),
+                            user_id=user_id,
+                            file_name=analysis.file_name,
+                            ats_score=analysis.ats_score,
+                        )
+            if missing:
+                print(f"? Backfilled CV search index: {len(missing)} analyses")
+            return len(missing)
+        except Exception as e:
+            print(f"Error syncing CV search index: {e}")
+            return 0
+
+    def upsert_job_postings(self, jobs: List[Dict[str, Any]]) -> int:
+        """Persist open postings, then recompile them into the shared job index."""
+        with self.get_session() as session:
+            for job in jobs:
+                job_id = str(job["job_id"])
+                posting = session.get(JobPosting, job_id) or JobPosting(job_id=job_id)
+                posting.title = job.get("title")
+                posting.description = job.get("description") or ""
+                posting.required_skills = list(job.get("required_skills") or [])
+                posting.is_open = 1
+                posting.updated_at = datetime.utcnow()
+                session.add(posting)
+        return get_job_index().upsert_jobs(jobs)
+
+    def close_job_posting(self, job_id: str) -> bool:
+        try:
+            with self.get_session() as session:
+                updated = session.query(JobPosting).filter_by(job_id=str(job_id)).update({"is_open": 0})
+            get_job_index().remove_job(job_id)
+            return bool(updated)
+        except Exception as e:
+            print(f"Error closing job posting: {e}")
+            return False
+
+    def load_job_index(self) -> int:
+        try:
+            with self.get_session() as session:
+                jobs = [
+                    {
+                        "job_id": job_id,
+                        "title": title,
+                        "description": description,
+                        "required_skills": required_skills,
+                    }
+                    for job_id, title, description, required_skills in session.query(
+                        JobPosting.job_id, JobPosting.title, JobPosting.description, JobPosting.required_skills
+                    ).filter(JobPosting.is_open == 1)
+                ]
+            count = get_job_index().build(jobs)
+            print(f"? Job index built: {count} open postings")
+            return count
+        except Exception as e:
+            print(f"Error building job index: {e}")
+            return 0
+
+    def record_job_analysis(
+        self, job_id: Any, analysis_id: int, ats_score: Any, competency_matrix: List[Dict[str, Any]]
+    ) -> bool:
+        """Fold one result into the job's running aggregate, replacing any earlier result for the pair."""
+        job_id = str(job_id)
+        try:
+            with self._job_analytics_lock, self.get_session() as session:
+                analytics = (
+                    session.query(JobAnalytics).filter_by(job_id=job_id).with_for_update().first()
+                )
+                if analytics is None:
+                    analytics = JobAnalytics(job_id=job_id, aggregate=job_analytics.empty_aggregate())
+                    session.add(analytics)
+                aggregate = analytics.aggregate
+
+                result = (
+                    session.query(JobAnalysisResult)
+                    .filter_by(job_id=job_id, analysis_id=analysis_id)
+                    .first()
+                )
+                if result is None:
+                    result = JobAnalysisResult(job_id=job_id, analysis_id=analysis_id)
+                    session.add(result)
+                else:
+                    job_analytics.apply_result(aggregate, result.ats_score, result.competency_matrix, sign=-1)
+
+                result.ats_score = float(ats_score or 0.0)
+                result.competency_matrix = [
+                    {
+                        "required_skill": row.get("required_skill"),
+                        "candidate_proficiency": row.get("candidate_proficiency"),
+                        "is_missing": bool(row.get("is_missing")),
+                    }
+                    for row in competency_matrix or []
+                ]
+                job_analytics.apply_result(aggregate, result.ats_score, result.competency_matrix)
+                flag_modified(analytics, "aggregate")
+            return True
+        except Exception as e:
+            print(f"Error recording job analytics: {e}")
+            return False
+
+    def get_job_analytics(self, job_id: Any, top_missing: int = 10) -> Optional[Dict[str, Any]]:
+        try:
+            with self.get_session() as session:
+                analytics = session.get(JobAnalytics, str(job_id))
+                if analytics is None:
+                    return None
+                summary = job_analytics.summarize(analytics.aggregate, top_missing)
+                summary["updated_at"] = analytics.updated_at.isoformat() if analytics.updated_at else None
+                return summary
+        except Exception as e:
+            print(f"Error reading job analytics: {e}")
+            return None
+
+    def rebuild_job_analytics(self, job_id: Optional[Any] = None, batch_size: int = 1000) -> int:
+        """Recompute aggregates from ``job_analysis_results`` for one job, or all of them."""
+        aggregates: Dict[str, Dict[str, Any]] = {}
+        with self.get_session() as session:
+            query = session.query(
+                JobAnalysisResult.job_id, JobAnalysisResult.ats_score, JobAnalysisResult.competency_matrix
+            )
+            if job_id is not None:
+                query = query.filter(JobAnalysisResult.job_id == str(job_id))
+            for result_job_id, ats_score, matrix in query.yield_per(batch_size):
+                aggregate = aggregates.setdefault(result_job_id, job_analytics.empty_aggregate())
+                job_analytics.apply_result(aggregate, ats_score, matrix)
+
+        with self.get_session() as session:
+            stale = session.query(JobAnalytics)
+            if job_id is not None:
+                stale = stale.filter(JobAnalytics.job_id == str(job_id))
+            stale.delete(synchronize_session=False)
+            for result_job_id, aggregate in aggregates.items():
+                session.add(JobAnalytics(job_id=result_job_id, aggregate=aggregate))
+        print(f"? Rebuilt job analytics: {len(aggregates)} jobs")
+        return len(aggregates)
+
     def get_user_cv_analyses(self, user_id: str, limit: int = 50) -> List[Dict]:
         try:
             with self.get_session() as session:
@@ -202,6 +762,54 @@ class DatabaseService:
             print(f"Error cleaning up sessions: {e}")
             return 0
 
+    @staticmethod
+    def _chat_message_rows(session_id: str, first_seq: int, messages: Iterable[Dict]) -> List[ChatMessage]:
+        rows = []
+        for offset, message in enumerate(messages):
+            try:
+                ts = datetime.fromisoformat(message["timestamp"]) if message.get("timestamp") else None
+            except (TypeError, ValueError):
+                ts = None
+            rows.append(ChatMessage(
+                session_id=session_id,
+                seq=first_seq + offset,
+                role=str(message.get("role") or "user")[:20],
+                content=str(message.get("content") or ""),
+                ts=ts or datetime.utcnow(),
+            ))
+        return rows
+
+    def _migrate_chat_session(self, session, record: ChatbotSession) -> None:
+        """Move a legacy session's ``conversation`` JSON into ``chat_messages`` rows."""
+        conversation = [m for m in record.conversation or [] if isinstance(m, dict)]
+        session.query(ChatMessage).filter_by(session_id=record.session_id).delete()
+        session.add_all(self._chat_message_rows(record.session_id, 0, conversation))
+        record.message_count = len(conversation)
+        record.conversation = []
+
+    def migrate_chat_conversations(self, batch_size: int = 200) -> int:
+        """Split every not-yet-migrated chatbot session into ``chat_messages`` rows; returns the count."""
+        migrated = 0
+        try:
+            while True:
+                with self.get_session() as session:
+                    records = (
+                        session.query(ChatbotSession)
+                        .filter(ChatbotSession.message_count.is_(None))
+                        .limit(batch_size)
+                        .all()
+                    )
+                    for record in records:
+                        self._migrate_chat_session(session, record)
+                migrated += len(records)
+                if len(records) < batch_size:
+                    break
+            if migrated:
+                print(f"? Migrated {migrated} chatbot sessions to chat_messages")
+        except Exception as e:
+            print(f"Error migrating chatbot conversations: {e}")
+        return migrated
+
     def create_chatbot_session(self, session_data: Dict) -> Optional[ChatbotSession]:
         try:
             with self.get_session() as session:
@@ -220,16 +828,22 @@ class DatabaseService:
                     ),
                     current_step=session_data.get("current_step", "personal_info"),
                     cv_data=session_data.get("cv_data", {}),
-                    conversation=session_data.get("conversation", []),
+                    conversation=[],
+                    message_count=len(session_data.get("conversation") or []),
                     job_requirements=session_data.get("job_requirements"),
                     job_posting_meta=session_data.get("job_posting_meta", {}),
                     score_data=session_data.get("score_data", {}),
                     final_summary=session_data.get("final_summary"),
+                    summary_status=session_data.get("summary_status"),
                     is_complete=1 if session_data.get("is_complete") else 0,
                 )
 
                 session.add(record)
                 session.flush()
+                session.add_all(self._chat_message_rows(
+                    record.session_id, 0, session_data.get("conversation") or []
+                ))
+                session.flush()
                 return record
         except Exception as e:
             print(f"Error creating chatbot session: {e}")
@@ -238,16 +852,63 @@ class DatabaseService:
     def get_chatbot_session(self, session_id: str) -> Optional[ChatbotSession]:
         try:
             with self.get_session() as session:
-                return session.query(ChatbotSession).filter_by(session_id=session_id).first()
+                record = session.query(ChatbotSession).filter_by(session_id=session_id).first()
+                if record is not None and record.message_count is None:
+                    self._migrate_chat_session(session, record)
+                return record
         except Exception as e:
             print(f"Error getting chatbot session: {e}")
             return None
 
+    def get_chat_messages(
+        self, session_id: str, since_seq: int = 0, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Messages with ``seq >= since_seq`` in order; reads only the rows asked for."""
+        try:
+            with self.get_session() as session:
+                query = (
+                    session.query(ChatMessage)
+                    .filter(ChatMessage.session_id == session_id, ChatMessage.seq >= since_seq)
+                    .order_by(ChatMessage.seq)
+                )
+                if limit is not None:
+                    query = query.limit(limit)
+                return [row.to_dict() for row in query.all()]
+        except Exception as e:
+            print(f"Error getting chat messages: {e}")
+            return []
+
+    def list_pending_summary_sessions(self, limit: int = 500) -> List[str]:
+        """Ids of completed sessions whose final summary was queued but never written."""
+        try:
+            with self.get_session() as session:
+                rows = (
+                    session.query(ChatbotSession.session_id)
+                    .filter(ChatbotSession.summary_status == "pending")
+                    .order_by(ChatbotSession.completed_at)
+                    .limit(limit)
+                    .all()
+                )
+                return [row.session_id for row in rows]
+        except Exception as e:
+            print(f"Error listing pending chat summaries: {e}")
+            return []
+
     def list_chatbot_sessions(self, user_id: str, limit: int = 50) -> List[ChatbotSession]:
+        """Session summaries without the ``cv_data`` and ``conversation`` JSON columns."""
         try:
             with self.get_session() as session:
+                # conversation_length falls back to the legacy column until a session is migrated.
+                for record in (
+                    session.query(ChatbotSession)
+                    .filter(ChatbotSession.user_id == user_id, ChatbotSession.message_count.is_(None))
+                    .all()
+                ):
+                    self._migrate_chat_session(session, record)
+                session.flush()
                 return (
                     session.query(ChatbotSession)
+                    .options(defer(ChatbotSession.cv_data), defer(ChatbotSession.conversation))
                     .filter_by(user_id=user_id)
                     .order_by(ChatbotSession.updated_at.desc())
                     .limit(limit)
@@ -257,17 +918,26 @@ class DatabaseService:
             print(f"Error listing chatbot sessions: {e}")
             return []
 
-    def update_chatbot_session(self, session_id: str, updates: Dict) -> bool:
+    def update_chatbot_session(
+        self, session_id: str, updates: Dict, new_messages: Optional[List[Dict]] = None
+    ) -> bool:
+        """Set the given columns and append ``new_messages``; nothing else about the session is rewritten."""
         try:
             with self.get_session() as session:
                 record = session.query(ChatbotSession).filter_by(session_id=session_id).first()
                 if not record:
                     return False
+                if record.message_count is None:
+                    self._migrate_chat_session(session, record)
 
                 for key, value in updates.items():
-                    if hasattr(record, key):
+                    if hasattr(record, key) and key not in ("conversation", "message_count"):
                         setattr(record, key, value)
 
+                if new_messages:
+                    session.add_all(self._chat_message_rows(session_id, record.message_count, new_messages))
+                    record.message_count += len(new_messages)
+
                 record.updated_at = datetime.utcnow()
                 session.flush()
                 return True
@@ -281,6 +951,7 @@ class DatabaseService:
                 record = session.query(ChatbotSession).filter_by(session_id=session_id).first()
                 if not record:
                     return False
+                session.query(ChatMessage).filter_by(session_id=session_id).delete()
                 session.delete(record)
                 session.flush()
                 return True
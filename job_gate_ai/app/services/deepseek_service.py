@@ -4,6 +4,8 @@ import os
 from typing import Dict ,Any ,Optional 
 from openai import OpenAI 
 
+from app.services.llm_ledger import MeteredOpenAI, llm_budget_exhausted
+
 class DeepSeekService :
     def __init__ (self ):
         self .api_key =os .getenv ("OPENROUTER_API_KEY","")
@@ -14,14 +16,14 @@ class DeepSeekService :
             print ("⚠️ WARNING: OPENROUTER_API_KEY not set. DeepSeek service will be unavailable.")
             self .client =None 
         else :
-            self .client =OpenAI (
+            self .client =MeteredOpenAI (OpenAI (
             api_key =self .api_key ,
             base_url =self .base_url 
-            )
+            ))
             print (f"✅ DeepSeek service initialized with model: {self .model }")
 
     def is_available (self )->bool :
-        return self .client is not None 
+        return self .client is not None and not llm_budget_exhausted ()
 
     async def structure_cv (self ,raw_text :str )->Dict [str ,Any ]:
         if not self .is_available ():
@@ -1,317 +1,117 @@
-import json 
-import re 
-from typing import Dict ,Any ,List 
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.skill_taxonomy import get_skill_taxonomy
+
+
+_SECTION_ALIASES = {
+    "objective": (
+        "objective", "career objective", "summary", "professional summary", "profile", "about me",
+        "الهدف", "الهدف الوظيفي", "الملخص", "نبذة", "نبذة عني",
+    ),
+    "personal_details": (
+        "personal details", "personal information", "personal info", "contact", "contact information",
+        "المعلومات الشخصية", "البيانات الشخصية", "معلومات التواصل",
+    ),
+    "education": (
+        "education", "academic background", "education and training",
+        "التعليم", "تعليم", "المؤهلات", "المؤهل العلمي",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment history", "work history",
+        "الخبرة", "خبرة", "الخبرات", "الخبرة العملية", "الخبرات العملية",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "technologies", "core competencies",
+        "المهارات", "مهارات", "المهارات التقنية",
+    ),
+    "projects": ("projects", "personal projects", "key projects", "المشاريع", "مشاريع"),
+    "languages": ("languages", "language", "اللغات", "لغات"),
+    "certifications": (
+        "certifications", "certificates", "courses", "licenses and certifications",
+        "الشهادات", "الدورات", "الشهادات والدورات",
+    ),
+}
+_HEADING_TO_SECTION = {alias: section for section, aliases in _SECTION_ALIASES.items() for alias in aliases}
+_HEADING_RE = re.compile(
+    r"^[#*\s]*(?P<head>"
+    + "|".join(re.escape(a) for a in sorted(_HEADING_TO_SECTION, key=len, reverse=True))
+    + r")\s*(?:[:：\-–—]\s*(?P<rest>.*))?$",
+    re.IGNORECASE,
+)
+
+_FIELD_LABELS = {
+    "full name": "full_name", "name": "full_name", "الاسم الكامل": "full_name", "الاسم": "full_name", "اسم": "full_name",
+    "location": "location", "address": "location", "city": "location",
+    "الموقع": "location", "العنوان": "location", "المدينة": "location",
+    "email": "email", "e-mail": "email", "البريد الإلكتروني": "email", "البريد": "email",
+    "phone": "phone", "mobile": "phone", "tel": "phone", "الهاتف": "phone", "الجوال": "phone", "رقم الهاتف": "phone",
+}
+_FIELD_RE = re.compile(
+    r"^(?P<label>"
+    + "|".join(re.escape(label) for label in sorted(_FIELD_LABELS, key=len, reverse=True))
+    + r")\s*[:：]\s*(?P<value>.*)$",
+    re.IGNORECASE,
+)
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w@])\+?\(?\d[\d\s().-]{6,}\d(?!\w)")
+_YEAR_PAIR_RE = re.compile(r"^\(?(?:19|20)\d{2}\s*[-–]\s*(?:19|20)\d{2}\)?$")
+_YEAR_RE = re.compile(r"(?:19|20)\d\d")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+"
+_DATE_RANGE_RE = re.compile(
+    rf"\b(?:{_MONTH})?(?:19|20)\d{{2}}\s*(?:[-–—]|to|until|إلى|الى|حتى)\s*"
+    rf"(?:(?:{_MONTH})?(?:19|20)\d{{2}}|present|current|now|today|الآن|حاليا|حاليًا)",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_NON_DIGIT_RE = re.compile(r"\D")
+_NON_PHONE_CHAR_RE = re.compile(r"[^\d+]")
+_EMPTY_BRACKETS_RE = re.compile(r"[(\[]\s*[)\]]")
+_BULLET_CHARS = "-–•*▪●◦·‣\uf0b7\uf0a7"
+_ITEM_SPLIT_RE = re.compile(r"\s*[,،;|•·]\s*")
+_TITLE_SPLIT_RE = re.compile(r"\s+[-–—]\s+|\s*:\s+")
+_AT_RE = re.compile(r"\s+(?:at|@|لدى)\s+", re.IGNORECASE)
+_PIPE_RE = re.compile(r"\s+[|–—]\s+")
+_TECH_LINE_RE = re.compile(
+    r"^(?:tech(?:nologies)?|tools|tech stack|stack|built with|التقنيات|الأدوات)\s*[:：\-]\s*(?P<value>.+)$",
+    re.IGNORECASE,
+)
+_TECH_INLINE_RE = re.compile(r"[\s\-–|;,]*\b(?:technologies|tools|tech(?:\s*stack)?|stack)\s*[:：]\s*", re.IGNORECASE)
+_INSTITUTION_RE = re.compile(
+    r"\b(?:university|college|institute|school|academy)\b|جامعة|كلية|معهد|أكاديمية", re.IGNORECASE
+)
+_DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|bsc|msc|b\.sc|m\.sc|ba|bs|ms|mba|phd|diploma|degree|major|associate)\b"
+    r"|بكالوريوس|ماجستير|دكتوراه|دبلوم|ليسانس",
+    re.IGNORECASE,
+)
+_NAME_LINE_RE = re.compile(r"^[A-Za-z\u0600-\u06FF][A-Za-z\u0600-\u06FF.'\- ]*$")
+_NOT_A_NAME_RE = re.compile(r"\b(?:resume|cv|curriculum vitae)\b|السيرة الذاتية", re.IGNORECASE)
+_CITY_RE = re.compile(
+    r"\b(?:damascus|riyadh|jeddah|dammam|dubai|abu dhabi|doha|cairo|amman|aleppo|sanaa|aden|kuwait|muscat|manama)\b"
+    r"|دمشق|الرياض|جدة|الدمام|دبي|أبوظبي|الدوحة|القاهرة|عمان|حلب|صنعاء|عدن|الكويت|مسقط|المنامة",
+    re.IGNORECASE,
+)
 
-class FallbackCVProcessor :
 
-    @staticmethod
-    def _detect_section_heading(line: str) -> str:
-        token = re.sub(r"[^A-Za-z\u0600-\u06FF ]+", "", (line or "").strip()).lower()
-        token = re.sub(r"\s+", " ", token).strip()
-        section_map = {
-            "objective": "objective",
-            "summary": "objective",
-            "education": "education",
-            "skills": "skills",
-            "projects": "projects",
-            "experience": "experience",
-            "languages": "languages",
-            "certifications": "certifications",
-            "personal details": "personal_details",
-            "التعليم": "education",
-            "المهارات": "skills",
-            "المشاريع": "projects",
-            "الخبرة": "experience",
-            "اللغات": "languages",
-            "الشهادات": "certifications",
-            "المعلومات الشخصية": "personal_details",
-        }
-        return section_map.get(token, "")
+class FallbackCVProcessor :
 
     @staticmethod
     def _normalize_skill(skill: str) -> str:
         s = re.sub(r"\s+", " ", (skill or "").strip())
         s = re.sub(r"\b([A-Za-z])\s+([A-Za-z]{2,})\b", r"\1\2", s)
         s = re.sub(r"\b([A-Za-z]{2,})\s+([A-Za-z])\b", r"\1\2", s)
-        low = s.lower()
-        aliases = {
-            "ract native": "React Native",
-            "react native": "React Native",
-            "react.js": "React.js",
-            "tailwind": "Tailwind",
-            "javascript": "JavaScript",
-            "html/html5": "HTML/HTML5",
-            "css/css3": "CSS/CSS3",
-            "sql": "SQL",
-            "figma": "Figma",
-            "django": "Django",
-        }
-        if low in aliases:
-            return aliases[low]
-        if low.startswith("react native"):
-            return "React Native"
-        if low.startswith("tailwind"):
-            return "Tailwind"
-        if low.startswith("javascript"):
-            return "JavaScript"
-        return s
+        return get_skill_taxonomy().normalize(s)
 
     @staticmethod
-    def _normalize_contact_fields(result: Dict[str, Any], raw_text: str) -> None:
-        personal = result.get("personal_info") or {}
-        blob = raw_text or ""
-        compact = re.sub(r"\s+", "", blob)
-
-        email_match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", compact)
-        if email_match:
-            personal["email"] = email_match.group(0).lower()
-        else:
-            current_email = str(personal.get("email", ""))
-            if "@" in current_email:
-                current_email = re.sub(r"\s+", "", current_email)
-                m2 = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", current_email)
-                personal["email"] = m2.group(0).lower() if m2 else ""
-
-        phone_match = re.search(r"(\+?\d[\d\-\s]{7,}\d)", blob)
-        if phone_match:
-            personal["phone"] = re.sub(r"[^\d+]", "", phone_match.group(1))
-
-        result["personal_info"] = personal
-
-    @staticmethod 
-    def structure_cv_fallback (raw_text :str )->Dict [str ,Any ]:
-
-
-        simple_result =FallbackCVProcessor .parse_simple_cv (raw_text )
-
-
-        if (simple_result ["personal_info"]["full_name"] or simple_result ["personal_info"]["email"]) and (len (simple_result ["experience"])>0 or len (simple_result ["skills"])>0):
-            return simple_result 
-
-
-        return FallbackCVProcessor ._structure_complex_cv (raw_text )
-
-    @staticmethod 
-    def _structure_complex_cv (raw_text :str )->Dict [str ,Any ]:
-
-
-        cleaned_text =raw_text .replace ('•','-').replace ('','').strip ()
-        lines =[line .strip ()for line in cleaned_text .split ('\n')if line .strip ()]
-
-
-        result ={
-        "personal_info":{
-        "full_name":"",
-        "email":"",
-        "phone":"",
-        "location":""
-        },
-        "education":[],
-        "experience":[],
-        "skills":[],
-        "certifications":[],
-        "languages":[],
-        "projects":[]
-        }
-
-
-        email_pattern =r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails =re .findall (email_pattern ,raw_text )
-        if emails :
-            result ["personal_info"]["email"]=emails [0 ]
-
+    def structure_cv_fallback(raw_text: str) -> Dict[str, Any]:
+        return _SECTION_PARSER.parse(raw_text)
 
-        phone_pattern =r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones =re .findall (phone_pattern ,raw_text )
-        if phones :
-            result ["personal_info"]["phone"]=phones [0 ]
-
-
-        for i ,line in enumerate (lines ):
-            line_lower =line .lower ()
-            if any (keyword in line_lower for keyword in ["name","اسم","mohammed","ahmed","ali"]):
-                if i +1 <len (lines ):
-                    result ["personal_info"]["full_name"]=lines [i +1 ]
-                else :
-                    result ["personal_info"]["full_name"]=line 
-                break 
-
-
-        if not result ["personal_info"]["full_name"]:
-            for line in lines :
-                if not re .search (email_pattern ,line )and not re .search (phone_pattern ,line ):
-                    if len (line .split ())>=2 :
-                        result ["personal_info"]["full_name"]=line 
-                        break 
-
-
-        location_keywords =["damascus","دمشق","riyadh","الرياض","location","موقع"]
-        for i ,line in enumerate (lines ):
-            line_lower =line .lower ()
-            if any (keyword in line_lower for keyword in location_keywords ):
-                if ":"in line :
-                    result ["personal_info"]["location"]=line .split (":",1 )[1 ].strip ()
-                elif i +1 <len (lines ):
-                    result ["personal_info"]["location"]=lines [i +1 ]
-                break 
-
-
-        education_keywords =["education","تعليم","university","جامعة","degree","درجة"]
-        in_education_section =False 
-        current_edu ={}
-
-        for line in lines :
-            line_lower =line .lower ()
-
-
-            if any (keyword in line_lower for keyword in education_keywords ):
-                in_education_section =True 
-                if current_edu :
-                    result ["education"].append (current_edu )
-                    current_edu ={}
-                continue 
-
-            if in_education_section :
-                if line and not line .startswith ("-")and "university"in line_lower or "college"in line_lower :
-                    if current_edu :
-                        result ["education"].append (current_edu )
-                    current_edu ={"institution":line ,"degree":"","duration":""}
-                elif current_edu and "degree"in line_lower or "major"in line_lower :
-                    if ":"in line :
-                        current_edu ["degree"]=line .split (":",1 )[1 ].strip ()
-                elif current_edu and any (word in line_lower for word in ["2020","2021","2022","2023","2024"]):
-                    current_edu ["duration"]=line 
-
-        if current_edu :
-            result ["education"].append (current_edu )
-
-
-        skills_keywords =["skills","مهارات","technologies","تكنولوجيا"]
-        in_skills_section =False 
-
-        for i, line in enumerate (lines ):
-            line_lower =line .lower ()
-
-            if any (keyword in line_lower for keyword in skills_keywords ):
-                in_skills_section =True 
-                continue 
-
-            if in_skills_section :
-
-                if line and any (section in line_lower for section in ["experience","projects","education","languages"]):
-                    in_skills_section =False 
-                    continue 
-
-                if line and not line .startswith ("-") and not line .startswith ("•"):
-                    skills =re .split (r'[,|;]',line )
-                    for skill in skills :
-                        skill_clean =skill .strip ()
-                        if skill_clean and len (skill_clean )>1 :
-                            result ["skills"].append (skill_clean )
-
-
-        project_keywords =["projects","مشاريع","experience","خبرة","work"]
-        in_project_section =False 
-        current_exp ={}
-        current_project = {}
-
-        for line in lines :
-            line_lower =line .lower ()
-
-            if any (keyword in line_lower for keyword in project_keywords ):
-                # start parsing projects section (or experience if labeled as such)
-                in_project_section =True 
-                # flush any pending experience
-                if current_exp :
-                    result ["experience"].append (current_exp )
-                    current_exp ={}
-                # reset current project
-                current_project = {}
-                continue 
-
-            if in_project_section :
-                # end section when next major header shows up
-                if line and any (sec in line_lower for sec in ["education","skills","languages","certifications","experience"]):
-                    in_project_section =False
-                    if current_project :
-                        result["projects"].append(current_project)
-                        current_project = {}
-                    continue
-
-                # project entry lines usually start with '-' or '•' or are titles
-                if line and (line.startswith("-") or line.startswith("•")):
-                    # flush previous project if has title
-                    if current_project and current_project.get("title"):
-                        result["projects"].append(current_project)
-                        current_project = {}
-
-                    proj_line = line[1:].strip()
-                    # try to split title and technologies using ' - ' or ' : '
-                    if ' - ' in proj_line:
-                        parts = proj_line.split(' - ', 1)
-                        title = parts[0].strip()
-                        desc = parts[1].strip()
-                        current_project = {"title": title, "description": desc, "technologies": [], "achievements": []}
-                    elif ':' in proj_line:
-                        parts = proj_line.split(':', 1)
-                        title = parts[0].strip()
-                        desc = parts[1].strip()
-                        current_project = {"title": title, "description": desc, "technologies": [], "achievements": []}
-                    else:
-                        current_project = {"title": proj_line, "description": "", "technologies": [], "achievements": []}
-
-                elif current_project and (line.lower().startswith('tech') or 'technologies' in line_lower or 'tools' in line_lower):
-                    # technologies line
-                    if ':' in line:
-                        tech_part = line.split(':', 1)[1].strip()
-                    else:
-                        tech_part = line.strip()
-                    techs = re.split(r'[,|;]', tech_part)
-                    current_project['technologies'].extend([t.strip() for t in techs if t.strip()])
-
-                elif current_project and (line.startswith('-') or line.startswith('•')):
-                    # bullet within project treated as achievement
-                    ach = line[1:].strip()
-                    if ach:
-                        current_project.setdefault('achievements', []).append(ach)
-
-                elif current_project and line and not line.startswith('-') and not line.startswith('•'):
-                    # continuation of description
-                    if current_project.get('description'):
-                        current_project['description'] += ' ' + line
-                    else:
-                        current_project['description'] = line
-
-        # flush any remaining project
-        if current_project and current_project.get('title'):
-            result['projects'].append(current_project)
-
-        # flush any remaining experience
-        if current_exp and current_exp.get('position'):
-            result["experience"].append (current_exp )
-
-
-        lang_keywords =["languages","لغات","language"]
-        in_lang_section =False 
-
-        for line in lines :
-            line_lower =line .lower ()
-
-            if any (keyword in line_lower for keyword in lang_keywords ):
-                in_lang_section =True 
-                continue 
-
-            if in_lang_section :
-                if ":"in line :
-                    lang_part =line .split (":",1 )[1 ].strip ()
-                    result ["languages"].append (lang_part )
-                elif line and len (line )<50 :
-                    result ["languages"].append (line )
-
-
-        result ["skills"]=list (set ([s for s in result ["skills"]if len (s )>1 ]))
-
-        return result 
+    @staticmethod
+    def parse_simple_cv(raw_text: str) -> Dict[str, Any]:
+        # Kept for older scripts; the single-pass parser handles both simple and sectioned layouts.
+        return _SECTION_PARSER.parse(raw_text)
 
     @staticmethod 
     def calculate_basic_ats_score (raw_text :str )->Dict [str ,Any ]:
@@ -427,212 +227,301 @@ class FallbackCVProcessor :
         "feedback":feedback ,
         "features":features 
         }
-    @staticmethod 
-    def parse_simple_cv (raw_text :str )->Dict [str ,Any ]:
-
-        lines =[line .strip ()for line in raw_text .split ('\n')if line .strip ()]
-
-        result ={
-        "personal_info":{
-        "full_name":"",
-        "email":"",
-        "phone":"",
-        "location":""
-        },
-        "education":[],
-        "experience":[],
-        "skills":[],
-        "certifications":[],
-        "languages":[],
-        "projects":[]
-        }
 
 
-        current_section =None 
+def _empty_cv() -> Dict[str, Any]:
+    return {
+        "personal_info": {"full_name": "", "email": "", "phone": "", "location": ""},
+        "education": [],
+        "experience": [],
+        "skills": [],
+        "certifications": [],
+        "languages": [],
+        "projects": [],
+    }
 
-        for line in lines :
-            line_lower =line .lower ()
-            heading = FallbackCVProcessor._detect_section_heading(line)
-            if heading in {"objective", "personal_details"}:
-                current_section = None
-                continue
-            if heading in {"skills", "projects", "experience", "education", "languages", "certifications"}:
-                current_section = heading
+
+def _split_duration(text: str) -> Tuple[str, str]:
+    match = _DATE_RANGE_RE.search(text) if _YEAR_RE.search(text) else None
+    if not match:
+        return text.strip(), ""
+    rest = text[:match.start()] + text[match.end():]
+    rest = _EMPTY_BRACKETS_RE.sub("", rest).strip(" \t,|-–—()[]")
+    return rest, match.group(0).strip()
+
+
+def _split_items(text: str) -> List[str]:
+    return [item for item in _ITEM_SPLIT_RE.split(text) if item]
+
+
+def _strip_bullet(line: str) -> Tuple[bool, str]:
+    if line[0] in _BULLET_CHARS:
+        return True, line.lstrip(_BULLET_CHARS).lstrip()
+    return False, line
+
+
+def _find_phone(line: str) -> str:
+    for match in _PHONE_RE.finditer(line):
+        candidate = match.group(0)
+        digits = _NON_DIGIT_RE.sub("", candidate)
+        if 8 <= len(digits) <= 15 and not _YEAR_PAIR_RE.match(candidate.strip()):
+            return _NON_PHONE_CHAR_RE.sub("", candidate)
+    return ""
+
+
+class _ParseState:
+    __slots__ = ("result", "section", "pending_field", "seen_heading")
+
+    def __init__(self):
+        self.result = _empty_cv()
+        self.section: Optional[str] = None
+        self.pending_field: Optional[str] = None
+        self.seen_heading = False
+
+
+class CVSectionParser:
+    """Single-pass section segmenter and field extractor used when the LLM is unavailable.
+
+    Every line is visited once: contact fields are picked up wherever they appear, headings
+    switch the active section, and the active section's handler consumes the line.
+    """
+
+    def __init__(self):
+        self._handlers = {
+            "skills": self._on_skills,
+            "experience": self._on_experience,
+            "education": self._on_education,
+            "projects": self._on_projects,
+            "languages": self._on_languages,
+            "certifications": self._on_certifications,
+        }
+
+    def parse(self, raw_text: str) -> Dict[str, Any]:
+        state = _ParseState()
+        personal = state.result["personal_info"]
+
+        for raw_line in (raw_text or "").splitlines():
+            line = raw_line.strip()
+            if not line:
                 continue
 
+            if state.pending_field:
+                field, state.pending_field = state.pending_field, None
+                if not _HEADING_RE.match(line):
+                    personal[field] = personal[field] or line
+                    continue
 
-            if "name:"in line_lower or "الاسم:"in line :
-                result ["personal_info"]["full_name"]=line .split (":",1 )[1 ].strip ()if ":"in line else line 
-            elif "email:"in line_lower or "@"in line :
-                if ":"in line :
-                    result ["personal_info"]["email"]=line .split (":",1 )[1 ].strip ()
-                else :
-                    result ["personal_info"]["email"]=line 
-            elif "skills:"in line_lower or "مهارات:"in line :
-                if ":"in line :
-                    skills_part =line .split (":",1 )[1 ].strip ()
-                    if skills_part :
-                        skills =[s .strip ()for s in skills_part .split (",")if s .strip ()]
-                        result ["skills"].extend (skills )
-                current_section ="skills"
-                continue 
-            elif "projects:"in line_lower or "مشاريع:"in line :
-                if ":"in line :
-                    proj_part = line.split(":",1)[1].strip()
-                    if proj_part:
-                        # split inline projects by ; or |
-                        proj_items = re.split(r'[;|\n]', proj_part)
-                        for p in proj_items:
-                            p_clean = p.strip()
-                            if p_clean:
-                                # store minimal project entry
-                                result["projects"].append({"title":p_clean, "description":"", "technologies":[], "achievements":[]})
-                current_section ="projects"
-                continue 
-            elif "experience:"in line_lower or "خبرة:"in line :
-                current_section ="experience"
-                continue 
-            elif "education:"in line_lower or "تعليم:"in line :
-                if ":"in line :
-                    edu_part =line .split (":",1 )[1 ].strip ()
-                    if edu_part :
-                        result ["education"].append ({"institution":edu_part ,"degree":"","duration":""})
-                current_section ="education"
-                continue 
-
-
-            if current_section =="skills":
-                if line and not any (kw in line_lower for kw in ["experience","education","languages","certifications"]):
-                    skills =[s .strip ()for s in line .split (",")if s .strip ()]
-                    if len(skills) <= 1:
-                        # Skills often appear one-per-line in CVs.
-                        if line and 1 < len(line) < 40 and not any(ch.isdigit() for ch in line):
-                            result["skills"].append(line.strip())
-                    else:
-                        result ["skills"].extend (skills )
-                else :
-                    current_section =None 
-            elif current_section =="projects":
-                if line and (line.startswith("-") or line.startswith("•")):
-                    proj_line = line[1:].strip()
-                    # try to split title and desc
-                    if ' - ' in proj_line:
-                        tparts = proj_line.split(' - ',1)
-                        title = tparts[0].strip()
-                        desc = tparts[1].strip()
-                    elif ':' in proj_line:
-                        tparts = proj_line.split(':',1)
-                        title = tparts[0].strip()
-                        desc = tparts[1].strip()
+            in_header = state.section in (None, "personal_details")
+            if self._take_contact(personal, line, in_header):
+                continue
+
+            field_match = _FIELD_RE.match(line)
+            if field_match:
+                field = _FIELD_LABELS[field_match.group("label").lower()]
+                value = field_match.group("value").strip()
+                if field == "phone":
+                    personal["phone"] = personal["phone"] or _find_phone(value)
+                elif field in ("full_name", "location"):
+                    if value:
+                        personal[field] = personal[field] or value
                     else:
-                        title = proj_line
-                        desc = ''
-                    # extract inline technologies if present in the same bullet
-                    desc_lower = desc.lower()
-                    techs = []
-                    if 'technologies' in desc_lower or 'tools' in desc_lower or 'tech:' in desc_lower:
-                        # try to split by 'technologies' keyword
-                        m = re.split(r'(technologies|tools|tech)[:\s-]*', desc, flags=re.IGNORECASE)
-                        # m may be like [before, 'technologies', after]
-                        if len(m) >= 3:
-                            desc = m[0].strip()
-                            tech_part = m[2].strip()
-                            techs = [t.strip() for t in re.split(r'[,|;]', tech_part) if t.strip()]
-                    result["projects"].append({"title":title, "description":desc, "technologies":techs, "achievements":[]})
-                elif line and not line.startswith("-") and not line.startswith("•"):
-                    # continuation/techs or description for last project
-                    if (
-                        len(line) > 8
-                        and any(k in line_lower for k in ["react", "django", "docker", "mysql", "app", "website", "mobile", "project"])
-                        and not any(k in line_lower for k in ["education", "skills", "languages", "certifications"])
-                    ):
-                        result["projects"].append({"title": line, "description": "", "technologies": [], "achievements": []})
-                    elif result["projects"]:
-                        last = result["projects"][-1]
-                        if any(k in line_lower for k in ["tech","technologies","tools"]):
-                            if ':' in line:
-                                tech_part = line.split(':',1)[1].strip()
-                            else:
-                                tech_part = line
-                            techs = re.split(r'[,|;]', tech_part)
-                            last["technologies"].extend([t.strip() for t in techs if t.strip()])
-                        else:
-                            if last.get("description"):
-                                last["description"] += ' ' + line
-                            else:
-                                last["description"] = line
-                else:
-                    current_section = None
-            elif current_section =="experience":
-                if line and (line .startswith ("-") or line .startswith ("•")):
-                    line_content =line [1 :].strip ()
-                    if " at "in line_content .lower ():
-                        parts =line_content .split (" at ")
-                        if result ["experience"] and not result ["experience"][-1 ].get ("position"):
-                            result ["experience"][-1 ]["position"]=parts [0 ].strip ()
-                            result ["experience"][-1 ]["company"]=parts [1 ].strip ()if len (parts )>1 else ""
-                        else :
-                            result ["experience"].append ({
-                            "position":parts [0 ].strip (),
-                            "company":parts [1 ].strip ()if len (parts )>1 else "",
-                            "duration":"",
-                            "description":"",
-                            "achievements":[]
-                            })
-                    else :
-                        if result ["experience"]:
-                            result ["experience"][-1 ]["achievements"].append (line_content )
-                        else :
-                            result ["experience"].append ({
-                            "position":"",
-                            "company":"",
-                            "duration":"",
-                            "description":line_content ,
-                            "achievements":[]
-                            })
-                elif line and not line .startswith ("-") and not line .startswith ("•"):
-                    if any (kw in line_lower for kw in ["experience","education","languages","certifications","skills"]):
-                        current_section =None 
-                    elif " at "in line_lower :
-                        parts =line .split (" at ")
-                        result ["experience"].append ({
-                        "position":parts [0 ].strip (),
-                        "company":parts [1 ].strip ()if len (parts )>1 else "",
-                        "duration":"",
-                        "description":"",
-                        "achievements":[]
-                        })
-                    else :
-                        result ["experience"].append ({
-                        "position":line ,
-                        "company":"",
-                        "duration":"",
-                        "description":"",
-                        "achievements":[]
-                        })
-            elif current_section =="education":
-                if line and not any (kw in line_lower for kw in ["experience","skills","languages","certifications"]):
-                    if result ["education"]:
-                        if "degree"in line_lower or "major"in line_lower :
-                            result ["education"][-1 ]["degree"]=line 
-                        else :
-                            result ["education"][-1 ]["duration"]=line 
-                    else :
-                        result ["education"].append ({"institution":line ,"degree":"","duration":""})
-                else :
-                    current_section =None 
-
-        # De-duplicate while preserving order.
-        seen = set()
-        dedup_skills = []
-        for s in result["skills"]:
-            s = FallbackCVProcessor._normalize_skill(str(s))
-            key = re.sub(r"\s+", " ", str(s).strip()).lower()
-            if not key or key in seen:
+                        state.pending_field = field
+                continue
+
+            heading = _HEADING_RE.match(line)
+            if heading and not (state.section == "projects" and _TECH_LINE_RE.match(line)):
+                state.section = _HEADING_TO_SECTION[heading.group("head").lower()]
+                state.seen_heading = True
+                rest = (heading.group("rest") or "").strip()
+                if rest and state.section in self._handlers:
+                    self._handlers[state.section](state.result, rest)
                 continue
-            seen.add(key)
-            dedup_skills.append(str(s).strip())
-        result["skills"] = dedup_skills
-        FallbackCVProcessor._normalize_contact_fields(result, raw_text)
 
-        return result 
+            handler = self._handlers.get(state.section)
+            if handler:
+                handler(state.result, line)
+            elif in_header:
+                self._on_header_line(personal, line, allow_name=not state.seen_heading)
+
+        return self._finalize(state.result, raw_text or "")
+
+    @staticmethod
+    def _take_contact(personal: Dict[str, str], line: str, look_for_phone: bool) -> bool:
+        email = _EMAIL_RE.search(_WHITESPACE_RE.sub("", line)) if "@" in line else None
+        phone = _find_phone(line) if look_for_phone else ""
+        if email and not personal["email"]:
+            personal["email"] = email.group(0).lower()
+        if phone and not personal["phone"]:
+            personal["phone"] = phone
+        if not (email or (phone and len(phone) >= len(_NON_DIGIT_RE.sub("", line)))):
+            return False
+        if not personal["location"]:
+            city = _CITY_RE.search(line)
+            if city:
+                personal["location"] = _EMAIL_RE.sub("", _PHONE_RE.sub("", line)).strip(" |,-–")
+        return True
+
+    @staticmethod
+    def _on_header_line(personal: Dict[str, str], line: str, allow_name: bool) -> None:
+        if not personal["location"] and _CITY_RE.search(line):
+            personal["location"] = line
+            return
+        if (
+            allow_name
+            and not personal["full_name"]
+            and 2 <= len(line.split()) <= 5
+            and _NAME_LINE_RE.match(line)
+            and not _NOT_A_NAME_RE.search(line)
+        ):
+            personal["full_name"] = line
+
+    @staticmethod
+    def _on_skills(result: Dict[str, Any], line: str) -> None:
+        line = _strip_bullet(line)[1]
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        items = _split_items(line)
+        if len(items) == 1:
+            item = items[0]
+            if 1 < len(item) <= 40 and len(item.split()) <= 4:
+                result["skills"].append(item)
+            return
+        result["skills"].extend(item for item in items if 1 < len(item) <= 40)
+
+    @staticmethod
+    def _on_experience(result: Dict[str, Any], line: str) -> None:
+        entries = result["experience"]
+        last = entries[-1] if entries else None
+        is_bullet, text = _strip_bullet(line)
+        head, duration = _split_duration(text)
+        has_at = bool(_AT_RE.search(head))
+
+        if is_bullet and not has_at:
+            if last is not None:
+                last["achievements"].append(text)
+            else:
+                entries.append({"position": "", "company": "", "duration": "", "description": text, "achievements": []})
+            return
+
+        if not head:
+            if last is not None and not last["duration"]:
+                last["duration"] = duration
+            else:
+                entries.append({"position": "", "company": "", "duration": duration, "description": "", "achievements": []})
+            return
+
+        if last is not None and not is_bullet and not has_at and len(head.split()) > 8:
+            last["description"] = f"{last['description']} {text}".strip()
+            return
+
+        parts = _AT_RE.split(head, 1) if has_at else [head]
+        if len(parts) == 1:
+            parts = _PIPE_RE.split(head, 1)
+        position = parts[0].strip()
+        company = parts[1].strip() if len(parts) > 1 else ""
+
+        if last is not None and not last["position"] and not last["achievements"]:
+            last["position"] = position
+            last["company"] = last["company"] or company
+            last["duration"] = last["duration"] or duration
+            return
+        entries.append({"position": position, "company": company, "duration": duration, "description": "", "achievements": []})
+
+    @staticmethod
+    def _on_education(result: Dict[str, Any], line: str) -> None:
+        entries = result["education"]
+        last = entries[-1] if entries else None
+        head, duration = _split_duration(_strip_bullet(line)[1])
+
+        if not head:
+            if last is not None and not last["duration"]:
+                last["duration"] = duration
+            else:
+                entries.append({"institution": "", "degree": "", "duration": duration})
+            return
+
+        institution, degree = "", ""
+        parts = _split_items(head) if "," in head or "،" in head else [head]
+        for part in parts:
+            if not institution and _INSTITUTION_RE.search(part):
+                institution = part
+            else:
+                degree = f"{degree}, {part}" if degree else part
+        if degree and not institution and not _DEGREE_RE.search(degree):
+            institution, degree = degree, ""
+
+        if last is not None and not (institution and last["institution"]) and not (degree and last["degree"]):
+            last["institution"] = last["institution"] or institution
+            last["degree"] = last["degree"] or degree
+            last["duration"] = last["duration"] or duration
+            return
+        entries.append({"institution": institution, "degree": degree, "duration": duration})
+
+    @staticmethod
+    def _on_projects(result: Dict[str, Any], line: str) -> None:
+        projects = result["projects"]
+        last = projects[-1] if projects else None
+        is_bullet, text = _strip_bullet(line)
+
+        tech_line = _TECH_LINE_RE.match(text)
+        if tech_line:
+            if last is not None:
+                last["technologies"].extend(_split_items(tech_line.group("value")))
+            return
+
+        parts = _TECH_INLINE_RE.split(text, 1)
+        head = parts[0].strip()
+        technologies = _split_items(parts[1]) if len(parts) > 1 else []
+        title_parts = _TITLE_SPLIT_RE.split(head, 1)
+
+        starts_project = (
+            is_bullet
+            or last is None
+            or len(title_parts) > 1
+            or (last["description"] and len(head.split()) <= 5 and not head.endswith("."))
+        )
+        if not starts_project:
+            last["description"] = f"{last['description']} {head}".strip()
+            last["technologies"].extend(technologies)
+            return
+
+        title = title_parts[0].strip()
+        description = title_parts[1].strip() if len(title_parts) > 1 else ""
+        projects.append({"title": title, "description": description, "technologies": technologies, "achievements": []})
+
+    @staticmethod
+    def _on_languages(result: Dict[str, Any], line: str) -> None:
+        for item in _split_items(_strip_bullet(line)[1]):
+            if len(item) < 50:
+                result["languages"].append(item)
+
+    @staticmethod
+    def _on_certifications(result: Dict[str, Any], line: str) -> None:
+        text = _strip_bullet(line)[1]
+        if text:
+            result["certifications"].append(text)
+
+    @staticmethod
+    def _finalize(result: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+        personal = result["personal_info"]
+        if not personal["email"]:
+            email = _EMAIL_RE.search(raw_text)
+            if email:
+                personal["email"] = email.group(0).lower()
+        if not personal["phone"]:
+            personal["phone"] = _find_phone(raw_text)
+
+        seen = set()
+        skills = []
+        for skill in result["skills"]:
+            skill = FallbackCVProcessor._normalize_skill(skill)
+            key = skill.lower()
+            if key and key not in seen:
+                seen.add(key)
+                skills.append(skill)
+        result["skills"] = skills
+        result["languages"] = list(dict.fromkeys(result["languages"]))
+        return result
+
+
+_SECTION_PARSER = CVSectionParser()
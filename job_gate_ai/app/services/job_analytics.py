@@ -0,0 +1,103 @@
+import math
+from typing import Any, Dict, Iterable, List
+
+# One bucket per ATS point: [0, 1), [1, 2), ... [99, 100]. Percentiles interpolate inside a bucket.
+SCORE_BUCKETS = 100
+DASHBOARD_BUCKET_WIDTH = 10
+PERCENTILES = (25, 50, 75, 90)
+
+
+def empty_aggregate() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "score_sum": 0.0,
+        "score_sq_sum": 0.0,
+        "histogram": [0] * SCORE_BUCKETS,
+        "missing_skills": {},
+        "competency": {},
+    }
+
+
+def _bucket(score: float) -> int:
+    return min(SCORE_BUCKETS - 1, max(0, int(math.floor(score))))
+
+
+def apply_result(
+    aggregate: Dict[str, Any],
+    ats_score: Any,
+    competency_matrix: Iterable[Dict[str, Any]],
+    sign: int = 1,
+) -> Dict[str, Any]:
+    """Add (``sign=1``) or retract (``sign=-1``) one analysis in place; every update is O(skills)."""
+    score = float(ats_score or 0.0)
+    aggregate["count"] += sign
+    aggregate["score_sum"] += sign * score
+    aggregate["score_sq_sum"] += sign * score * score
+    aggregate["histogram"][_bucket(score)] += sign
+
+    missing = aggregate["missing_skills"]
+    competency = aggregate["competency"]
+    for row in competency_matrix or []:
+        skill = str(row.get("required_skill") or "").strip()
+        if not skill:
+            continue
+        cell = competency.setdefault(skill, {"count": 0, "proficiency_sum": 0.0, "missing": 0})
+        cell["count"] += sign
+        cell["proficiency_sum"] += sign * float(row.get("candidate_proficiency") or 0)
+        if row.get("is_missing"):
+            cell["missing"] += sign
+            missing[skill] = missing.get(skill, 0) + sign
+            if missing[skill] <= 0:
+                del missing[skill]
+        if cell["count"] <= 0:
+            del competency[skill]
+    return aggregate
+
+
+def _percentile(histogram: List[int], count: int, q: float) -> float:
+    target = q / 100.0 * count
+    seen = 0
+    for bucket, n in enumerate(histogram):
+        if n and seen + n >= target:
+            return round(bucket + (target - seen) / n, 2)
+        seen += n
+    return float(SCORE_BUCKETS)
+
+
+def summarize(aggregate: Dict[str, Any], top_missing: int = 10) -> Dict[str, Any]:
+    """Dashboard view of an aggregate; cost depends on bucket and skill counts, not applicants."""
+    count = aggregate["count"]
+    histogram = aggregate["histogram"]
+    buckets = [
+        {
+            "range": [start, start + DASHBOARD_BUCKET_WIDTH],
+            "count": sum(histogram[start:start + DASHBOARD_BUCKET_WIDTH]),
+        }
+        for start in range(0, SCORE_BUCKETS, DASHBOARD_BUCKET_WIDTH)
+    ]
+    missing = sorted(aggregate["missing_skills"].items(), key=lambda item: (-item[1], item[0]))[:top_missing]
+    heatmap = [
+        {
+            "skill": skill,
+            "applicants": cell["count"],
+            "mean_proficiency": round(cell["proficiency_sum"] / cell["count"], 2),
+            "missing_rate": round(cell["missing"] / cell["count"], 4),
+        }
+        for skill, cell in sorted(aggregate["competency"].items())
+        if cell["count"] > 0
+    ]
+
+    if not count:
+        return {"applicants": 0, "mean": None, "stddev": None, "percentiles": {},
+                "histogram": buckets, "top_missing_skills": [], "competency_heatmap": []}
+    mean = aggregate["score_sum"] / count
+    variance = max(0.0, aggregate["score_sq_sum"] / count - mean * mean)
+    return {
+        "applicants": count,
+        "mean": round(mean, 2),
+        "stddev": round(math.sqrt(variance), 2),
+        "percentiles": {f"p{q}": _percentile(histogram, count, q) for q in PERCENTILES},
+        "histogram": buckets,
+        "top_missing_skills": [{"skill": skill, "applicants": n} for skill, n in missing],
+        "competency_heatmap": heatmap,
+    }
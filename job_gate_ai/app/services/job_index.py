@@ -0,0 +1,164 @@
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.services.candidate_index import skill_key
+from app.services.cv_document import CVDocument
+from app.services.text_embedding import DEFAULT_EMBEDDING_DIM, cosine_scores, get_text_embedder, top_k
+
+DEFAULT_RECOMMEND_WEIGHTS = {"skills": 0.7, "semantic": 0.3}
+
+
+class JobIndex:
+    """Open job postings compiled for scoring one CV against all of them at once.
+
+    Each posting gets a slot holding its normalized required-skill keys and a row in a float32
+    embedding matrix. A CV's skills are looked up in skill -> slot postings and counted with
+    ``bincount``; the semantic part is a single matrix-vector product. Matched and missing
+    skill lists are only built for the returned top K. Slots freed by ``remove_job`` are reused,
+    so the matrix is sized by the peak number of open postings rather than by churn.
+    """
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM):
+        self._lock = threading.RLock()
+        self._dim = dim
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slot_by_id: Dict[str, int] = {}
+        self._records: List[Optional[Dict[str, Any]]] = []
+        self._vectors = np.zeros((64, self._dim), dtype=np.float32)
+        self._required = np.zeros(64, dtype=np.int64)
+        self._active = np.zeros(64, dtype=bool)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._free_slots: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def build(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Replace the contents with ``jobs`` (see ``upsert_jobs`` for the item shape)."""
+        with self._lock:
+            self._reset()
+            self.upsert_jobs(list(jobs))
+            return len(self)
+
+    def upsert_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+        """Add or replace postings given as ``{job_id, title, description, required_skills}``."""
+        if not jobs:
+            return 0
+        vectors = get_text_embedder().embed_many([job.get("description") or "" for job in jobs])
+        with self._lock:
+            for job, vector in zip(jobs, vectors):
+                job_id = str(job["job_id"])
+                slot = self._slot_by_id.get(job_id)
+                if slot is None:
+                    slot = self._free_slot()
+                    self._slot_by_id[job_id] = slot
+                else:
+                    self._drop_postings(slot)
+
+                skills: Dict[str, str] = {}
+                for skill in job.get("required_skills") or []:
+                    key = skill_key(skill)
+                    if key:
+                        skills.setdefault(key, str(skill).strip())
+                self._records[slot] = {"job_id": job_id, "title": job.get("title"), "skills": skills}
+                self._vectors[slot] = vector
+                self._required[slot] = len(skills)
+                self._active[slot] = True
+                for key in skills:
+                    self._postings[key].add(slot)
+            return len(jobs)
+
+    def _free_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+        slot = len(self._records)
+        self._records.append(None)
+        if slot >= len(self._active):
+            size = 2 * len(self._active)
+            vectors = np.zeros((size, self._dim), dtype=np.float32)
+            vectors[:slot] = self._vectors[:slot]
+            self._vectors = vectors
+            self._required = np.resize(self._required, size)
+            self._active = np.resize(self._active, size)
+            self._active[slot:] = False
+        return slot
+
+    def _drop_postings(self, slot: int) -> None:
+        for key in self._records[slot]["skills"]:
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(slot)
+                if not postings:
+                    del self._postings[key]
+
+    def remove_job(self, job_id: Any) -> bool:
+        with self._lock:
+            slot = self._slot_by_id.pop(str(job_id), None)
+            if slot is None:
+                return False
+            self._drop_postings(slot)
+            self._records[slot] = None
+            self._active[slot] = False
+            self._vectors[slot] = 0.0
+            self._free_slots.append(slot)
+            return True
+
+    def recommend(
+        self,
+        cv: Any,
+        limit: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        min_skill_overlap: int = 0,
+        cv_vector: Optional[np.ndarray] = None,
+    ) -> Dict[str, Any]:
+        """Best open jobs for one CV by required-skill coverage and text similarity.
+
+        ``cv_vector`` is the CV's stored embedding, when there is one.
+        """
+        w = dict(DEFAULT_RECOMMEND_WEIGHTS)
+        w.update({k: float(v) for k, v in (weights or {}).items() if k in w})
+        doc = CVDocument.from_structured(cv)
+        cv_keys = {key for key in (skill_key(s) for s in doc.skills) if key}
+        if cv_vector is None:
+            cv_vector = get_text_embedder().embed(doc.semantic_text)
+
+        with self._lock:
+            n = len(self._records)
+            if not len(self):
+                return {"total_jobs": 0, "results": []}
+            postings = [np.fromiter(self._postings[k], dtype=np.intp) for k in cv_keys if k in self._postings]
+            matched = np.zeros(n, dtype=np.int64)
+            if postings:
+                matched = np.bincount(np.concatenate(postings), minlength=n)[:n]
+            required = self._required[:n]
+            coverage = np.divide(matched, required, out=np.zeros(n), where=required > 0)
+            semantic = np.maximum(cosine_scores(self._vectors[:n], cv_vector), 0.0)
+            scores = w["skills"] * coverage + w["semantic"] * semantic
+
+            eligible = self._active[:n] & (matched >= int(min_skill_overlap))
+            candidates = np.flatnonzero(eligible)
+            results = []
+            for i in candidates[top_k(scores[candidates], limit)]:
+                record = self._records[int(i)]
+                job_skills = record["skills"]
+                results.append({
+                    "job_id": record["job_id"],
+                    "title": record["title"],
+                    "match_score": round(float(scores[i]), 4),
+                    "skill_coverage": round(float(coverage[i]), 4),
+                    "semantic_match_score": round(float(semantic[i]), 4),
+                    "matched_skills": [name for key, name in job_skills.items() if key in cv_keys],
+                    "missing_skills": [name for key, name in job_skills.items() if key not in cv_keys],
+                })
+            return {"total_jobs": int(len(candidates)), "results": results}
+
+
+@lru_cache(maxsize=1)
+def get_job_index() -> JobIndex:
+    return JobIndex()
@@ -0,0 +1,364 @@
+import atexit
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER_DB_PATH = os.path.join(".", "data", "llm_ledger.sqlite3")
+FLUSH_INTERVAL_SECONDS = 2.0
+FLUSH_BATCH_SIZE = 200
+
+# USD per million (prompt, completion) tokens; LLM_PRICING_PER_1M overrides or extends this.
+DEFAULT_PRICING_PER_1M: Dict[str, Tuple[float, float]] = {
+    "deepseek/deepseek-chat": (0.27, 1.10),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+GROUP_BY_COLUMNS = ("day", "call_site", "model", "user_id", "key_id", "status")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS llm_usage (
+        id INTEGER PRIMARY KEY,
+        ts TEXT NOT NULL,
+        day TEXT NOT NULL,
+        call_site TEXT,
+        model TEXT,
+        user_id TEXT,
+        key_id TEXT,
+        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+        completion_tokens INTEGER NOT NULL DEFAULT 0,
+        latency_ms REAL NOT NULL DEFAULT 0,
+        cost_usd REAL NOT NULL DEFAULT 0,
+        status TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_llm_usage_key_day ON llm_usage (key_id, day)",
+    "CREATE INDEX IF NOT EXISTS ix_llm_usage_day ON llm_usage (day)",
+)
+
+# Who the current request is spending for; set by auth and by endpoints that know the user.
+_llm_caller: ContextVar[Dict[str, Any]] = ContextVar("llm_caller", default={})
+
+
+class LLMBudgetExceeded(Exception):
+    pass
+
+
+def key_id_for(api_key: Optional[str]) -> Optional[str]:
+    """Ledger rows and budgets identify keys by a short hash, never the raw key."""
+    if not api_key:
+        return None
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def set_llm_caller(user_id: Any = None, api_key: Optional[str] = None) -> None:
+    caller = dict(_llm_caller.get())
+    if user_id is not None:
+        caller["user_id"] = str(user_id)
+    if api_key is not None:
+        caller["api_key"] = api_key
+        caller["key_id"] = key_id_for(api_key)
+    _llm_caller.set(caller)
+
+
+def current_llm_caller() -> Dict[str, Any]:
+    return _llm_caller.get()
+
+
+def _parse_pairs(raw: str) -> Dict[str, str]:
+    pairs = {}
+    for item in (raw or "").split(","):
+        name, sep, value = item.strip().rpartition("=")
+        if sep and name:
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def _load_pricing() -> Dict[str, Tuple[float, float]]:
+    pricing = dict(DEFAULT_PRICING_PER_1M)
+    for model, value in _parse_pairs(os.getenv("LLM_PRICING_PER_1M", "")).items():
+        try:
+            prompt, completion = value.split(":")
+            pricing[model] = (float(prompt), float(completion))
+        except ValueError:
+            logger.warning(f"Ignoring malformed LLM price for {model}: {value}")
+    return pricing
+
+
+def _load_budgets() -> Tuple[Dict[str, float], Optional[float]]:
+    budgets = {}
+    for api_key, value in _parse_pairs(os.getenv("LLM_DAILY_BUDGETS_USD", "")).items():
+        try:
+            budgets[key_id_for(api_key)] = float(value)
+        except ValueError:
+            logger.warning("Ignoring malformed LLM daily budget entry")
+    default = os.getenv("LLM_DEFAULT_DAILY_BUDGET_USD", "")
+    return budgets, (float(default) if default else None)
+
+
+class LLMUsageLedger:
+    """Append-only record of LLM calls with per-key daily budgets, kept in its own SQLite file.
+
+    ``record`` only appends to an in-memory buffer; a daemon thread writes the buffer in one
+    transaction every ``FLUSH_INTERVAL_SECONDS`` or once ``FLUSH_BATCH_SIZE`` rows are waiting,
+    and the buffer is flushed again at shutdown. Today's spend per key is kept in memory (seeded
+    from the file on first use) so the budget check on every call does no I/O.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        self.pricing = _load_pricing()
+        self.budgets, self.default_budget = _load_budgets()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: List[tuple] = []
+        self._spend: Dict[Tuple[Optional[str], str], float] = {}
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="llm-ledger-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self.pricing.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def record(
+        self,
+        call_site: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_ms: float = 0.0,
+        cost_usd: Optional[float] = None,
+        status: str = "ok",
+        user_id: Optional[str] = None,
+        key_id: Optional[str] = None,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        day = now.date().isoformat()
+        if cost_usd is None:
+            cost_usd = self.estimate_cost(model, prompt_tokens, completion_tokens)
+        row = (
+            now.isoformat(), day, call_site, model, user_id, key_id,
+            int(prompt_tokens), int(completion_tokens), round(float(latency_ms), 2), float(cost_usd), status,
+        )
+        with self._lock:
+            self._spend_entry(key_id, day)
+            self._spend[(key_id, day)] += float(cost_usd)
+            self._buffer.append(row)
+            full = len(self._buffer) >= FLUSH_BATCH_SIZE
+        if full:
+            self._wake.set()
+
+    def _spend_entry(self, key_id: Optional[str], day: str) -> None:
+        # Caller holds self._lock. Seeded from the file once per key and day (spend by earlier
+        # processes); after that every record in this process is added in memory.
+        if (key_id, day) not in self._spend:
+            with closing(self._connect()) as conn:
+                spent = conn.execute(
+                    "SELECT COALESCE(SUM(cost_usd), 0) FROM llm_usage WHERE key_id IS ? AND day = ?",
+                    (key_id, day),
+                ).fetchone()[0]
+            self._spend[(key_id, day)] = float(spent)
+
+    def budget_for(self, key_id: Optional[str]) -> Optional[float]:
+        return self.budgets.get(key_id, self.default_budget)
+
+    def spent_today(self, key_id: Optional[str]) -> float:
+        day = datetime.now(timezone.utc).date().isoformat()
+        with self._lock:
+            self._spend_entry(key_id, day)
+            return self._spend[(key_id, day)]
+
+    def budget_exhausted(self, key_id: Optional[str]) -> bool:
+        budget = self.budget_for(key_id)
+        return budget is not None and self.spent_today(key_id) >= budget
+
+    def budget_status(self, key_id: Optional[str]) -> Dict[str, Any]:
+        budget = self.budget_for(key_id)
+        spent = self.spent_today(key_id)
+        return {
+            "key_id": key_id,
+            "daily_budget_usd": budget,
+            "spent_today_usd": round(spent, 6),
+            "remaining_usd": None if budget is None else round(max(0.0, budget - spent), 6),
+            "exhausted": budget is not None and spent >= budget,
+        }
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.executemany(
+                        "INSERT INTO llm_usage (ts, day, call_site, model, user_id, key_id, prompt_tokens,"
+                        " completion_tokens, latency_ms, cost_usd, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except Exception as e:
+                logger.error(f"LLM ledger flush failed, keeping {len(rows)} rows for retry: {e}")
+                with self._lock:
+                    self._buffer = rows + self._buffer
+                return 0
+            return len(rows)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def aggregate(
+        self,
+        group_by: List[str],
+        day_from: Optional[str] = None,
+        day_to: Optional[str] = None,
+        user_id: Optional[str] = None,
+        key_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Token, cost and latency totals grouped by any of ``GROUP_BY_COLUMNS``."""
+        columns = [column for column in group_by if column in GROUP_BY_COLUMNS]
+        filters, params = [], []
+        for column, op, value in (("day", ">=", day_from), ("day", "<=", day_to),
+                                  ("user_id", "=", user_id), ("key_id", "=", key_id)):
+            if value is not None:
+                filters.append(f"{column} {op} ?")
+                params.append(value)
+        select = ", ".join(columns + [
+            "COUNT(*)", "SUM(prompt_tokens)", "SUM(completion_tokens)", "SUM(cost_usd)", "AVG(latency_ms)",
+        ])
+        sql = f"SELECT {select} FROM llm_usage"
+        if filters:
+            sql += " WHERE " + " AND ".join(filters)
+        if columns:
+            sql += " GROUP BY " + ", ".join(columns)
+        sql += " ORDER BY SUM(cost_usd) DESC"
+
+        self.flush()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            calls, prompt, completion, cost, latency = row[len(columns):]
+            if not calls:
+                continue
+            item = dict(zip(columns, row[:len(columns)]))
+            item.update({
+                "calls": calls,
+                "prompt_tokens": prompt or 0,
+                "completion_tokens": completion or 0,
+                "cost_usd": round(cost or 0.0, 6),
+                "avg_latency_ms": round(latency or 0.0, 1),
+            })
+            results.append(item)
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_llm_ledger() -> LLMUsageLedger:
+    return LLMUsageLedger(os.getenv("LLM_LEDGER_DB_PATH") or DEFAULT_LEDGER_DB_PATH)
+
+
+def llm_budget_exhausted() -> bool:
+    """Whether the current request's API key has used up today's LLM budget."""
+    return get_llm_ledger().budget_exhausted(current_llm_caller().get("key_id"))
+
+
+def _call_site(depth: int) -> str:
+    frame = sys._getframe(depth + 1)
+    module = frame.f_globals.get("__name__", "?").rsplit(".", 1)[-1]
+    return f"{module}.{frame.f_code.co_name}"
+
+
+class _MeteredCompletions:
+    def __init__(self, completions: Any):
+        self._completions = completions
+
+    def create(self, *args: Any, call_site: Optional[str] = None, **kwargs: Any) -> Any:
+        ledger = get_llm_ledger()
+        caller = current_llm_caller()
+        key_id = caller.get("key_id")
+        site = call_site or _call_site(1)
+        model = kwargs.get("model") or ""
+        if ledger.budget_exhausted(key_id):
+            ledger.record(site, model, status="budget_exceeded", user_id=caller.get("user_id"), key_id=key_id)
+            raise LLMBudgetExceeded(f"Daily LLM budget exhausted for key {key_id}")
+
+        def log(usage: Any, status: str) -> None:
+            prompt = getattr(usage, "prompt_tokens", 0) or 0
+            completion = getattr(usage, "completion_tokens", 0) or 0
+            # OpenRouter reports the billed cost; otherwise estimate from the price table.
+            cost = getattr(usage, "cost", None)
+            ledger.record(
+                site, model, prompt, completion, (time.perf_counter() - start) * 1000,
+                cost_usd=float(cost) if isinstance(cost, (int, float)) else None,
+                status=status, user_id=caller.get("user_id"), key_id=key_id,
+            )
+
+        if kwargs.get("stream"):
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        start = time.perf_counter()
+        try:
+            response = self._completions.create(*args, **kwargs)
+        except Exception:
+            log(None, "error")
+            raise
+        if kwargs.get("stream"):
+            return self._metered_stream(response, log)
+        log(getattr(response, "usage", None), "ok")
+        return response
+
+    @staticmethod
+    def _metered_stream(stream: Any, log: Any):
+        usage = None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        finally:
+            log(usage, "ok" if usage is not None else "stream_incomplete")
+
+
+class _MeteredChat:
+    def __init__(self, chat: Any):
+        self.completions = _MeteredCompletions(chat.completions)
+
+
+class MeteredOpenAI:
+    """Wraps an OpenAI client so every ``chat.completions.create`` lands in the usage ledger."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.chat = _MeteredChat(client.chat)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
@@ -3,9 +3,15 @@ import os
 import json 
 import logging 
 import re
-from typing import Dict ,Any ,Optional, List
+from typing import Dict ,Any ,Optional, List, Union
 from openai import OpenAI 
 
+from app.services.cv_document import CVDocument
+from app.services.llm_ledger import MeteredOpenAI, llm_budget_exhausted
+from app.services.skill_matcher import SkillMatcher, proficiency_from_similarity
+from app.services.skill_taxonomy import get_skill_taxonomy
+from app.services.translation_memory import estimate_tokens, get_translation_memory, join_segments, split_segments
+
 logger =logging .getLogger (__name__ )
 
 class LLMService :
@@ -19,18 +25,19 @@ class LLMService :
             self .client =None 
         else :
             try :
-                self .client =OpenAI (
+                self .client =MeteredOpenAI (OpenAI (
                 api_key =self .api_key ,
                 base_url =self .base_url ,
                 timeout =30.0 
-                )
+                ))
                 logger .info (f"✅ LLM Service initialized with model: {self .model }")
             except Exception as e :
                 logger .error (f"❌ Failed to initialize LLM client: {e }")
                 self .client =None 
 
     def is_available (self )->bool :
-        return self .client is not None 
+        # A key over its daily LLM budget degrades to the same fallback paths as a missing key.
+        return self .client is not None and not llm_budget_exhausted ()
 
     def _required_cv_keys(self) -> Dict[str, Any]:
         return {
@@ -209,6 +216,44 @@ class LLMService :
     def translate_text (self ,text :str ,target_language :str ="english")->str :
         if not text :
             return text 
+        translations =self .translate_segments (split_segments (text ),target_language )
+        return join_segments (text ,translations )
+
+    def translate_segments (self ,segments :List [str ],target_language :str )->Dict [str ,str ]:
+        """Translations of the given segments; only ones the translation memory lacks reach the LLM."""
+        source_language ={"arabic":"english","english":"arabic"}.get (target_language )
+        return get_translation_memory ().translate (
+        segments ,
+        target_language ,
+        (lambda chunk :self ._translate_chunk (chunk ,target_language ))if self .is_available ()else None ,
+        source_language =source_language ,
+        )
+
+    def _translate_chunk (self ,segments :List [str ],target_language :str )->List [Optional [str ]]:
+        numbered ={str (i ):segment for i ,segment in enumerate (segments ,1 )}
+        prompt =f"""
+        Translate each value to {target_language }.
+        Keep names, emails, URLs, and numbers unchanged.
+        Return ONLY JSON with the same keys.
+        {json .dumps (numbered ,ensure_ascii =False )}
+        """
+        try :
+            response =self .client .chat .completions .create (
+            model =self .model ,
+            messages =[
+            {"role":"system","content":"You are a professional translator. Return only JSON."},
+            {"role":"user","content":prompt }
+            ],
+            temperature =0.2 ,
+            # Output runs longer than the source, Arabic especially.
+            max_tokens =min (4000 ,2 *sum (estimate_tokens (s )for s in segments )+100 ),
+            response_format ={"type":"json_object"}
+            )
+            parsed =self ._coerce_json_object (response .choices [0 ].message .content )or {}
+        except Exception as e :
+            logger .error (f"Translation chunk failed: {e }")
+            return [None ]*len (segments )
+        return [parsed .get (key )if isinstance (parsed .get (key ),str )else None for key in numbered ]
 
     def clean_job_description (self ,job_description :str )->str :
         if not job_description :
@@ -242,9 +287,9 @@ class LLMService :
             logger .error (f"Job description cleanup failed: {e }")
             return job_description 
 
-    def generate_ai_intelligence (self ,cv_text :str ,job_description :str ="" )->Dict [str ,Any ]:
+    def generate_ai_intelligence (self ,cv_text :str ,job_description :str ="" ,cv_document :Optional [CVDocument ]=None )->Dict [str ,Any ]:
         if not self .is_available ():
-            return self._build_fallback_ai_intelligence(cv_text, job_description)
+            return self._build_fallback_ai_intelligence(cv_text, job_description, cv_document)
 
         prompt =f"""
         You are an Expert Technical Recruiter and Career Analyst.
@@ -288,11 +333,11 @@ class LLMService :
 
             parsed = json .loads (response .choices [0 ].message .content )
             if not isinstance(parsed, dict):
-                return self._build_fallback_ai_intelligence(cv_text, job_description)
-            return self._merge_ai_intelligence(parsed, self._build_fallback_ai_intelligence(cv_text, job_description))
+                return self._build_fallback_ai_intelligence(cv_text, job_description, cv_document)
+            return self._merge_ai_intelligence(parsed, self._build_fallback_ai_intelligence(cv_text, job_description, cv_document))
         except Exception as e :
             logger .error (f"AI intelligence generation failed: {e }")
-            return self._build_fallback_ai_intelligence(cv_text, job_description)
+            return self._build_fallback_ai_intelligence(cv_text, job_description, cv_document)
 
     def _merge_ai_intelligence(self, primary: Dict[str, Any], fallback: Dict[str, Any]) -> Dict[str, Any]:
         result = dict(fallback)
@@ -307,10 +352,13 @@ class LLMService :
                 result[key] = value
         return result
 
-    def _build_fallback_ai_intelligence(self, cv_text: str, job_description: str = "") -> Dict[str, Any]:
-        structured = self._parse_with_fallback(cv_text or "")
-        skills = structured.get("skills") or []
-        skills = [str(s).strip() for s in skills if str(s).strip()]
+    def _build_fallback_ai_intelligence(
+        self, cv_text: str, job_description: str = "", cv_document: Optional[CVDocument] = None
+    ) -> Dict[str, Any]:
+        # Callers that already parsed the CV pass it in; otherwise parse the raw text here.
+        if cv_document is None:
+            cv_document = CVDocument.from_structured(self._parse_with_fallback(cv_text or ""))
+        skills = cv_document.skills
         strengths = []
         if skills:
             strengths.append(f"Demonstrated skills in {', '.join(skills[:6])}.")
@@ -318,7 +366,8 @@ class LLMService :
 
         weaknesses = []
         required = self.extract_required_skills(job_description or "")
-        missing = [s for s in required if s.lower() not in {k.lower() for k in skills}]
+        matcher = cv_document.skill_matcher
+        missing = [s for s in required if matcher.best_match(s)[0] is None]
         if missing:
             weaknesses.append(f"Consider strengthening: {', '.join(missing[:6])}.")
         else:
@@ -358,24 +407,9 @@ class LLMService :
         if not job_description:
             return []
 
-        known_skills = [
-            "python", "java", "javascript", "typescript", "react", "node", "node.js",
-            "sql", "mysql", "postgresql", "mongodb", "aws", "azure", "gcp",
-            "docker", "kubernetes", "fastapi", "django", "flask", "spring",
-            "html", "css", "tailwind", "rest", "graphql", "git", "linux",
-            "tensorflow", "pytorch", "machine learning", "data analysis",
-            "communication", "leadership", "problem solving", "figma", "ui", "ux"
-        ]
-
-        lower = job_description.lower()
-        found = []
-        for skill in known_skills:
-            pattern = r"\b" + re.escape(skill) + r"\b"
-            if re.search(pattern, lower):
-                found.append(skill)
-
+        found = get_skill_taxonomy().extract(job_description)
         if found:
-            return sorted(list(dict.fromkeys(found)))[:20]
+            return sorted(found, key=str.lower)[:20]
 
         tokens = re.findall(r"[a-zA-Z][a-zA-Z\+\#\.\-]{2,}", job_description.lower())
         stop_words = {
@@ -392,18 +426,23 @@ class LLMService :
         ranked = sorted(freq.items(), key=lambda x: x[1], reverse=True)
         return [skill for skill, _ in ranked[:10]]
 
-    def build_competency_matrix(self, candidate_skills: List[str], required_skills: List[str]) -> List[Dict[str, Any]]:
-        normalized_candidate = {str(skill).strip().lower() for skill in (candidate_skills or []) if str(skill).strip()}
+    def build_competency_matrix(
+        self, candidate_skills: Union[CVDocument, List[str]], required_skills: List[str]
+    ) -> List[Dict[str, Any]]:
+        if isinstance(candidate_skills, CVDocument):
+            matcher = candidate_skills.skill_matcher
+        else:
+            matcher = SkillMatcher(candidate_skills or [])
         matrix = []
         for req in required_skills:
-            req_norm = str(req).strip().lower()
-            matched = any(req_norm in cand or cand in req_norm for cand in normalized_candidate)
-            proficiency = 88 if matched else 24
+            matched_skill, similarity = matcher.best_match(req)
             matrix.append({
                 "required_skill": req,
-                "candidate_proficiency": proficiency,
+                "candidate_proficiency": proficiency_from_similarity(similarity, matched_skill is not None),
                 "job_target": 100,
-                "is_missing": not matched
+                "is_missing": matched_skill is None,
+                "matched_skill": matched_skill,
+                "similarity": similarity,
             })
         return matrix
 
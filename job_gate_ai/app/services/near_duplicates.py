@@ -0,0 +1,140 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.services.skill_taxonomy import normalize_skill_text
+
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+SHINGLE_WORDS = 3
+# Flag uploads at or above this estimated Jaccard similarity to a stored CV.
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# A prior parse is only reused as a warm start when the texts are this close.
+WARM_START_THRESHOLD = 0.9
+
+_TOKEN_RE = re.compile(r"\w+")
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(h: np.ndarray) -> np.ndarray:
+    h = h + _GOLDEN
+    h = (h ^ (h >> np.uint64(30))) * _MIX1
+    h = (h ^ (h >> np.uint64(27))) * _MIX2
+    return h ^ (h >> np.uint64(31))
+
+
+# One fixed seed per permutation. Signatures are persisted, so every process must derive the same ones.
+_PERM_SEEDS = _splitmix64(np.arange(1, NUM_PERMUTATIONS + 1, dtype=np.uint64))
+
+
+def shingle_hashes(text: Any, size: int = SHINGLE_WORDS) -> np.ndarray:
+    """CRC32 of every distinct run of ``size`` normalized words."""
+    tokens = _TOKEN_RE.findall(normalize_skill_text(text))
+    if len(tokens) < size:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text: Any) -> np.ndarray:
+    """Per-permutation minimum of a seeded 64-bit mix of every shingle, kept as uint32."""
+    shingles = shingle_hashes(text)
+    if not len(shingles):
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint32)
+    hashed = _splitmix64(shingles[None, :] ^ _PERM_SEEDS[:, None])
+    return (hashed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """LSH over MinHash signatures of stored CV text.
+
+    Signatures are cut into ``LSH_BANDS`` bands; two CVs become candidates when any band
+    matches exactly, so a lookup only compares against the CVs sharing a bucket. With 16
+    bands of 8 rows, pairs at Jaccard 0.8 collide with probability ~0.95 and pairs at 0.5
+    with ~0.06.
+    """
+
+    def __init__(self, bands: int = LSH_BANDS):
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self._lock = threading.RLock()
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._owners: Dict[int, Any] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [defaultdict(set) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, analysis_id: int, signature: np.ndarray, user_id: Any = None) -> None:
+        with self._lock:
+            if analysis_id in self._signatures:
+                self.remove(analysis_id)
+            self._signatures[analysis_id] = signature
+            self._owners[analysis_id] = user_id
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                band[key].add(analysis_id)
+
+    def remove(self, analysis_id: int) -> bool:
+        with self._lock:
+            signature = self._signatures.pop(analysis_id, None)
+            if signature is None:
+                return False
+            self._owners.pop(analysis_id, None)
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                members = band.get(key)
+                if members is not None:
+                    members.discard(analysis_id)
+                    if not members:
+                        del band[key]
+            return True
+
+    def nearest(
+        self, signature: np.ndarray, threshold: float = NEAR_DUPLICATE_THRESHOLD
+    ) -> Optional[Dict[str, Any]]:
+        """Closest stored CV whose estimated Jaccard similarity is at least ``threshold``."""
+        best_id, best_similarity = None, -1.0
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                candidates |= band.get(key, set())
+            for analysis_id in sorted(candidates):
+                similarity = estimated_jaccard(signature, self._signatures[analysis_id])
+                if similarity > best_similarity:
+                    best_id, best_similarity = analysis_id, similarity
+            if best_id is None or best_similarity < threshold:
+                return None
+            return {
+                "analysis_id": best_id,
+                "user_id": self._owners.get(best_id),
+                "similarity": round(best_similarity, 4),
+                "candidates_compared": len(candidates),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    return NearDuplicateIndex()
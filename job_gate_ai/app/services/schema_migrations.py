@@ -0,0 +1,46 @@
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.models.database_models import Base
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """Bring tables created by an older ``create_all`` up to the current models.
+
+    ``create_all`` only creates missing tables, so columns added to an existing model are
+    added here with ``ALTER TABLE ... ADD COLUMN`` together with their indexes. Only nullable
+    columns without server defaults are supported, which is what additive changes use.
+    Safe to run on every start; returns the ``table.column`` names that were added.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added: List[str] = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in present]
+            if not missing:
+                continue
+
+            preparer = engine.dialect.identifier_preparer
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                )
+                added.append(f"{table.name}.{column.name}")
+
+            missing_names = {column.name for column in missing}
+            indexed = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexed and {c.name for c in index.columns} & missing_names:
+                    conn.execute(CreateIndex(index))
+
+    return added
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 1800.0
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+
+
+class _Entry:
+    __slots__ = ("value", "dirty", "touched")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.dirty = False
+        self.touched = time.monotonic()
+
+
+class WriteBackCache:
+    """Bounded, TTL-evicting, read-through and write-back cache of mutable session states.
+
+    ``get`` serves hot entries from memory and loads misses with ``loader``. Callers mutate the
+    returned value in place while holding ``lock(key)`` and then call ``mark_dirty``. Dirty
+    entries are written with ``saver`` by a background task every ``flush_interval`` seconds, on
+    ``flush(key)`` and on ``close``. Only clean, unpinned entries are evicted, either when idle for
+    ``ttl_seconds`` or when the cache holds more than ``max_entries`` (least recently used first).
+    ``pin`` keeps an entry resident while a long-lived consumer such as a WebSocket holds it.
+
+    The cache is per process. With several workers, route each session to a single worker or set
+    ``max_entries=0``, which makes every ``get`` load and every ``mark_dirty`` save immediately.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[Any]],
+        saver: Callable[[Any], None],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.loader = loader
+        self.saver = saver
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._pins: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """Per-key lock that keeps turns on the same session in order."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def pin(self, key: str) -> None:
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str) -> None:
+        remaining = self._pins.get(key, 0) - 1
+        if remaining > 0:
+            self._pins[key] = remaining
+        else:
+            self._pins.pop(key, None)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry.touched = time.monotonic()
+            self._entries.move_to_end(key)
+            return entry.value
+        self.misses += 1
+        value = await asyncio.to_thread(self.loader, key)
+        if value is not None and self.enabled:
+            # Another coroutine may have loaded it while this one waited on the loader.
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry.value
+            self._entries[key] = _Entry(value)
+            self._evict()
+        return value
+
+    async def mark_dirty(self, key: str, value: Any) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            await asyncio.to_thread(self.saver, value)
+            return
+        entry.dirty = True
+        entry.touched = time.monotonic()
+
+    async def flush(self, key: Optional[str] = None) -> int:
+        """Write the dirty entry for ``key``, or every dirty entry; returns how many were written."""
+        keys = [key] if key is not None else [k for k, e in self._entries.items() if e.dirty]
+        written = 0
+        for k in keys:
+            async with self.lock(k):
+                entry = self._entries.get(k)
+                if entry is None or not entry.dirty:
+                    continue
+                entry.dirty = False
+                try:
+                    await asyncio.to_thread(self.saver, entry.value)
+                    written += 1
+                except Exception as e:
+                    entry.dirty = True
+                    logger.error(f"Session flush failed for {k}: {e}")
+        return written
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            self._locks.pop(key, None)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in list(self._entries):
+            entry = self._entries[key]
+            over_capacity = len(self._entries) > self.max_entries
+            expired = now - entry.touched > self.ttl_seconds
+            if not (over_capacity or expired):
+                continue
+            lock = self._locks.get(key)
+            if entry.dirty or key in self._pins or (lock is not None and lock.locked()):
+                continue
+            self.discard(key)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                self._evict()
+            except Exception as e:
+                logger.error(f"Session cache flush loop error: {e}")
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        written = await self.flush()
+        if written:
+            logger.info(f"Flushed {written} cached sessions on shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+            "pinned": len(self._pins),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
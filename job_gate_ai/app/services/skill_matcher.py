@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.skill_taxonomy import get_skill_taxonomy, normalize_skill_text
+
+DEFAULT_MATCH_THRESHOLD = 0.45
+
+
+def skill_trigrams(skill: str) -> Set[str]:
+    """Character trigrams of each word, padded like pg_trgm (two spaces before, one after)."""
+    grams = set()
+    for word in normalize_skill_text(skill).split(" "):
+        if not word:
+            continue
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SkillMatcher:
+    """Fuzzy matcher over one candidate's skills, built once per CV.
+
+    Skills are first mapped to taxonomy canonical names, so aliases such as "Postgres" and
+    "PostgreSQL" match exactly. Everything else is scored by trigram Jaccard similarity
+    through an inverted index, which only touches candidates sharing at least one trigram.
+    """
+
+    def __init__(self, candidate_skills: Iterable[Any], threshold: float = DEFAULT_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._taxonomy = get_skill_taxonomy()
+        self._skills: List[str] = []
+        self._sizes: List[int] = []
+        self._by_key: Dict[str, int] = {}
+        self._index: Dict[str, List[int]] = defaultdict(list)
+
+        for skill in candidate_skills or []:
+            text = str(skill or "").strip()
+            key = self._key(text)
+            if not key or key in self._by_key:
+                continue
+            idx = len(self._skills)
+            self._skills.append(text)
+            self._by_key[key] = idx
+            grams = skill_trigrams(key)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._index[gram].append(idx)
+
+    def _key(self, skill: str) -> str:
+        return normalize_skill_text(self._taxonomy.normalize(skill))
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def best_match(self, required_skill: Any) -> Tuple[Optional[str], float]:
+        """Return ``(candidate_skill, similarity)``; the skill is None below the threshold."""
+        key = self._key(str(required_skill or ""))
+        if not key:
+            return None, 0.0
+        exact = self._by_key.get(key)
+        if exact is not None:
+            return self._skills[exact], 1.0
+
+        grams = skill_trigrams(key)
+        if not grams:
+            return None, 0.0
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for idx in self._index.get(gram, ()):
+                shared[idx] += 1
+
+        best_idx, best_sim = None, 0.0
+        # Sorted so ties go to the skill listed first on the CV, independent of hash seeds.
+        for idx, count in sorted(shared.items()):
+            sim = count / (len(grams) + self._sizes[idx] - count)
+            if sim > best_sim:
+                best_idx, best_sim = idx, sim
+
+        best_sim = round(best_sim, 3)
+        if best_idx is None or best_sim < self.threshold:
+            return None, best_sim
+        return self._skills[best_idx], best_sim
+
+
+def proficiency_from_similarity(similarity: float, matched: bool) -> int:
+    """Matches map similarity onto 60-100; misses keep their partial overlap below 60."""
+    if matched:
+        return int(round(60 + 40 * similarity))
+    return int(round(60 * similarity))
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "skill_taxonomy.json"
+)
+
+_ARABIC_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه", "ـ": None})
+_WHITESPACE_RE = re.compile(r"\s+")
+# Attached conjunctions/prepositions that may precede an Arabic skill without a space.
+_ARABIC_CLITICS = frozenset({"و", "ب", "ل", "ف", "ك", "وال", "بال", "فال", "كال", "لل", "وب", "ول", "ولل"})
+
+
+def normalize_skill_text(text: Any) -> str:
+    """Lowercase, fold Arabic letter variants and collapse whitespace."""
+    return _WHITESPACE_RE.sub(" ", str(text or "").lower().translate(_ARABIC_FOLD)).strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _is_arabic(ch: str) -> bool:
+    return "\u0600" <= ch <= "\u06ff"
+
+
+class _AhoCorasick:
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, int]]] = [[]]
+        for pattern, value in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append((len(pattern), value))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                if out[fail[nxt]]:
+                    out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(end_index, length, value)`` for every pattern occurrence in one pass."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, value in out[node]:
+                yield i, length, value
+
+
+class SkillTaxonomy:
+    """Canonical skills with aliases, Arabic names and categories, compiled into one automaton.
+
+    Entries look like ``{"name": "PostgreSQL", "category": "database", "aliases": ["postgres"],
+    "ar": [...], "ambiguous": false}``. Ambiguous names (``Go``, ``Swift``, ``Spring``) and
+    ``ambiguous_aliases`` (``node``, ``excel``) are everyday words, so they are only used to
+    normalize explicit skill lists, never to extract from free text.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]]):
+        self._names: List[str] = []
+        self._categories: List[str] = []
+        self._lookup: Dict[str, int] = {}
+        patterns: List[Tuple[str, int]] = []
+
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            name = str(entry.get("name") or "").strip()
+            if not name or normalize_skill_text(name) in self._lookup:
+                continue
+            skill_id = len(self._names)
+            self._names.append(name)
+            self._categories.append(str(entry.get("category") or "other"))
+
+            # Arabic forms transliterate the name, so they are as ambiguous as the name itself.
+            extractable_name = not entry.get("ambiguous")
+            forms = [(name, extractable_name)]
+            forms += [(alias, True) for alias in entry.get("aliases") or []]
+            forms += [(alias, False) for alias in entry.get("ambiguous_aliases") or []]
+            for arabic in entry.get("ar") or []:
+                forms.append((arabic, extractable_name))
+                folded = normalize_skill_text(arabic)
+                if folded.startswith("ال") and len(folded.split(" ", 1)[0]) > 4:
+                    forms.append((folded[2:], extractable_name))
+
+            for form, extractable in forms:
+                key = normalize_skill_text(form)
+                if not key:
+                    continue
+                self._lookup.setdefault(key, skill_id)
+                if extractable:
+                    patterns.append((key, skill_id))
+
+        self._automaton = _AhoCorasick(patterns)
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        entries = data.get("skills", []) if isinstance(data, dict) else data
+        return cls(entries or [])
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, skill: Any) -> bool:
+        return normalize_skill_text(skill) in self._lookup
+
+    def canonical(self, skill: Any) -> Optional[str]:
+        skill_id = self._lookup.get(normalize_skill_text(skill))
+        return self._names[skill_id] if skill_id is not None else None
+
+    def normalize(self, skill: Any) -> str:
+        """Return the canonical name for a known skill, otherwise the trimmed input."""
+        return self.canonical(skill) or str(skill or "").strip()
+
+    def category(self, skill: Any) -> Optional[str]:
+        skill_id = self._lookup.get(normalize_skill_text(skill))
+        return self._categories[skill_id] if skill_id is not None else None
+
+    def extract(self, text: Any) -> List[str]:
+        """Canonical skills mentioned in ``text``, in order of first appearance.
+
+        Runs in time linear in the text length regardless of taxonomy size. Matches must sit on
+        word boundaries (Arabic matches may carry an attached clitic such as و or بال), and
+        overlapping matches resolve to the longest one starting first.
+        """
+        norm = normalize_skill_text(text)
+        if not norm:
+            return []
+
+        candidates = []
+        size = len(norm)
+        for end, length, skill_id in self._automaton.iter_matches(norm):
+            start = end - length + 1
+            if end + 1 < size and _is_word_char(norm[end + 1]):
+                continue
+            if start > 0 and _is_word_char(norm[start - 1]) and not self._has_clitic(norm, start):
+                continue
+            candidates.append((start, -length, skill_id))
+
+        candidates.sort()
+        found: List[str] = []
+        seen = set()
+        covered_until = -1
+        for start, neg_length, skill_id in candidates:
+            if start <= covered_until:
+                continue
+            covered_until = start - neg_length - 1
+            if skill_id not in seen:
+                seen.add(skill_id)
+                found.append(self._names[skill_id])
+        return found
+
+    @staticmethod
+    def _has_clitic(text: str, start: int) -> bool:
+        if not _is_arabic(text[start]):
+            return False
+        i = start
+        while i > 0 and _is_word_char(text[i - 1]):
+            i -= 1
+        return text[i:start] in _ARABIC_CLITICS
+
+
+@lru_cache(maxsize=1)
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy; ``SKILL_TAXONOMY_PATH`` points at a larger file when deployed."""
+    path = os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH
+    try:
+        taxonomy = SkillTaxonomy.load(path)
+    except Exception as e:
+        logger.error(f"Failed to load skill taxonomy from {path}: {e}")
+        if path == DEFAULT_TAXONOMY_PATH:
+            return SkillTaxonomy([])
+        taxonomy = SkillTaxonomy.load(DEFAULT_TAXONOMY_PATH)
+    logger.info(f"Loaded skill taxonomy with {len(taxonomy)} skills")
+    return taxonomy
@@ -0,0 +1,171 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.skill_taxonomy import normalize_skill_text
+
+DEFAULT_EMBEDDING_DIM = 4096
+_EMBED_CHUNK_ROWS = 256
+
+_TOKEN_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+_PRIME = np.uint64(0x100000001B3)
+_MIX1 = np.uint64(0xFF51AFD7ED558CCD)
+_MIX2 = np.uint64(0xC4CEB9FE1A85EC53)
+_SHIFT33 = np.uint64(33)
+_SHIFT63 = np.uint64(63)
+
+
+def _seed(kind: int, n: int) -> np.uint64:
+    return np.uint64(((kind << 8 | n) * 0x9E3779B97F4A7C15) & _MASK64)
+
+
+def _fmix64(h: np.ndarray) -> np.ndarray:
+    h = h ^ (h >> _SHIFT33)
+    h = h * _MIX1
+    h = h ^ (h >> _SHIFT33)
+    h = h * _MIX2
+    return h ^ (h >> _SHIFT33)
+
+
+def _ngram_hashes(units: np.ndarray, n: int) -> np.ndarray:
+    """Polynomial hash of every window of ``n`` consecutive units, computed column-wise."""
+    count = len(units) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    h = np.zeros(count, dtype=np.uint64)
+    for k in range(n):
+        h = h * _PRIME + units[k:k + count]
+    return h
+
+
+class HashedNgramEmbedder:
+    """Offline text vectors from feature-hashed word and character n-grams.
+
+    Every n-gram is hashed into one of ``dim`` buckets with a +/-1 sign, so collisions cancel
+    out on average and the dot product approximates n-gram overlap. Word and character parts
+    are normalized separately and blended, then the result is L2-normalized, which makes
+    cosine similarity a plain dot product. Hashing is seed-free (CRC32 plus a fixed mixer),
+    so the same text gives the same float32 vector in every process.
+    """
+
+    def __init__(
+        self,
+        dim: int = DEFAULT_EMBEDDING_DIM,
+        word_ngrams: Iterable[int] = (1, 2),
+        char_ngrams: Iterable[int] = (3, 4, 5),
+        word_weight: float = 0.5,
+    ):
+        self.dim = int(dim)
+        self.word_ngrams: Tuple[int, ...] = tuple(word_ngrams)
+        self.char_ngrams: Tuple[int, ...] = tuple(char_ngrams)
+        self.word_weight = float(word_weight)
+
+    def embed(self, text: Any) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[Any]) -> np.ndarray:
+        """Embed a batch into an ``(len(texts), dim)`` float32 matrix; row i equals ``embed(texts[i])``.
+
+        All texts in a chunk are concatenated and hashed in one vectorized pass. N-grams that
+        would straddle two texts are dropped.
+        """
+        norms = [normalize_skill_text(text) for text in texts]
+        out = np.zeros((len(norms), self.dim), dtype=np.float32)
+        for start in range(0, len(norms), _EMBED_CHUNK_ROWS):
+            chunk = norms[start:start + _EMBED_CHUNK_ROWS]
+            out[start:start + len(chunk)] = self._embed_chunk(chunk)
+        return out
+
+    def _embed_chunk(self, norms: List[str]) -> np.ndarray:
+        rows = len(norms)
+        word_hashes: List[int] = []
+        word_rows: List[int] = []
+        padded: List[str] = []
+        char_rows: List[int] = []
+        for i, norm in enumerate(norms):
+            if not norm:
+                continue
+            tokens = _TOKEN_RE.findall(norm)
+            word_hashes.extend(zlib.crc32(t.encode("utf-8")) for t in tokens)
+            word_rows.extend([i] * len(tokens))
+            padded.append(f" {norm} ")
+            char_rows.extend([i] * (len(norm) + 2))
+
+        words = np.array(word_hashes, dtype=np.uint64)
+        chars = np.frombuffer("".join(padded).encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+        word_rows_arr = np.array(word_rows, dtype=np.intp)
+        char_rows_arr = np.array(char_rows, dtype=np.intp)
+
+        word_vecs = self._bucket(rows, [(words, word_rows_arr, n, _seed(1, n)) for n in self.word_ngrams])
+        char_vecs = self._bucket(rows, [(chars, char_rows_arr, n, _seed(2, n)) for n in self.char_ngrams])
+        vecs = self.word_weight * _unit_rows(word_vecs) + (1.0 - self.word_weight) * _unit_rows(char_vecs)
+        return _unit_rows(vecs).astype(np.float32)
+
+    def _bucket(self, rows: int, groups) -> np.ndarray:
+        counts = np.zeros(rows * self.dim, dtype=np.float64)
+        for units, unit_rows, n, seed in groups:
+            hashes = _ngram_hashes(units, n)
+            if not len(hashes):
+                continue
+            window_rows = unit_rows[:len(hashes)]
+            same_text = window_rows == unit_rows[n - 1:]
+            h = _fmix64(hashes[same_text] ^ seed)
+            idx = window_rows[same_text] * self.dim + (h % np.uint64(self.dim)).astype(np.intp)
+            signs = 1.0 - 2.0 * (h >> _SHIFT63).astype(np.float64)
+            counts += np.bincount(idx, weights=signs, minlength=rows * self.dim)
+        return counts.reshape(rows, self.dim)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    # Row-wise reduction, so a row's norm does not depend on how many rows share the batch.
+    norms = np.sqrt(np.add.reduce(matrix * matrix, axis=1))
+    return np.divide(matrix, norms[:, None], out=np.zeros_like(matrix), where=norms[:, None] > 0)
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine of two embedder outputs (both already unit length or all zeros)."""
+    return float(np.dot(a, b))
+
+
+def cosine_scores(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """Similarity of every row in an ``(n, dim)`` float32 matrix to one vector."""
+    if matrix.size == 0:
+        return np.zeros(len(matrix), dtype=np.float32)
+    return matrix @ vector
+
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    return vector.astype("<f4").tobytes()
+
+
+def vector_from_bytes(data: Optional[bytes], dim: int = DEFAULT_EMBEDDING_DIM) -> Optional[np.ndarray]:
+    """A stored vector, or None when there is none or it was written with another ``dim``."""
+    if not data or len(data) != dim * 4:
+        return None
+    return np.frombuffer(data, dtype="<f4").astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+@lru_cache(maxsize=1)
+def get_text_embedder() -> HashedNgramEmbedder:
+    return HashedNgramEmbedder()
+
+
+@lru_cache(maxsize=256)
+def embed_job_description(job_description: Optional[str]) -> np.ndarray:
+    """JD vectors are reused across the many CVs scored against one posting."""
+    vec = get_text_embedder().embed(job_description)
+    vec.setflags(write=False)
+    return vec
@@ -0,0 +1,197 @@
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TM_DB_PATH = os.path.join(".", "data", "translation_memory.sqlite3")
+# Segments are packed into requests of roughly this many prompt tokens, sent in parallel.
+CHUNK_TOKEN_BUDGET = int(os.getenv("TRANSLATION_CHUNK_TOKENS", "600"))
+MAX_PARALLEL_CHUNKS = int(os.getenv("TRANSLATION_MAX_PARALLEL", "4"))
+LOOKUP_BATCH_SIZE = 500
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS translation_memory (
+        source_hash TEXT NOT NULL,
+        target_language TEXT NOT NULL,
+        source_text TEXT NOT NULL,
+        translated_text TEXT NOT NULL,
+        created_at TEXT,
+        PRIMARY KEY (source_hash, target_language)
+    )
+    """,
+)
+
+_ARABIC_RE = re.compile(r"[\u0600-\u06ff]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_VERBATIM_RE = re.compile(r"\S+@\S+\.\S+|(?:https?://|www\.)\S+", re.IGNORECASE)
+
+
+def segment_hash(text: str) -> str:
+    """Key of a segment; whitespace differences do not make a new segment."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:32]
+
+
+def estimate_tokens(text: str) -> int:
+    # UTF-8 bytes / 4 over-counts English slightly and keeps Arabic (two bytes a letter) safe.
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def needs_translation(text: str, target_language: str) -> bool:
+    """Whether a segment has words to translate, rather than only numbers, dates, emails or URLs."""
+    stripped = _VERBATIM_RE.sub(" ", text or "")
+    if target_language == "arabic":
+        return bool(_LATIN_RE.search(stripped))
+    if target_language == "english":
+        return bool(_ARABIC_RE.search(stripped))
+    return bool(_LETTER_RE.search(stripped))
+
+
+def split_segments(text: str) -> List[str]:
+    """Translation units of a text: its non-blank lines, so editing one bullet re-translates one line."""
+    return [line.strip() for line in (text or "").split("\n") if line.strip()]
+
+
+def join_segments(text: str, translations: Dict[str, str]) -> str:
+    """Rebuild ``text`` with each segment replaced by its translation, keeping the line layout."""
+    lines = []
+    for line in (text or "").split("\n"):
+        segment = line.strip()
+        if segment and segment in translations:
+            start = line.index(segment)
+            line = line[:start] + translations[segment] + line[start + len(segment):]
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def chunk_segments(segments: List[str], token_budget: int = CHUNK_TOKEN_BUDGET) -> List[List[str]]:
+    """Pack segments in order into chunks under ``token_budget``; a longer segment gets a chunk of its own."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for segment in segments:
+        tokens = estimate_tokens(segment)
+        if current and used + tokens > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(segment)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TranslationMemory:
+    """Segment translations keyed by (source text hash, target language), kept in its own SQLite file.
+
+    ``translate`` serves known segments from the file and sends only the rest to the translator,
+    in parallel chunks under ``CHUNK_TOKEN_BUDGET``. Each new pair is also stored in reverse
+    (target text back to the source language) unless that direction already has an entry, so
+    switching a CV between English and Arabic and back costs one translation.
+    """
+
+    def __init__(self, path: str = DEFAULT_TM_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, segments: Iterable[str], target_language: str) -> Dict[str, str]:
+        by_hash = {segment_hash(segment): segment for segment in segments}
+        hashes = list(by_hash)
+        found: Dict[str, str] = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+                rows = conn.execute(
+                    f"SELECT source_hash, translated_text FROM translation_memory "
+                    f"WHERE target_language = ? AND source_hash IN ({','.join('?' * len(batch))})",
+                    [target_language, *batch],
+                ).fetchall()
+                for source_hash, translated in rows:
+                    found[by_hash[source_hash]] = translated
+        return found
+
+    def store(self, pairs: Dict[str, str], target_language: str, source_language: Optional[str] = None) -> None:
+        if not pairs:
+            return
+        now = datetime.utcnow().isoformat()
+        forward = [(segment_hash(s), target_language, s, t, now) for s, t in pairs.items()]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO translation_memory VALUES (?, ?, ?, ?, ?)", forward)
+            if source_language and source_language != target_language:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO translation_memory VALUES (?, ?, ?, ?, ?)",
+                    [(segment_hash(t), source_language, t, s, now) for s, t in pairs.items()],
+                )
+
+    def translate(
+        self,
+        segments: Iterable[str],
+        target_language: str,
+        translate_chunk: Optional[Callable[[List[str]], List[Optional[str]]]] = None,
+        source_language: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Map each segment that needs translating to its translation.
+
+        ``translate_chunk`` receives a list of segments and returns their translations in order,
+        with ``None`` for any it could not translate; those are left out and retried next time.
+        Without it only the memory is consulted.
+        """
+        pending = list(dict.fromkeys(s for s in segments if s and needs_translation(s, target_language)))
+        known = self.lookup(pending, target_language)
+        missing = [segment for segment in pending if segment not in known]
+        with self._lock:
+            self.hits += len(known)
+            self.misses += len(missing)
+        if not missing or translate_chunk is None:
+            return known
+
+        chunks = chunk_segments(missing)
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHUNKS, len(chunks))) as pool:
+            # Each chunk runs in a copy of the caller's context so the LLM ledger still knows who pays.
+            futures = [pool.submit(contextvars.copy_context().run, translate_chunk, chunk) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+        fresh: Dict[str, str] = {}
+        for chunk, translated in zip(chunks, results):
+            for segment, text in zip(chunk, translated or []):
+                if isinstance(text, str) and text.strip():
+                    fresh[segment] = text.strip()
+        self.store(fresh, target_language, source_language)
+        logger.info(
+            f"Translation memory: {len(known)} segments reused, {len(fresh)}/{len(missing)} translated "
+            f"in {len(chunks)} chunks"
+        )
+        known.update(fresh)
+        return known
+
+    def stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=1)
+def get_translation_memory() -> TranslationMemory:
+    return TranslationMemory(os.getenv("TRANSLATION_MEMORY_DB_PATH") or DEFAULT_TM_DB_PATH)
@@ -21,9 +21,9 @@ print(f"Has email: {simple['personal_info']['email']}")
 print(f"Experience: {len(simple['experience'])} items")
 print(f"Skills: {simple['skills']}")
 
-print("\nTesting _structure_complex_cv...")
-complex_res = FallbackCVProcessor._structure_complex_cv(cv_text)
-print(f"Experience: {len(complex_res['experience'])} items")
-if complex_res['experience']:
-    print(f"  First exp: {complex_res['experience'][0]}")
-print(f"Skills: {complex_res['skills']}")
+print("\nTesting structure_cv_fallback...")
+full = FallbackCVProcessor.structure_cv_fallback(cv_text)
+print(f"Experience: {len(full['experience'])} items")
+if full['experience']:
+    print(f"  First exp: {full['experience'][0]}")
+print(f"Skills: {full['skills']}")
@@ -0,0 +1,60 @@
+"""
+Benchmark the single-pass fallback CV parser.
+
+Usage: run from the job_gate_ai root:
+    python scripts/bench_fallback_parser.py [iterations]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.fallback_service import FallbackCVProcessor
+
+cv_text = """Mohammed Zair
+Frontend Developer
+Riyadh, Saudi Arabia
+mohammed.zair@gmail.com | +966 55 123 4567
+
+EXPERIENCE
+Frontend Developer at Talents Co
+2021 - Present
+- Built the seeker portal in React, cutting load time by 35%
+- Mentored 2 junior developers
+
+EDUCATION
+King Saud University
+Bachelor of Computer Science
+2016 - 2020
+
+SKILLS
+React, TypeScript, Tailwind, Node.js, Docker, SQL
+
+PROJECTS
+- Talents Landing - Marketing site built with Vite
+Technologies: React, Tailwind
+
+LANGUAGES
+Arabic, English
+"""
+
+
+def run(iterations: int) -> None:
+    # A long CV stresses the per-line cost: repeat the experience block many times.
+    long_text = cv_text + "\nEXPERIENCE\n" + "\n".join(
+        f"Engineer {i} at Company {i} (2015-2016)\n- Improved throughput by {i}%" for i in range(200)
+    )
+    for label, text in (("typical", cv_text), ("long", long_text)):
+        FallbackCVProcessor.structure_cv_fallback(text)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            FallbackCVProcessor.structure_cv_fallback(text)
+        elapsed = time.perf_counter() - start
+        lines = len(text.splitlines())
+        print(f"{label:8s} {lines:5d} lines  {elapsed / iterations * 1000:8.3f} ms/parse")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,64 @@
+"""
+Compare chatbot prompt sizes: the old full-JSON prompt vs the compact digest + rolling summary.
+
+Tokens are estimated at ~4 characters per token, close enough to compare the two layouts.
+
+Usage: run from the job_gate_ai root:
+    python scripts/measure_chat_prompt.py [turns]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.api.endpoints import chatbot
+
+
+class _NoLLM:
+    def is_available(self):
+        return False
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def legacy_prompt_tokens(session) -> int:
+    # Before the compact prompt: the whole cv_data (with _meta.rewrite copies) plus 12 raw messages.
+    prompt = json.dumps(session["cv_data"], ensure_ascii=False, indent=2) + " " * 900
+    prompt += "".join(msg["content"] for msg in session["conversation"][-12:])
+    return estimate_tokens(prompt)
+
+
+def compact_prompt_tokens(session) -> int:
+    chatbot._update_conversation_summary(_NoLLM(), session)
+    cv_data = session["cv_data"]
+    system = chatbot._build_system_prompt(
+        cv_data, "review", "english", "", {}, chatbot._conversation_summary(cv_data)["text"]
+    )
+    return estimate_tokens("".join(m["content"] for m in chatbot._prompt_messages(system, session["conversation"])))
+
+
+def run(turns: int) -> None:
+    cv_data = chatbot._initialize_cv_data({
+        "personal_info": {"full_name": "Mohammed Zair", "email": "mohammed.zair@gmail.com", "phone": "+966 55 123 4567"},
+    })
+    session = {"cv_data": cv_data, "conversation": []}
+    print(f"{'turn':>5} {'legacy':>8} {'compact':>8}")
+    for turn in range(1, turns + 1):
+        description = f"Built and operated service {turn} in React and Node.js, cutting load time by {turn}% " * 3
+        if turn % 3 == 0:
+            cv_data["experience"].append({"position": f"Engineer {turn}", "company": f"Company {turn}",
+                                          "duration": "2020 - 2021", "description": description})
+            chatbot._apply_rewrites(cv_data, {"experience": [""] * (len(cv_data["experience"]) - 1)
+                                              + [description.upper()]})
+        session["conversation"].append({"role": "user", "content": f"At company {turn} I {description}"})
+        session["conversation"].append({"role": "assistant", "content": "Great, what did you achieve next? " * 4})
+        if turn in (1, 5, 10, 20, 40) or turn == turns:
+            print(f"{turn:5d} {legacy_prompt_tokens(session):8d} {compact_prompt_tokens(session):8d}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,18 @@
+"""
+Recompute per-job score and skill-gap analytics from stored job results.
+
+Usage: run from the job_gate_ai root (uses DATABASE_URL like the API):
+    python scripts/rebuild_job_analytics.py [job_id]
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.database_service import DatabaseService
+
+
+if __name__ == "__main__":
+    job_id = sys.argv[1] if len(sys.argv) > 1 else None
+    DatabaseService().rebuild_job_analytics(job_id)
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+import pytest
+
+# Endpoint modules open the default database at import time; keep it out of the working tree.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'jobgate_test.db')}")
+
+from app.services.cv_search import get_cv_search_index
+from app.services.llm_ledger import get_llm_ledger
+from app.services.translation_memory import get_translation_memory
+
+
+@pytest.fixture(autouse=True)
+def isolated_search_index(tmp_path, monkeypatch):
+    """Keep the on-disk CV search index, LLM ledger and translation memory out of the working tree."""
+    monkeypatch.setenv("CV_SEARCH_DB_PATH", str(tmp_path / "cv_search.sqlite3"))
+    monkeypatch.setenv("LLM_LEDGER_DB_PATH", str(tmp_path / "llm_ledger.sqlite3"))
+    monkeypatch.setenv("TRANSLATION_MEMORY_DB_PATH", str(tmp_path / "translation_memory.sqlite3"))
+    get_cv_search_index.cache_clear()
+    get_llm_ledger.cache_clear()
+    get_translation_memory.cache_clear()
+    yield
+    get_cv_search_index.cache_clear()
+    get_llm_ledger.cache_clear()
+    get_translation_memory.cache_clear()
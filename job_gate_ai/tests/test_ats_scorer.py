@@ -39,3 +39,35 @@ def test_extract_cv_features_handles_non_dict_projects():
     features = scorer.extract_cv_features(cv)
     assert features["project_count"] == 3
     assert "project two" in features["project_names"]
+
+
+def _random_cv(rng):
+    import random
+
+    pool = ["Python", "python", "Django", "SQL", "Postgres", "Excel", "Go", "Leadership", "React Native", "علم البيانات"]
+    achievements = ["Cut costs by 15%", "Led the team", "Shipped 3 releases"]
+    return {
+        "personal_info": {"email": "a@b.com"} if rng.random() < 0.7 else {"phone": "123"},
+        "experience": rng.choice([
+            [],
+            "free text",
+            [{"position": "Engineer", "achievements": rng.sample(achievements, rng.randint(0, 3))}] * rng.randint(1, 3),
+        ]),
+        "education": rng.choice([[], "BSc", [{"degree": "MSc"}]]),
+        "skills": rng.choice(["python, sql", None, [rng.choice(pool) for _ in range(rng.randint(0, 8))]]),
+        "projects": rng.choice([[], ["tool"], [{"title": "ATS"}, {"name": "Bot"}, 7]]),
+    } if rng.random() > 0.05 else rng.choice([None, "not a dict", {}])
+
+
+def test_calculate_scores_matches_scalar_path_exactly():
+    import json
+    import random
+
+    scorer = ATSScorer()
+    rng = random.Random(7)
+    cvs = [_random_cv(rng) for _ in range(300)]
+    for job in ("", "Python and PostgreSQL developer, Django REST, SQL, python, leadership"):
+        batch = scorer.calculate_scores(cvs, job)
+        scalar = [scorer.calculate_score(cv, job) for cv in cvs]
+        assert json.dumps(batch, ensure_ascii=False) == json.dumps(scalar, ensure_ascii=False)
+    assert scorer.calculate_scores([]) == []
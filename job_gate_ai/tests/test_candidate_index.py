@@ -0,0 +1,75 @@
+import pytest
+
+from app.services.candidate_index import CandidateIndex, get_candidate_index
+from app.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def fresh_index():
+    get_candidate_index.cache_clear()
+    yield get_candidate_index()
+    get_candidate_index.cache_clear()
+
+
+def _features(skills, years):
+    return {"key_skills": skills, "total_years_experience": years}
+
+
+def test_rank_orders_by_overlap_then_score_and_experience():
+    index = CandidateIndex()
+    index.add_analysis(1, "u1", "a.pdf", 90, _features(["Python", "Docker"], 3))
+    index.add_analysis(2, "u2", "b.pdf", 60, _features(["python", "Postgres", "Docker"], 1))
+    index.add_analysis(3, "u3", "c.pdf", 99, _features(["Figma"], 12))
+    index.add_analysis(4, "u4", "d.pdf", 95, _features(["Python", "Docker"], 6))
+
+    ranking = index.rank(["Python", "PostgreSQL", "Docker"], limit=2)
+    assert ranking["total_candidates"] == 3
+    assert [r["analysis_id"] for r in ranking["results"]] == [2, 4]
+    assert ranking["results"][0]["matched_skills"] == ["python", "Postgres", "Docker"]
+    assert ranking["results"][1]["missing_skills"] == ["PostgreSQL"]
+
+    assert [r["analysis_id"] for r in index.rank(["Python", "Docker"], weights={"skills": 0, "ats": 0})["results"]][:2] == [4, 1]
+    assert index.rank(["Python", "PostgreSQL"], min_skill_overlap=2)["total_candidates"] == 1
+
+
+def test_remove_and_replace_keep_postings_consistent():
+    index = CandidateIndex()
+    index.add_analysis(1, "u1", "a.pdf", 70, _features(["Go"], 2))
+    index.add_analysis(1, "u1", "a.pdf", 70, _features(["Rust"], 2))
+    assert index.rank(["Go"])["results"] == []
+    assert index.rank(["Rust"])["results"][0]["analysis_id"] == 1
+    assert index.remove_analysis(1)
+    assert len(index) == 0
+    assert index.rank(["Rust"])["total_candidates"] == 0
+
+
+def test_database_save_updates_index_and_startup_rebuilds(tmp_path, fresh_index):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'rank.db'}")
+    saved = db.save_cv_analysis({
+        "user_id": "candidate-1",
+        "file_name": "cv.pdf",
+        "file_hash": "abc",
+        "structured_data": {"skills": ["Python", "FastAPI"]},
+        "ats_score": 80.0,
+        "features": _features(["Python", "FastAPI"], 3.0),
+    })
+    db.save_cv_analysis({
+        "user_id": "candidate-2",
+        "file_name": "old.pdf",
+        "structured_data": {"skills": ["FastAPI"]},
+        "ats_score": 50.0,
+        "features": {},
+    })
+    assert [r["analysis_id"] for r in fresh_index.rank(["FastAPI", "Python"])["results"]][0] == saved.id
+
+    get_candidate_index.cache_clear()
+    assert db.load_candidate_index() == 2
+    results = get_candidate_index().rank(["FastAPI", "Python"])["results"]
+    assert [r["user_id"] for r in results] == ["candidate-1", "candidate-2"]
+
+
+def test_all_parsed_skills_are_indexed_not_only_the_scored_top_ten():
+    index = CandidateIndex()
+    skills = [f"Skill{i}" for i in range(15)] + ["Docker"]
+    index.add_analysis(1, "u1", "a.pdf", 80, _features(skills[:10], 4), {"skills": skills})
+    assert [r["analysis_id"] for r in index.rank(["Docker"])["results"]] == [1]
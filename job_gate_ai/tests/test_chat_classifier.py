@@ -0,0 +1,95 @@
+import pytest
+
+from app.services.chat_classifier import ClassifierStats, classify_message, extraction_disagrees
+
+
+@pytest.mark.parametrize("message, step, rule, updates, flags", [
+    ("Sara Ahmed", "personal_info", "name", {"full_name": "Sara Ahmed"}, {}),
+    ("اسمي سارة أحمد", "skills", "name", {"full_name": "سارة أحمد"}, {}),
+    ("sara@x.io, +20 123 456 7890", "personal_info_contact", "contact",
+     {"email": "sara@x.io", "phone": "+20 123 456 7890"}, {}),
+    ("my email is sara@x.io", "experience", "contact", {"email": "sara@x.io"}, {}),
+    ("no", "experience", "skip_flag", {}, {"no_experience": True}),
+    ("I have no certifications", "skills", "skip_flag", {}, {"no_certifications": True}),
+])
+def test_simple_answers_are_handled_by_rules(message, step, rule, updates, flags):
+    result = classify_message(message, step)
+    assert result["rule"] == rule
+    assert result["updates"]["personal_info"] == updates
+    assert result["flags"] == flags
+
+
+@pytest.mark.parametrize("message, step", [
+    ("I am currently unemployed", "experience"),
+    ("I am very tired", "summary"),
+    ("I am a fresh graduate", "personal_info"),
+    ("I am still learning", "personal_info"),
+    ("Team player", "personal_info"),
+    ("Fresh graduate", "personal_info"),
+    ("Excellent communicator", "personal_info"),
+    ("Skip this", "personal_info"),
+])
+def test_phrases_that_are_not_names_go_to_the_llm(message, step):
+    assert classify_message(message, step) is None
+
+
+def test_capitalized_names_with_particles_and_a_filled_name_is_kept():
+    assert classify_message("I am Abdullah bin Saleh", "personal_info")["updates"]["personal_info"] == {
+        "full_name": "Abdullah bin Saleh"
+    }
+    assert classify_message("Sara Ahmed", "personal_info", {"full_name": "Sara Ahmed"}) is None
+    assert classify_message("my name is Sara Ali", "skills", {"full_name": "Sara Ahmed"}) is None
+
+
+def test_skill_lists_keep_their_spelling():
+    result = classify_message("python, Docker; AWS and C++", "skills")
+    assert result["updates"]["skills"] == ["python", "Docker", "AWS", "C++"]
+    assert classify_message("Kubernetes", "skills")["updates"]["skills"] == ["Kubernetes"]
+    assert classify_message("Figma, some in-house tool", "skills")["updates"]["skills"] == [
+        "Figma", "some in-house tool"
+    ]
+
+
+@pytest.mark.parametrize("message, step", [
+    ("continue", "skills"),
+    ("Go ahead", "skills"),
+    ("Maybe later", "skills"),
+    ("I know everything", "experience"),
+    ("I know you", "summary"),
+])
+def test_single_unknown_skill_items_go_to_the_llm(message, step):
+    assert classify_message(message, step) is None
+
+
+@pytest.mark.parametrize("message, step", [
+    ("Hello there", "personal_info"),
+    ("Senior Software Engineer", "personal_info"),
+    ("Bachelor of Science", "personal_info"),
+    ("Riyadh Saudi Arabia", "personal_info"),
+    ("مهندس برمجيات", "personal_info"),
+    ("Sara Ahmed", "experience"),
+    ("I worked at Google as a backend engineer for 3 years", "experience"),
+    ("my email is sara@x.io and I studied at Cairo University", "personal_info_contact"),
+    ("2019-2023", "experience"),
+    ("no", "skills"),
+    ("yes", "skills"),
+    ("python, docker, aws", "experience"),
+])
+def test_ambiguous_messages_go_to_the_llm(message, step):
+    assert classify_message(message, step) is None
+
+
+def test_disagreement_and_rates():
+    rules = classify_message("sara@x.io", "personal_info_contact")
+    assert not extraction_disagrees(rules, {"updates": {"personal_info": {"email": "Sara@x.io"}}})
+    assert extraction_disagrees(rules, {"updates": {"personal_info": {"email": "sara@y.io"}}})
+
+    stats = ClassifierStats()
+    for rule in ("contact", None, "name", None):
+        stats.record_message(rule)
+    stats.record_audit(False)
+    stats.record_audit(True, "name")
+    snapshot = stats.snapshot()
+    assert snapshot["skip_rate"] == 0.5
+    assert snapshot["disagreement_rate"] == 0.5
+    assert snapshot["by_rule"] == {"contact": 1, "name": 1}
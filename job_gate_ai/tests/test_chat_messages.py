@@ -0,0 +1,111 @@
+from app.api.endpoints import chatbot
+from app.models.database_models import ChatbotSession
+from app.services.database_service import DatabaseService
+
+
+def _messages(n, start=0):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"} for i in range(start, start + n)]
+
+
+def test_legacy_conversations_are_split_into_rows(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'chat.db'}")
+    with db.get_session() as session:
+        for sid in ("legacy_a", "legacy_b"):
+            session.add(ChatbotSession(session_id=sid, user_id="u1", cv_data={}, conversation=_messages(5)))
+
+    assert db.get_chatbot_session("legacy_a").message_count == 5
+    assert db.migrate_chat_conversations(batch_size=1) == 1
+    assert db.migrate_chat_conversations() == 0
+
+    record = db.get_chatbot_session("legacy_b")
+    assert record.conversation == [] and record.to_dict()["conversation_length"] == 5
+    assert [m["content"] for m in db.get_chat_messages("legacy_b", since_seq=3)] == ["m3", "m4"]
+
+    assert db.update_chatbot_session("legacy_b", {}, _messages(2, start=5))
+    assert [m["seq"] for m in db.get_chat_messages("legacy_b")] == list(range(7))
+    assert db.delete_chatbot_session("legacy_b")
+    assert db.get_chat_messages("legacy_b") == []
+
+
+def test_turn_saves_only_changed_columns_and_new_messages(tmp_path, monkeypatch):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'chat.db'}")
+    monkeypatch.setattr(chatbot, "db", db)
+    cv_data = chatbot._initialize_cv_data({"_meta": {"conversation_summary": {"text": "...", "through": 26}}})
+    db.create_chatbot_session({"session_id": "s1", "user_id": "u1", "cv_data": cv_data, "conversation": _messages(30)})
+
+    # Only the raw prompt window is read; messages the summary has not folded yet would be too.
+    session = chatbot._load_session("s1")
+    assert session["_conversation_offset"] == 30 - chatbot.RAW_PROMPT_MESSAGES
+    assert [m["content"] for m in session["conversation"]] == [f"m{i}" for i in range(24, 30)]
+
+    calls = []
+    update = db.update_chatbot_session
+    monkeypatch.setattr(db, "update_chatbot_session", lambda *args: calls.append(args) or update(*args))
+    session["conversation"] += _messages(2, start=30)
+    session["current_step"] = "experience"
+    chatbot._save_session(session)
+    chatbot._save_session(session)
+
+    assert len(calls) == 1
+    _, updates, new_messages = calls[0]
+    assert set(updates) == {"current_step"}
+    assert [m["content"] for m in new_messages] == ["m30", "m31"]
+    full = chatbot._load_session("s1", conversation="full")
+    assert full["message_count"] == 32 and len(full["conversation"]) == 32
+    assert chatbot._load_session("s1", conversation="none")["conversation"] == []
+
+
+def test_session_list_does_not_load_conversation_or_cv_data(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'chat.db'}")
+    db.create_chatbot_session({"session_id": "s1", "user_id": "u1", "cv_data": {}, "conversation": _messages(3)})
+    with db.get_session() as session:
+        session.add(ChatbotSession(session_id="legacy", user_id="u1", cv_data={}, conversation=_messages(4)))
+
+    # The first listing migrates the legacy row; after that only summary columns are read.
+    assert sorted(r.to_dict()["conversation_length"] for r in db.list_chatbot_sessions("u1")) == [3, 4]
+    records = db.list_chatbot_sessions("u1")
+    assert sorted(r.to_dict()["conversation_length"] for r in records) == [3, 4]
+    assert all("conversation" not in r.__dict__ and "cv_data" not in r.__dict__ for r in records)
+
+
+def test_session_etag_tracks_messages_and_columns():
+    session = {"cv_data": {}, "conversation": [], "_conversation_offset": 4}
+    etag = chatbot._session_etag(session, ["conversation"], 4)
+    assert chatbot._session_etag(session, ["conversation"], 4) == etag
+    assert chatbot._session_etag(session, ["current_step"], 4) != etag
+
+    chatbot._append_message(session, "user", "hi")
+    assert session["conversation"][0]["seq"] == 4
+    assert chatbot._session_etag(session, ["conversation"], 4) != etag
+    moved = chatbot._session_etag(session, ["conversation"], 4)
+    session["current_step"] = "skills"
+    assert chatbot._session_etag(session, ["conversation"], 4) != moved
+
+
+def test_failed_save_keeps_the_cached_session_dirty(tmp_path, monkeypatch):
+    import asyncio
+
+    from app.services.session_cache import WriteBackCache
+
+    db = DatabaseService(f"sqlite:///{tmp_path / 'chat.db'}")
+    monkeypatch.setattr(chatbot, "db", db)
+    db.create_chatbot_session({"session_id": "s1", "user_id": "u1", "cv_data": {}, "conversation": _messages(1)})
+    cache = WriteBackCache(chatbot._load_session, chatbot._persist_session)
+    update = db.update_chatbot_session
+
+    async def scenario():
+        session = await cache.get("s1")
+        chatbot._append_message(session, "user", "my message")
+        await cache.mark_dirty("s1", session)
+
+        monkeypatch.setattr(db, "update_chatbot_session", lambda *args: False)
+        assert await cache.flush() == 0
+        cache.ttl_seconds = -1
+        cache._evict()
+        assert cache.stats()["dirty"] == 1 and len(cache) == 1
+
+        monkeypatch.setattr(db, "update_chatbot_session", update)
+        assert await cache.flush() == 1
+
+    asyncio.run(scenario())
+    assert [m["content"] for m in db.get_chat_messages("s1")] == ["m0", "my message"]
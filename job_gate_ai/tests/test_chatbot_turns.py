@@ -0,0 +1,225 @@
+import json
+from types import SimpleNamespace
+
+from app.api.endpoints import chatbot
+
+
+class _FakeLLM:
+    model = "fake"
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._create)))
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = json.dumps(self.responses.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def is_available(self):
+        return True
+
+
+def _session(cv_data):
+    return {
+        "session_id": "chat_u1_test",
+        "user_id": "u1",
+        "language": "english",
+        "current_step": "experience",
+        "cv_data": cv_data,
+        "conversation": [{"role": "user", "content": "I was a backend engineer at Acme for 3 years."}],
+        "job_requirements": "",
+    }
+
+
+def test_single_call_turn_merges_updates_and_rewrites_new_entries():
+    cv_data = chatbot._initialize_cv_data({
+        "personal_info": {"full_name": "Sara", "email": "s@x.io"},
+        "experience": [{"position": "Intern", "company": "Old", "description": "did stuff"}],
+    })
+    llm = _FakeLLM({
+        "updates": {
+            "experience": [{}, {"position": "Backend Engineer", "company": "Acme", "description": "built apis"}],
+            "skills": ["Python"],
+        },
+        "flags": {"no_certifications": True},
+        "intent": {},
+        "improved": {"experience": ["", "Built REST APIs serving 2M requests/day."]},
+        "reply": "Great! Where did you study?",
+    })
+
+    turn = chatbot._single_call_turn(llm, _session(cv_data), {})
+    assert len(llm.calls) == 1
+    assert llm.calls[0]["response_format"] == {"type": "json_object"}
+    assert llm.calls[0]["messages"][-1]["content"].startswith("I was a backend engineer")
+
+    improved = chatbot._align_improved(cv_data, turn["updates"], turn["improved"])
+    chatbot._merge_cv_data(cv_data, turn["updates"])
+    chatbot._apply_rewrites(cv_data, improved)
+
+    assert [e["description"] for e in cv_data["experience"]] == [
+        "did stuff", "Built REST APIs serving 2M requests/day.",
+    ]
+    assert cv_data["_meta"]["rewrite"]["experience"][1] == {
+        "original": "built apis", "improved": "Built REST APIs serving 2M requests/day.",
+    }
+    assert cv_data["_meta"]["rewrite"]["experience"][0] is None
+    assert chatbot._determine_current_step(cv_data, turn["flags"]) == "education"
+    assert turn["reply"] == "Great! Where did you study?"
+
+
+def test_single_call_turn_failure_returns_empty():
+    llm = _FakeLLM()
+    assert chatbot._single_call_turn(llm, _session(chatbot._initialize_cv_data({})), {}) == {}
+
+
+def test_rewrite_sends_only_dirty_sections():
+    cv_data = chatbot._initialize_cv_data({
+        "summary": "i code",
+        "experience": [{"position": "Dev", "description": "wrote apis"}],
+        "projects": [{"name": "Bot", "description": "chat bot"}],
+    })
+    llm = _FakeLLM(
+        {"summary": "Software engineer.", "experience": {"0": "Built APIs."}, "projects": {"0": ""}},
+        {"experience": {"1": "Led a team of 4."}},
+    )
+    chatbot._rewrite_cv_sections(llm, cv_data)
+    assert cv_data["summary"] == "Software engineer."
+    assert cv_data["experience"][0]["description"] == "Built APIs."
+    assert cv_data["projects"][0]["description"] == "chat bot"
+
+    # Nothing changed since the rewrite: no LLM call at all.
+    chatbot._rewrite_cv_sections(llm, cv_data)
+    assert len(llm.calls) == 1
+
+    chatbot._merge_cv_data(cv_data, {"experience": [{"position": "Lead", "description": "led team"}]})
+    chatbot._rewrite_cv_sections(llm, cv_data)
+    assert len(llm.calls) == 2
+    sent = json.loads(llm.calls[1]["messages"][1]["content"].split("Input JSON:")[1])
+    assert sent == {"summary": "", "experience": {"1": "led team"}, "projects": {}}
+    assert cv_data["experience"][1]["description"] == "Led a team of 4."
+    assert cv_data["_meta"]["rewrite"]["experience"][1]["original"] == "led team"
+
+
+def test_rewrite_result_skips_items_edited_while_in_flight():
+    cv_data = chatbot._initialize_cv_data({"experience": [{"description": "a"}, {"description": "b"}]})
+    dirty = chatbot._dirty_sections(cv_data)
+    cv_data["experience"][1]["description"] = "b, edited"
+    chatbot._apply_dirty_rewrites(cv_data, dirty, {"summary": "", "experience": {0: "A.", 1: "B."}, "projects": {}})
+    assert [e["description"] for e in cv_data["experience"]] == ["A.", "b, edited"]
+    assert chatbot._dirty_sections(cv_data)["experience"] == {1: "b, edited"}
+
+
+class _NoLLM:
+    def is_available(self):
+        return False
+
+
+def test_prompt_uses_digest_summary_and_recent_window():
+    cv_data = chatbot._initialize_cv_data({
+        "personal_info": {"full_name": "Sara", "email": "s@x.io"},
+        "experience": [{"position": "Dev", "company": "Acme", "description": "x" * 1000}],
+        "_meta": {"rewrite": {"summary": {"original": "secret original", "improved": "y"}}},
+    })
+    session = {"cv_data": cv_data, "conversation": []}
+    for i in range(20):
+        session["conversation"].append({"role": "user", "content": f"message {i}"})
+        session["conversation"].append({"role": "assistant", "content": f"reply {i}"})
+
+    chatbot._update_conversation_summary(_NoLLM(), session)
+    summary = chatbot._conversation_summary(cv_data)
+    assert summary["through"] == 40 - chatbot.RAW_PROMPT_MESSAGES
+    assert summary["text"].splitlines()[-1] == "User said: message 16"
+
+    prompt = chatbot._build_system_prompt(cv_data, "skills", "english", "", {}, summary["text"])
+    assert "secret original" not in prompt and "_meta" not in prompt
+    assert "- Dev | Acme: " + "x" * 200 in prompt and "x" * 300 not in prompt
+    messages = chatbot._prompt_messages(prompt, session["conversation"])
+    assert [m["content"] for m in messages[1:]][0] == "message 17"
+
+    # The summary is only refreshed after SUMMARY_EVERY_MESSAGES more messages leave the window.
+    session["conversation"].append({"role": "user", "content": "message 20"})
+    chatbot._update_conversation_summary(_NoLLM(), session)
+    assert chatbot._conversation_summary(cv_data) == summary
+
+
+def test_reply_field_stream_decodes_split_escapes():
+    tokens = []
+    stream = chatbot._ReplyFieldStream(tokens.append)
+    raw = json.dumps({"updates": {"summary": 'say "reply": "x"'}, "reply": 'Hi \U0001F600\n"Sara"\\ ok'})
+    for i in range(0, len(raw), 3):
+        stream.feed(raw[i:i + 3])
+    assert "".join(tokens) == 'Hi \U0001F600\n"Sara"\\ ok'
+    assert stream.done
+
+
+def test_websocket_authenticates_once_and_streams_turns(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    monkeypatch.setenv("API_KEYS", "ws-key")
+    monkeypatch.setattr(chatbot, "LLMService", lambda: SimpleNamespace(is_available=lambda: False))
+    app = FastAPI()
+    app.include_router(chatbot.router)
+    app.include_router(chatbot.ws_router)
+    client = TestClient(app)
+    session_id = client.post("/chatbot/start", json={"user_id": "ws-user"}).json()["session_id"]
+
+    with client.websocket_connect(f"/chatbot/ws/{session_id}?api_key=wrong") as ws:
+        try:
+            ws.receive_json()
+            assert False, "connection should have been closed"
+        except WebSocketDisconnect as e:
+            assert e.code == 4401
+
+    with client.websocket_connect(f"/chatbot/ws/{session_id}?api_key=ws-key") as ws:
+        assert ws.receive_json() == {
+            "type": "session", "session_id": session_id, "current_step": "personal_info",
+            "is_complete": False, "next_seq": 1,
+        }
+        assert chatbot.session_cache._pins == {session_id: 1}
+        ws.send_json({"type": "message", "message": "Sara Ahmed"})
+        token = ws.receive_json()
+        reply = ws.receive_json()
+        assert token["type"] == "token" and reply["type"] == "reply"
+        assert token["delta"] == reply["message"]
+        assert reply["current_step"] == "personal_info_contact"
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+
+    assert chatbot.session_cache._pins == {}
+    session = client.get(f"/chatbot/session/{session_id}", params={"fields": "cv_data,conversation"}).json()["session"]
+    assert session["cv_data"]["personal_info"]["full_name"] == "Sara Ahmed"
+    assert [m["seq"] for m in session["conversation"]] == [0, 1, 2]
+
+
+def test_completing_turn_queues_score_and_final_summary(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(chatbot, "LLMService", lambda: SimpleNamespace(is_available=lambda: False))
+    app = FastAPI()
+    app.include_router(chatbot.router)
+    client = TestClient(app)
+    session_id = client.post("/chatbot/start", json={"user_id": "done-user", "initial_data": {
+        "personal_info": {"full_name": "Sara Ahmed", "email": "sara@x.io"},
+        "skills": ["Python", "SQL", "Docker"],
+    }}).json()["session_id"]
+
+    reply = client.post("/chatbot/chat", json={"session_id": session_id, "message": "no experience"}).json()
+    assert reply["is_complete"] is True
+    assert reply["summary_status"] == "pending"
+    assert reply["score"] == {} and reply["final_summary"] is None
+
+    insights = client.get(f"/chatbot/insights/{session_id}", params={"user_id": "done-user", "wait": 1}).json()
+    assert insights["summary_status"] == "ready"
+    assert insights["score"]["score"] > 0
+    assert insights["final_summary"]["summary"]
+
+    stored = chatbot._load_session(session_id)
+    assert stored["summary_status"] == "ready"
+    assert stored["final_summary"] == insights["final_summary"]
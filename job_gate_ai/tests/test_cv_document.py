@@ -0,0 +1,48 @@
+import json
+
+from app.services.ats_scorer import ATSScorer
+from app.services.cv_document import CVDocument
+from app.services.llm_service import LLMService
+
+RAW_CV = {
+    "personal_info": {"email": "a@b.com"},
+    "skills": "Python, Postgres, React Native",
+    "experience": [{"position": "Engineer", "achievements": ["Cut latency by 40%", "Mentored juniors"]}, None],
+    "projects": [{"title": "ATS helper"}, "CLI tool"],
+}
+
+
+def test_document_normalizes_once_and_caches_views():
+    doc = CVDocument.from_structured(json.dumps(RAW_CV))
+    assert doc.skills == ["Python", "Postgres", "React Native"]
+    assert len(doc.experience) == 1
+    assert doc.skill_set == {"python", "postgres", "react native"}
+    assert doc.achievement_count == 1
+    assert doc.project_names == ["ATS helper", "CLI tool"]
+    assert "latency" in doc.token_set
+    assert doc.skill_matcher is doc.skill_matcher
+    assert CVDocument.from_structured(doc) is doc
+    assert not hasattr(doc, "__dict__")
+
+
+def test_scorer_gives_same_result_for_document_and_dict():
+    scorer = ATSScorer()
+    doc = CVDocument.from_structured(RAW_CV)
+    job = "Python engineer with PostgreSQL"
+    assert scorer.calculate_score(doc, job) == scorer.calculate_score(RAW_CV, job)
+    assert scorer.extract_cv_features(doc) == scorer.extract_cv_features(RAW_CV)
+
+
+def test_fallback_intelligence_reuses_document_instead_of_reparsing(monkeypatch):
+    llm = LLMService()
+    doc = CVDocument.from_structured(RAW_CV)
+
+    def fail(_text):
+        raise AssertionError("CV text should not be re-parsed")
+
+    monkeypatch.setattr(llm, "_parse_with_fallback", fail)
+    result = llm._build_fallback_ai_intelligence("raw text", "Need PostgreSQL and Docker", doc)
+    assert "Docker" in result["strategic_analysis"]["weaknesses"][0]
+    assert "PostgreSQL" not in result["strategic_analysis"]["weaknesses"][0]
+    matrix = llm.build_competency_matrix(doc, ["PostgreSQL"])
+    assert matrix[0]["matched_skill"] == "Postgres"
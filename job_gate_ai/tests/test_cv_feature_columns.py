@@ -0,0 +1,89 @@
+import sqlite3
+
+import numpy as np
+
+from app.services.cv_document import CVDocument
+from app.services.database_service import DatabaseService
+from app.services.text_embedding import get_text_embedder
+
+
+def _cv(email, skills, n_experience, certifications=()):
+    return {
+        "personal_info": {"email": email},
+        "skills": skills,
+        "certifications": list(certifications),
+        "experience": [
+            {"title": f"Role {i}", "achievements": [f"Cut costs by {10 + i}%"]} for i in range(n_experience)
+        ],
+        "projects": [{"title": "Portal"}],
+    }
+
+
+def test_save_materializes_columns_and_filters_in_sql(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'features.db'}")
+    rows = [
+        ("u1", _cv("a@x.io", ["Python", "AWS", "python"], 3, ["AWS SAA"]), 82.0),
+        ("u2", _cv("b@x.io", ["Python", "Docker"], 1), 75.0),
+        ("u3", _cv("c@x.io", ["JavaScript", "AWS"], 4, ["PMP"]), 64.0),
+    ]
+    for i, (user_id, cv, score) in enumerate(rows):
+        db.save_cv_analysis({
+            "user_id": user_id, "file_name": f"{user_id}.pdf", "file_hash": f"h{i}",
+            "structured_data": cv, "ats_score": score,
+        })
+
+    first = db.find_cv_analyses()["results"][0]
+    assert first["file_name"] == "u1.pdf"
+    assert first["total_years_experience"] == 4.5
+    assert first["achievement_count"] == 3
+    assert first["has_certifications"] is True
+    assert first["skills_count"] == 2
+
+    found = db.find_cv_analyses(min_years=3, has_certifications=True, min_ats=70)
+    assert [r["file_name"] for r in found["results"]] == ["u1.pdf"]
+    assert db.find_cv_analyses(skills=["python", "aws"])["total"] == 1
+    assert db.find_cv_analyses(skills=["python", "aws"], match_all_skills=False)["total"] == 3
+    assert db.find_cv_analyses(user_id="u2")["results"][0]["skills_count"] == 2
+
+    top = db.skill_frequencies(limit=2)
+    assert [(s["skill_key"], s["analyses"]) for s in top] == [("aws", 2), ("python", 2)]
+
+
+def test_migration_adds_columns_and_backfills_old_rows(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, user_id VARCHAR(255) NOT NULL UNIQUE, email VARCHAR(255),
+            created_at DATETIME, updated_at DATETIME);
+        CREATE TABLE cv_analyses (id INTEGER PRIMARY KEY, user_id INTEGER, file_name VARCHAR(255) NOT NULL,
+            file_hash VARCHAR(255), structured_data JSON NOT NULL, ats_score FLOAT, features JSON NOT NULL,
+            analysis_method VARCHAR(100), processing_time FLOAT, created_at DATETIME, file_path VARCHAR(512));
+        INSERT INTO users VALUES (1, 'legacy', NULL, NULL, NULL);
+    """)
+    conn.execute(
+        "INSERT INTO cv_analyses VALUES (7, 1, 'old.pdf', 'h', ?, 55.0, '{}', 'fallback', 0, '2024-01-01 00:00:00', NULL)",
+        ('{"skills": ["React", "Node.js"], "experience": [{"title": "Dev"}], "certifications": []}',),
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseService(f"sqlite:///{path}")
+    assert db.find_cv_analyses(min_skills=1)["total"] == 0
+    assert db.backfill_cv_feature_columns(batch_size=1) == 1
+    assert db.backfill_cv_feature_columns() == 0
+
+    features = db.get_cv_analysis_features(7)
+    assert features["skills_count"] == 2
+    assert features["has_certifications"] is False
+    assert sorted(features["skills"]) == ["Node.js", "React"]
+    assert db.find_cv_analyses(skills=["react"], min_years=1)["total"] == 1
+
+    stored = db.get_stored_analyses([7])[7]
+    expected = get_text_embedder().embed(CVDocument.from_structured(stored["structured_data"]).semantic_text)
+    assert stored["semantic_vector"].dtype == np.float32
+    assert np.array_equal(stored["semantic_vector"], expected)
+
+    conn = sqlite3.connect(path)
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list('cv_analyses')")}
+    conn.close()
+    assert "ix_cv_analyses_skills_count" in indexes
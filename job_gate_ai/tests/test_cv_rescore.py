@@ -0,0 +1,64 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import cv_analysis
+from app.services.ats_scorer import ATSScorer
+from app.services.database_service import DatabaseService
+
+JOB = "Backend engineer with Python, PostgreSQL, Docker and AWS experience"
+CVS = [
+    {"skills": ["Python", "PostgreSQL", "Docker"],
+     "experience": [{"title": "Backend Developer", "company": "Acme", "duration": "2019 - 2024",
+                     "description": "Built Python APIs on AWS, cut latency 40%"}]},
+    {"skills": ["Figma", "Sketch"], "experience": [{"title": "Designer", "duration": "2021 - 2023"}]},
+]
+
+
+def _client(tmp_path, monkeypatch):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'rescore.db'}")
+    monkeypatch.setattr(cv_analysis, "db_service", db)
+    ids = [
+        db.save_cv_analysis({
+            "user_id": f"u{i}", "file_name": f"cv{i}.pdf", "file_hash": f"h{i}",
+            "structured_data": cv, "ats_score": 10.0,
+        }).id
+        for i, cv in enumerate(CVS)
+    ]
+    app = FastAPI()
+    app.include_router(cv_analysis.router)
+    return TestClient(app), ids
+
+
+def test_single_rescore_matches_calculate_score(tmp_path, monkeypatch):
+    client, ids = _client(tmp_path, monkeypatch)
+    body = client.post(f"/cv/analyses/{ids[0]}/score", json={"job_description": JOB}).json()
+
+    expected = ATSScorer().calculate_score(CVS[0], JOB)
+    assert body["success"] is True
+    assert body["analysis_id"] == ids[0] and body["user_id"] == "u0"
+    assert body["stored_ats_score"] == 10.0
+    assert body["ats_score"] == expected["score"]
+    assert body["feedback"] == expected["feedback"]
+    assert {row["required_skill"] for row in body["competency_matrix"]} == set(body["required_skills"])
+
+
+def test_batch_rescore_reports_missing_ids(tmp_path, monkeypatch):
+    client, ids = _client(tmp_path, monkeypatch)
+    body = client.post("/cv/analyses/score", json={
+        "job_description": JOB, "analysis_ids": [ids[1], 9999, ids[0], ids[1]],
+    }).json()
+
+    assert [r["analysis_id"] for r in body["results"]] == [ids[1], ids[0]]
+    assert body["missing_ids"] == [9999]
+    scorer = ATSScorer()
+    assert [r["ats_score"] for r in body["results"]] == [
+        scorer.calculate_score(CVS[1], JOB)["score"], scorer.calculate_score(CVS[0], JOB)["score"],
+    ]
+    assert body["results"][1]["ats_score"] > body["results"][0]["ats_score"]
+
+
+def test_rescore_unknown_analysis_is_404(tmp_path, monkeypatch):
+    client, _ = _client(tmp_path, monkeypatch)
+    response = client.post("/cv/analyses/9999/score", json={"job_description": JOB})
+    assert response.status_code == 404
+    assert response.json() == {"success": False, "error": "CV analysis not found"}
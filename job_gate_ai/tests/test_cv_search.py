@@ -0,0 +1,51 @@
+from app.services.cv_search import CVSearchIndex, get_cv_search_index, search_tokens
+from app.services.database_service import DatabaseService
+
+
+def test_search_tokens_normalize_arabic():
+    assert search_tokens("مُطوِّر بالبايثون والذكاء الاصطناعي، React-Native") == [
+        "مطور", "بايثون", "ذكاء", "اصطناعي", "react", "native",
+    ]
+    assert search_tokens("إدارة المشاريع") == search_tokens("ادارة مشاريع")
+
+
+def test_bm25_search_paginates_and_filters_by_ats(tmp_path):
+    index = CVSearchIndex(str(tmp_path / "search.sqlite3"))
+    index.add_document(1, "React Native developer at a fintech startup in Riyadh", "u1", "a.pdf", 82)
+    index.add_document(2, "React developer, React Native, React hooks. Fintech payments. Riyadh", "u2", "b.pdf", 64)
+    index.add_document(3, "Backend Python engineer in Jeddah", "u3", "c.pdf", 90)
+    index.add_document(4, "مطور تطبيقات React Native في الرياض", "u4", "d.pdf", 71)
+
+    result = index.search("react native fintech riyadh")
+    assert result["total"] == 2
+    assert {r["analysis_id"] for r in result["results"]} == {1, 2}
+    assert result["results"][0]["relevance"] >= result["results"][1]["relevance"]
+
+    assert index.search("react native", min_ats=70, max_ats=85)["total"] == 2
+    page = index.search("react native", page=2, page_size=2)
+    assert page["total"] == 3 and len(page["results"]) == 1
+    assert index.search("الرياض")["results"][0]["analysis_id"] == 4
+    assert index.search("jeddah riyadh", match_all=False)["total"] == 3
+
+    index.add_document(3, "Frontend React Native engineer", "u3", "c.pdf", 90)
+    assert index.search("python")["total"] == 0
+    assert index.get_text(3) == "Frontend React Native engineer"
+    assert index.remove_document(3) and index.search("react native")["total"] == 3
+
+
+def test_database_save_and_startup_backfill_feed_search(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'search.db'}")
+    saved = db.save_cv_analysis({
+        "user_id": "u1",
+        "file_name": "cv.pdf",
+        "structured_data": {"skills": ["Python"]},
+        "ats_score": 75.0,
+        "features": {},
+        "extracted_text": "Senior data engineer based in Dubai",
+    })
+    assert get_cv_search_index().search("dubai")["results"][0]["analysis_id"] == saved.id
+
+    get_cv_search_index().remove_document(saved.id)
+    assert db.sync_cv_search_index() == 1
+    assert get_cv_search_index().search("python")["results"][0]["analysis_id"] == saved.id
+    assert db.sync_cv_search_index() == 0
@@ -0,0 +1,166 @@
+from app.services.fallback_cv_processor import FallbackCVProcessor as LegacyFallbackCVProcessor
+from app.services.fallback_service import FallbackCVProcessor
+
+
+LABELED_CV = """John Doe
+Email: john@example.com
+Phone: +1-555-123-4567
+
+Experience:
+- Software Engineer at Tech Corp (2020-2023)
+- Developed web applications using Python and React
+- Improved performance by 40%
+
+Skills: Python, JavaScript, React, SQL
+Education: BS Computer Science, University of Example (2016-2020)"""
+
+SECTIONED_CV = """Mohammed Zair
+Frontend Developer
+Riyadh, Saudi Arabia
+mohammed.zair@gmail.com | +966 55 123 4567
+
+SUMMARY
+Frontend developer with 3 years of experience building web apps.
+
+EXPERIENCE
+Frontend Developer at Talents Co
+2021 - Present
+• Built the seeker portal in React, cutting load time by 35%
+• Mentored 2 junior developers
+
+EDUCATION
+King Saud University
+Bachelor of Computer Science
+2016 - 2020
+
+SKILLS
+React
+TypeScript
+Tailwind
+Node.js
+
+PROJECTS
+• Talents Landing - Marketing site built with Vite
+Technologies: React, Tailwind
+
+LANGUAGES
+Arabic, English
+
+CERTIFICATIONS
+AWS Certified Cloud Practitioner"""
+
+ARABIC_CV = """الاسم: أحمد علي
+البريد: ahmed.ali@example.com
+الموقع: دمشق
+
+المهارات
+بايثون، جافاسكربت
+SQL
+
+الخبرة
+مطور برمجيات at شركة التقنية
+- طورت نظام إدارة بنسبة تحسين 20%
+
+التعليم
+جامعة دمشق
+بكالوريوس هندسة المعلوماتية
+
+اللغات
+العربية
+الإنجليزية"""
+
+
+def test_labeled_cv_golden_output():
+    assert FallbackCVProcessor.structure_cv_fallback(LABELED_CV) == {
+        "personal_info": {"full_name": "John Doe", "email": "john@example.com", "phone": "+15551234567", "location": ""},
+        "education": [
+            {"institution": "University of Example", "degree": "BS Computer Science", "duration": "2016-2020"}
+        ],
+        "experience": [
+            {
+                "position": "Software Engineer",
+                "company": "Tech Corp",
+                "duration": "2020-2023",
+                "description": "",
+                "achievements": ["Developed web applications using Python and React", "Improved performance by 40%"],
+            }
+        ],
+        "skills": ["Python", "JavaScript", "React", "SQL"],
+        "certifications": [],
+        "languages": [],
+        "projects": [],
+    }
+
+
+def test_sectioned_cv_golden_output():
+    assert FallbackCVProcessor.structure_cv_fallback(SECTIONED_CV) == {
+        "personal_info": {
+            "full_name": "Mohammed Zair",
+            "email": "mohammed.zair@gmail.com",
+            "phone": "+966551234567",
+            "location": "Riyadh, Saudi Arabia",
+        },
+        "education": [
+            {"institution": "King Saud University", "degree": "Bachelor of Computer Science", "duration": "2016 - 2020"}
+        ],
+        "experience": [
+            {
+                "position": "Frontend Developer",
+                "company": "Talents Co",
+                "duration": "2021 - Present",
+                "description": "",
+                "achievements": [
+                    "Built the seeker portal in React, cutting load time by 35%",
+                    "Mentored 2 junior developers",
+                ],
+            }
+        ],
+        "skills": ["React", "TypeScript", "Tailwind CSS", "Node.js"],
+        "certifications": ["AWS Certified Cloud Practitioner"],
+        "languages": ["Arabic", "English"],
+        "projects": [
+            {
+                "title": "Talents Landing",
+                "description": "Marketing site built with Vite",
+                "technologies": ["React", "Tailwind"],
+                "achievements": [],
+            }
+        ],
+    }
+
+
+def test_arabic_cv_golden_output():
+    assert FallbackCVProcessor.structure_cv_fallback(ARABIC_CV) == {
+        "personal_info": {"full_name": "أحمد علي", "email": "ahmed.ali@example.com", "phone": "", "location": "دمشق"},
+        "education": [{"institution": "جامعة دمشق", "degree": "بكالوريوس هندسة المعلوماتية", "duration": ""}],
+        "experience": [
+            {
+                "position": "مطور برمجيات",
+                "company": "شركة التقنية",
+                "duration": "",
+                "description": "",
+                "achievements": ["طورت نظام إدارة بنسبة تحسين 20%"],
+            }
+        ],
+        "skills": ["Python", "JavaScript", "SQL"],
+        "certifications": [],
+        "languages": ["العربية", "الإنجليزية"],
+        "projects": [],
+    }
+
+
+def test_year_ranges_are_not_taken_as_phone_numbers():
+    result = FallbackCVProcessor.structure_cv_fallback("Experience\nDeveloper at Acme\n2016 - 2020")
+    assert result["personal_info"]["phone"] == ""
+    assert result["experience"][0]["duration"] == "2016 - 2020"
+
+
+def test_empty_text_returns_empty_schema():
+    result = FallbackCVProcessor.structure_cv_fallback("")
+    assert set(result) == {"personal_info", "education", "experience", "skills", "certifications", "languages", "projects"}
+    assert all(not result[key] for key in result if key != "personal_info")
+
+
+def test_legacy_entry_points_share_the_parser():
+    assert LegacyFallbackCVProcessor is FallbackCVProcessor
+    assert FallbackCVProcessor.parse_simple_cv(SECTIONED_CV) == FallbackCVProcessor.structure_cv_fallback(SECTIONED_CV)
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+
+from app.services import job_analytics
+from app.services.database_service import DatabaseService
+
+
+def _matrix(missing):
+    return [
+        {"required_skill": skill, "candidate_proficiency": 0 if skill in missing else 80, "is_missing": skill in missing}
+        for skill in ("Python", "AWS", "Kafka")
+    ]
+
+
+def test_streaming_aggregate_matches_batch_statistics():
+    rng = random.Random(5)
+    scores = [rng.uniform(0, 100) for _ in range(2000)]
+    aggregate = job_analytics.empty_aggregate()
+    for score in scores:
+        job_analytics.apply_result(aggregate, score, _matrix({"Kafka"}))
+    job_analytics.apply_result(aggregate, 42.0, _matrix({"AWS"}))
+    job_analytics.apply_result(aggregate, 42.0, _matrix({"AWS"}), sign=-1)
+
+    summary = job_analytics.summarize(aggregate)
+    assert summary["applicants"] == 2000
+    assert summary["mean"] == round(float(np.mean(scores)), 2)
+    assert abs(summary["stddev"] - float(np.std(scores))) < 0.01
+    for q in job_analytics.PERCENTILES:
+        assert abs(summary["percentiles"][f"p{q}"] - float(np.percentile(scores, q))) < 1.0
+    assert sum(bucket["count"] for bucket in summary["histogram"]) == 2000
+    assert summary["top_missing_skills"] == [{"skill": "Kafka", "applicants": 2000}]
+    assert {row["skill"]: row["missing_rate"] for row in summary["competency_heatmap"]} == {
+        "AWS": 0.0, "Kafka": 1.0, "Python": 0.0,
+    }
+
+
+def test_recorded_results_replace_per_analysis_and_rebuild(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'analytics.db'}")
+    ids = []
+    for i, score in enumerate((55.0, 70.0, 90.0)):
+        analysis = db.save_cv_analysis({
+            "user_id": f"u{i}", "file_name": "cv.pdf", "file_hash": f"h{i}", "structured_data": {},
+            "ats_score": score, "job_id": "job-1", "competency_matrix": _matrix({"AWS"} if i else set()),
+        })
+        ids.append(analysis.id)
+
+    # Re-scoring the same CV for the same job replaces its contribution.
+    db.record_job_analysis("job-1", ids[0], 65.0, _matrix({"Kafka"}))
+    summary = db.get_job_analytics("job-1")
+    assert summary["applicants"] == 3
+    assert summary["mean"] == 75.0
+    assert summary["top_missing_skills"] == [
+        {"skill": "AWS", "applicants": 2}, {"skill": "Kafka", "applicants": 1},
+    ]
+    assert db.get_job_analytics("other") is None
+
+    assert db.rebuild_job_analytics() == 1
+    rebuilt = db.get_job_analytics("job-1")
+    rebuilt.pop("updated_at"), summary.pop("updated_at")
+    assert rebuilt == summary
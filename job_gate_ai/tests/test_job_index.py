@@ -0,0 +1,58 @@
+from app.services.database_service import DatabaseService
+from app.services.job_index import JobIndex, get_job_index
+
+JOBS = [
+    {"job_id": "1", "title": "Backend", "description": "Python developer with AWS and Docker",
+     "required_skills": ["Python", "AWS", "Docker"]},
+    {"job_id": "2", "title": "Frontend", "description": "React and TypeScript engineer",
+     "required_skills": ["React", "TypeScript"]},
+    {"job_id": "3", "title": "Data", "description": "Python data engineer, Spark and SQL",
+     "required_skills": ["Python", "Spark", "SQL"]},
+]
+CV = {"skills": ["python", "Docker", "aws", "sql"], "experience": [{"title": "Python backend developer on AWS"}]}
+
+
+def test_recommend_ranks_jobs_with_matched_and_missing_skills():
+    index = JobIndex()
+    index.build(JOBS)
+
+    result = index.recommend(CV, limit=2)
+    assert result["total_jobs"] == 3
+    first, second = result["results"]
+    assert (first["job_id"], first["skill_coverage"]) == ("1", 1.0)
+    assert first["missing_skills"] == []
+    assert second["job_id"] == "3"
+    assert second["matched_skills"] == ["Python", "SQL"]
+    assert second["missing_skills"] == ["Spark"]
+
+    assert index.recommend(CV, min_skill_overlap=1)["total_jobs"] == 2
+
+    index.upsert_jobs([{**JOBS[1], "required_skills": ["React", "AWS"]}])
+    index.remove_job("1")
+    ids = [r["job_id"] for r in index.recommend(CV, limit=5)["results"]]
+    assert ids[0] == "3" and "1" not in ids and len(ids) == 2
+
+
+def test_postings_persist_and_reload(tmp_path):
+    get_job_index.cache_clear()
+    db = DatabaseService(f"sqlite:///{tmp_path / 'jobs.db'}")
+    db.upsert_job_postings(JOBS)
+    assert db.close_job_posting("2")
+    assert not db.close_job_posting("missing")
+
+    get_job_index.cache_clear()
+    assert db.load_job_index() == 2
+    assert [r["job_id"] for r in get_job_index().recommend(CV)["results"]] == ["1", "3"]
+    get_job_index.cache_clear()
+
+
+def test_removed_slots_are_reused():
+    index = JobIndex()
+    index.build(JOBS)
+    for n in range(5):
+        index.remove_job("3")
+        index.upsert_jobs([{**JOBS[2], "job_id": f"3-{n}"}])
+        assert {r["job_id"] for r in index.recommend(CV, limit=5)["results"]} == {"1", "2", f"3-{n}"}
+        index.remove_job(f"3-{n}")
+        index.upsert_jobs([JOBS[2]])
+    assert len(index) == 3 and len(index._records) == 3
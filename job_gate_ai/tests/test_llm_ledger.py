@@ -0,0 +1,83 @@
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_ledger import (
+    LLMBudgetExceeded,
+    MeteredOpenAI,
+    get_llm_ledger,
+    key_id_for,
+    llm_budget_exhausted,
+    set_llm_caller,
+)
+
+
+class _FakeCompletions:
+    def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return iter([
+                SimpleNamespace(usage=None),
+                SimpleNamespace(usage=SimpleNamespace(prompt_tokens=5000, completion_tokens=500)),
+            ])
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=200, cost=0.004))
+
+
+def _client():
+    return MeteredOpenAI(SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions()), api_key="x"))
+
+
+def parse_cv(client):
+    return client.chat.completions.create(model="deepseek/deepseek-chat", messages=[])
+
+
+def _in_request(fn):
+    return contextvars.copy_context().run(fn)
+
+
+def test_calls_are_tagged_and_aggregated():
+    client = _client()
+
+    def request():
+        set_llm_caller(user_id=7, api_key="key-a")
+        parse_cv(client)
+        list(client.chat.completions.create(model="gpt-4o-mini", messages=[], stream=True))
+
+    _in_request(request)
+    assert client.api_key == "x"
+
+    rows = get_llm_ledger().aggregate(["call_site", "model", "user_id", "key_id"])
+    by_model = {row["model"]: row for row in rows}
+    assert by_model["deepseek/deepseek-chat"]["call_site"] == "test_llm_ledger.parse_cv"
+    assert by_model["deepseek/deepseek-chat"]["cost_usd"] == 0.004
+    assert by_model["deepseek/deepseek-chat"]["user_id"] == "7"
+    assert by_model["deepseek/deepseek-chat"]["key_id"] == key_id_for("key-a")
+    # Streams are metered from the final usage chunk and priced from the table.
+    assert by_model["gpt-4o-mini"]["prompt_tokens"] == 5000
+    assert by_model["gpt-4o-mini"]["cost_usd"] == pytest.approx((5000 * 0.15 + 500 * 0.60) / 1e6)
+
+
+def test_daily_budget_blocks_further_calls(monkeypatch):
+    monkeypatch.setenv("LLM_DAILY_BUDGETS_USD", "key-a=0.005")
+    get_llm_ledger.cache_clear()
+    client = _client()
+
+    def request():
+        set_llm_caller(api_key="key-a")
+        parse_cv(client)
+        assert not llm_budget_exhausted()
+        parse_cv(client)
+        assert llm_budget_exhausted()
+        with pytest.raises(LLMBudgetExceeded):
+            parse_cv(client)
+
+    _in_request(request)
+    ledger = get_llm_ledger()
+    assert ledger.flush() == 3
+    assert ledger.budget_status(key_id_for("key-a"))["remaining_usd"] == 0.0
+    assert {row["status"]: row["calls"] for row in ledger.aggregate(["status"])} == {"ok": 2, "budget_exceeded": 1}
+
+    # A fresh process seeds today's spend from the file; other keys are unaffected.
+    get_llm_ledger.cache_clear()
+    assert get_llm_ledger().budget_exhausted(key_id_for("key-a"))
+    assert not get_llm_ledger().budget_exhausted(key_id_for("key-b"))
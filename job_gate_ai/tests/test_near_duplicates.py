@@ -0,0 +1,101 @@
+import random
+
+from app.services.database_service import DatabaseService
+from app.services.near_duplicates import (
+    NearDuplicateIndex,
+    estimated_jaccard,
+    get_near_duplicate_index,
+    minhash_signature,
+    shingle_hashes,
+    signature_from_bytes,
+    signature_to_bytes,
+)
+
+WORDS = [f"term{i}" for i in range(3000)]
+
+
+def _edit(text, rng, count):
+    tokens = text.split()
+    for position in rng.sample(range(len(tokens)), count):
+        tokens[position] = f"edit{position}"
+    return " ".join(tokens)
+
+
+def test_minhash_estimates_shingle_jaccard():
+    rng = random.Random(7)
+    errors = []
+    for _ in range(60):
+        original = " ".join(rng.choices(WORDS, k=300))
+        edited = _edit(original, rng, rng.randint(0, 60))
+        a, b = set(shingle_hashes(original).tolist()), set(shingle_hashes(edited).tolist())
+        true_jaccard = len(a & b) / len(a | b)
+        errors.append(abs(estimated_jaccard(minhash_signature(original), minhash_signature(edited)) - true_jaccard))
+    assert sum(errors) / len(errors) < 0.06
+
+    signature = minhash_signature(original)
+    assert (signature_from_bytes(signature_to_bytes(signature)) == signature).all()
+    assert len(signature_to_bytes(signature)) == 512
+
+
+def test_lsh_finds_edited_copy_and_ignores_unrelated_cvs():
+    rng = random.Random(3)
+    corpus = [" ".join(rng.choices(WORDS, k=300)) for _ in range(500)]
+    index = NearDuplicateIndex()
+    for i, text in enumerate(corpus):
+        index.add(i, minhash_signature(text), user_id=f"u{i}")
+
+    match = index.nearest(minhash_signature(_edit(corpus[42], rng, 5)))
+    assert match["analysis_id"] == 42 and match["user_id"] == "u42"
+    assert match["similarity"] >= 0.8
+    assert match["candidates_compared"] < 5
+    assert index.nearest(minhash_signature(" ".join(rng.choices(WORDS, k=300)))) is None
+
+    index.remove(42)
+    assert index.nearest(minhash_signature(corpus[42])) is None
+
+
+def test_startup_load_computes_missing_signatures(tmp_path):
+    get_near_duplicate_index.cache_clear()
+    db = DatabaseService(f"sqlite:///{tmp_path / 'dupes.db'}")
+    text = " ".join(random.Random(1).choices(WORDS, k=200))
+    db.save_cv_analysis({
+        "user_id": "u1", "file_name": "a.txt", "file_hash": "h1",
+        "structured_data": {"skills": ["Python"]}, "extracted_text": text,
+    })
+    db.save_cv_analysis({
+        "user_id": "u2", "file_name": "b.txt", "file_hash": "h2", "structured_data": {"skills": ["Go"]},
+        "extracted_text": text, "text_signature": signature_to_bytes(minhash_signature(text)),
+        "near_duplicate_of": 1,
+    })
+    assert len(get_near_duplicate_index()) == 1
+
+    get_near_duplicate_index.cache_clear()
+    assert db.load_near_duplicate_index() == 2
+    assert get_near_duplicate_index().nearest(minhash_signature(text))["similarity"] == 1.0
+    assert db.find_cv_analyses(user_id="u2")["results"][0]["near_duplicate_of"] == 1
+    get_near_duplicate_index.cache_clear()
+
+
+def test_warm_start_reuses_only_own_analyses_and_never_prior_contacts(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.api.endpoints import cv_analysis
+
+    prior = {
+        "personal_info": {"full_name": "Alice", "email": "alice@x.io", "phone": "+1 555 0100", "location": "Paris"},
+        "skills": ["Python", "SQL"],
+    }
+    text = " ".join(WORDS[:300])
+    match = {"analysis_id": 7, "user_id": "alice", "similarity": 0.99, "candidates_compared": 1}
+    monkeypatch.setattr(cv_analysis, "get_near_duplicate_index", lambda: SimpleNamespace(nearest=lambda sig: match))
+    monkeypatch.setattr(cv_analysis, "db_service", SimpleNamespace(get_stored_analyses=lambda ids: {
+        7: {"analysis_id": 7, "user_id": "alice", "structured_data": prior},
+    }))
+
+    assert cv_analysis._check_near_duplicate(text, True, "mallory")[2] is None
+    warm_start = cv_analysis._check_near_duplicate(text, True, "alice")[2]
+    assert warm_start == prior
+
+    data = cv_analysis._warm_start_parse(warm_start, "Experience\nBuilt data pipelines in Python and SQL.")
+    assert data["skills"] == ["Python", "SQL"]
+    assert not any(data["personal_info"].get(field) for field in ("full_name", "email", "phone", "location"))
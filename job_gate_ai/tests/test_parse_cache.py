@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from app.services.database_service import DatabaseService
+
+
+def test_parse_cache_counts_reuse_and_respects_ai_and_ttl(tmp_path):
+    db = DatabaseService(f"sqlite:///{tmp_path / 'cache.db'}")
+    structured = {"personal_info": {"email": "a@x.io"}, "skills": ["Python"]}
+
+    assert db.get_cached_parse("abc") is None
+    assert db.store_cached_parse("abc", "raw text", structured, "fallback", 1.5)
+
+    hit = db.get_cached_parse("abc")
+    assert hit["extracted_text"] == "raw text"
+    assert hit["structured_data"] == structured
+    assert hit["reuse_count"] == 1
+    assert db.get_cached_parse("abc")["reuse_count"] == 2
+    # A fallback parse is not good enough for a request that can use the LLM.
+    assert db.get_cached_parse("abc", require_ai=True) is None
+
+    db.store_cached_parse("abc", "raw text", structured, "ai", 3.0)
+    refreshed = db.get_cached_parse("abc", require_ai=True)
+    assert refreshed["analysis_method"] == "ai"
+    assert refreshed["reuse_count"] == 1
+
+    stats = db.parse_cache_stats()
+    assert stats["entries"] == 1 and stats["total_reuses"] == 1
+
+    db.parse_cache_ttl = timedelta(seconds=-1)
+    assert db.get_cached_parse("abc") is None
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.services.session_cache import WriteBackCache
+
+
+def _cache(store, saved, **kwargs):
+    def loader(key):
+        store["loads"] += 1
+        return {"key": key, "turns": 0} if key != "missing" else None
+
+    return WriteBackCache(loader, lambda value: saved.append(dict(value)), **kwargs)
+
+
+def test_hot_sessions_skip_the_loader_and_writes_are_coalesced():
+    store, saved = {"loads": 0}, []
+    cache = _cache(store, saved)
+
+    async def scenario():
+        for _ in range(3):
+            async with cache.lock("a"):
+                session = await cache.get("a")
+                session["turns"] += 1
+                await cache.mark_dirty("a", session)
+        assert await cache.get("missing") is None
+        assert saved == []
+        assert await cache.flush() == 1
+        assert await cache.flush() == 0
+
+    asyncio.run(scenario())
+    assert store["loads"] == 2
+    assert saved == [{"key": "a", "turns": 3}]
+    assert cache.stats() == {"entries": 1, "dirty": 0, "pinned": 0, "hits": 2, "misses": 2}
+
+
+def test_eviction_keeps_dirty_entries_and_close_flushes_them():
+    store, saved = {"loads": 0}, []
+    cache = _cache(store, saved, max_entries=2, ttl_seconds=60)
+
+    async def scenario():
+        first = await cache.get("a")
+        await cache.mark_dirty("a", first)
+        await cache.get("b")
+        await cache.get("c")
+        assert len(cache) == 2 and "a" in cache._entries and "b" not in cache._entries
+
+        cache.ttl_seconds = -1
+        cache.pin("c")
+        cache._evict()
+        assert list(cache._entries) == ["a", "c"]
+        cache.unpin("c")
+        cache._evict()
+        assert list(cache._entries) == ["a"]
+        await cache.close()
+
+    asyncio.run(scenario())
+    assert saved == [{"key": "a", "turns": 0}]
+
+
+def test_disabled_cache_writes_through():
+    store, saved = {"loads": 0}, []
+    cache = _cache(store, saved, max_entries=0)
+
+    async def scenario():
+        session = await cache.get("a")
+        await cache.mark_dirty("a", session)
+        await cache.get("a")
+
+    asyncio.run(scenario())
+    assert store["loads"] == 2 and len(saved) == 1 and len(cache) == 0
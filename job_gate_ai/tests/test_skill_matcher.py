@@ -0,0 +1,26 @@
+from app.services.llm_service import LLMService
+from app.services.skill_matcher import SkillMatcher
+
+
+def test_matcher_avoids_substring_false_positives():
+    matcher = SkillMatcher(["Build automation", "Guitar"])
+    assert matcher.best_match("UI") == (None, 0.0)
+
+
+def test_matcher_catches_aliases_and_near_misses():
+    matcher = SkillMatcher(["PostgreSQL", "Tensorflow 2", "Kubernetes"])
+    assert matcher.best_match("Postgres") == ("PostgreSQL", 1.0)
+    skill, similarity = matcher.best_match("TensorFlow")
+    assert skill == "Tensorflow 2"
+    assert 0.45 <= similarity < 1.0
+
+
+def test_competency_matrix_grades_proficiency():
+    matrix = LLMService().build_competency_matrix(["PostgreSQL", "React Native"], ["Postgres", "React", "Docker"])
+    by_skill = {row["required_skill"]: row for row in matrix}
+    assert by_skill["Postgres"]["candidate_proficiency"] == 100
+    assert not by_skill["Postgres"]["is_missing"]
+    assert 60 < by_skill["React"]["candidate_proficiency"] < 100
+    assert by_skill["React"]["matched_skill"] == "React Native"
+    assert by_skill["Docker"]["is_missing"]
+    assert by_skill["Docker"]["candidate_proficiency"] < 60
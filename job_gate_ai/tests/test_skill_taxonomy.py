@@ -0,0 +1,61 @@
+from app.services.ats_scorer import ATSScorer
+from app.services.llm_service import LLMService
+from app.services.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy
+
+
+def test_extract_respects_word_boundaries_and_prefers_longest_match():
+    taxonomy = get_skill_taxonomy()
+    found = taxonomy.extract("React Native and Node.js devs; Java but not build tooling. Go to market fast.")
+    assert found == ["React Native", "Node.js", "Java"]
+
+
+def test_extract_matches_aliases_and_arabic_names():
+    taxonomy = get_skill_taxonomy()
+    assert taxonomy.extract("Postgres, K8s and sklearn") == ["PostgreSQL", "Kubernetes", "scikit-learn"]
+    assert taxonomy.extract("نبحث عن مطور بايثون يتمتع بمهارات التواصل والقيادة") == [
+        "Python",
+        "Communication",
+        "Leadership",
+    ]
+
+
+def test_normalize_maps_aliases_to_canonical_names():
+    taxonomy = get_skill_taxonomy()
+    assert taxonomy.normalize("ract native") == "React Native"
+    assert taxonomy.normalize("Golang") == "Go"
+    assert taxonomy.normalize("  Some In-House Tool ") == "Some In-House Tool"
+    assert taxonomy.category("postgres") == "database"
+
+
+def test_ambiguous_names_are_not_extracted_from_free_text():
+    taxonomy = SkillTaxonomy([{"name": "Go", "ambiguous": True, "aliases": ["golang"]}])
+    assert taxonomy.extract("ready to go") == []
+    assert taxonomy.extract("golang services") == ["Go"]
+    assert "go" in taxonomy
+
+
+def test_ambiguous_arabic_forms_are_not_extracted_from_free_text():
+    taxonomy = get_skill_taxonomy()
+    assert taxonomy.extract("نوفر جو عمل مريح وفريق متعاون") == []
+    assert taxonomy.normalize("جو") == "Go"
+
+
+def test_everyday_words_in_prose_are_not_skills():
+    taxonomy = get_skill_taxonomy()
+    for prose in (
+        "swift delivery, rust removal, spring season",
+        "each node of the cluster",
+        "Ruby Hotel, Dart board, expo 2020",
+        "excel under pressure, a flask of tea, bootstrap the assembly line, spark ideas",
+    ):
+        assert taxonomy.extract(prose) == [], prose
+    assert taxonomy.extract("node.js, Ruby on Rails and Spring Boot") == ["Node.js", "Ruby on Rails", "Spring Boot"]
+    assert [taxonomy.normalize(s) for s in ("node", "excel", "Swift")] == ["Node.js", "Microsoft Excel", "Swift"]
+
+
+def test_call_sites_share_the_taxonomy():
+    required = LLMService().extract_required_skills("Looking for a ReactJS engineer with Postgres and UI skills")
+    assert required == ["PostgreSQL", "React", "UI Design"]
+
+    result = ATSScorer().calculate_score({"skills": ["reactjs", "PostgreSQL", "Excel"]}, "React and postgres")
+    assert result["features"]["keyword_matches"] == ["reactjs", "PostgreSQL"]
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from app.services.ats_scorer import ATSScorer
+from app.services.text_embedding import (
+    HashedNgramEmbedder, cosine_scores, cosine_similarity, top_k, vector_from_bytes, vector_to_bytes
+)
+
+
+def test_embedding_is_unit_float32_and_stable_across_processes():
+    vec = HashedNgramEmbedder().embed("Senior Python developer, FastAPI and PostgreSQL")
+    assert vec.dtype == np.float32
+    assert abs(float(np.linalg.norm(vec)) - 1.0) < 1e-5
+    assert not HashedNgramEmbedder().embed("").any()
+
+    code = (
+        "from app.services.text_embedding import HashedNgramEmbedder;"
+        "v = HashedNgramEmbedder().embed('Senior Python developer, FastAPI and PostgreSQL');"
+        "print(repr(float(v.sum())))"
+    )
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                       env={"PYTHONHASHSEED": seed, "PATH": ""}).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert outputs == {repr(float(vec.sum()))}
+
+
+def test_related_texts_score_higher_and_rank_first():
+    embedder = HashedNgramEmbedder()
+    job = embedder.embed("Backend engineer: Python, Django REST APIs, PostgreSQL, Docker")
+    cvs = np.stack([
+        embedder.embed("Graphic designer skilled in Photoshop, Illustrator and branding"),
+        embedder.embed("Built Django REST APIs in Python backed by PostgreSQL, shipped with Docker"),
+        embedder.embed("مطور واجهات خلفية بايثون"),
+    ])
+    scores = cosine_scores(cvs, job)
+    assert scores[1] > 0.3 > scores[0]
+    assert list(top_k(scores, 2))[0] == 1
+    assert cosine_similarity(embedder.embed("إدارة المشاريع"), embedder.embed("ادارة المشاريع")) > 0.999
+
+
+def test_calculate_score_exposes_semantic_match_score_without_changing_score():
+    scorer = ATSScorer()
+    cv = {
+        "personal_info": {"email": "a@b.com"},
+        "skills": ["Python", "Django"],
+        "experience": [{"position": "Backend Developer", "description": "REST APIs on PostgreSQL"}],
+    }
+    plain = scorer.calculate_score(cv)
+    with_job = scorer.calculate_score(cv, "Backend developer with Python, Django and PostgreSQL")
+    assert "semantic_match_score" not in plain["features"]
+    assert 0.0 < with_job["features"]["semantic_match_score"] <= 1.0
+    unrelated = scorer.calculate_score(cv, "Registered nurse for the intensive care unit")
+    assert unrelated["features"]["semantic_match_score"] < with_job["features"]["semantic_match_score"]
+    assert with_job["score"] - plain["score"] == len(with_job["features"]["keyword_matches"]) * 2
+
+
+def test_calculate_scores_uses_stored_vectors_and_embeds_the_rest():
+    scorer = ATSScorer()
+    cvs = [{"skills": ["Python", "Django"]}, {"skills": ["Photoshop"]}]
+    job = "Backend developer with Python and Django"
+    fresh = scorer.calculate_scores(cvs, job)
+    stored = vector_from_bytes(vector_to_bytes(HashedNgramEmbedder().embed("Python Django")))
+    assert vector_from_bytes(vector_to_bytes(stored)[:-4]) is None
+
+    reused = scorer.calculate_scores(cvs, job, cv_vectors=[None, stored])
+    assert reused[0] == fresh[0]
+    assert reused[1]["features"]["semantic_match_score"] > fresh[1]["features"]["semantic_match_score"]
@@ -0,0 +1,62 @@
+import json
+from types import SimpleNamespace
+
+from app.api.endpoints import chatbot
+from app.services.llm_service import LLMService
+from app.services.translation_memory import TranslationMemory, chunk_segments, get_translation_memory
+
+
+def _translating_llm():
+    calls = []
+
+    def create(**kwargs):
+        numbered = json.loads(kwargs["messages"][-1]["content"].strip().splitlines()[-1])
+        calls.append(list(numbered.values()))
+        content = json.dumps({key: f"ع[{value}]" for key, value in numbered.items()}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    llm = LLMService()
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return llm, calls
+
+
+def test_chunks_stay_under_the_token_budget():
+    segments = ["x" * 400, "y" * 400, "z" * 2000, "w" * 40]
+    assert [len(chunk) for chunk in chunk_segments(segments, token_budget=150)] == [1, 1, 1, 1]
+    assert [len(chunk) for chunk in chunk_segments(segments, token_budget=200)] == [2, 1, 1]
+
+
+def test_repeated_exports_only_translate_changed_lines():
+    llm, calls = _translating_llm()
+    cv_data = {
+        "summary": "Backend engineer.",
+        "experience": [{"position": "Engineer", "duration": "2020 - 2023",
+                        "description": "Built APIs.\n- Cut latency 40%"}],
+        "skills": ["Python", "SQL"],
+        "personal_info": {"full_name": "Sara Ahmed"},
+    }
+
+    translated = chatbot._translate_cv_payload(llm, json.loads(json.dumps(cv_data)), "arabic")
+    assert translated["experience"][0] == {
+        "position": "ع[Engineer]", "duration": "2020 - 2023",
+        "description": "ع[Built APIs.]\nع[- Cut latency 40%]",
+    }
+    assert translated["personal_info"] == {"full_name": "Sara Ahmed"}
+    assert sorted(sum(calls, [])) == sorted(
+        ["Backend engineer.", "Engineer", "Built APIs.", "- Cut latency 40%", "Python", "SQL"]
+    )
+
+    calls.clear()
+    assert chatbot._translate_cv_payload(llm, json.loads(json.dumps(cv_data)), "arabic") == translated
+    assert calls == []
+
+    cv_data["experience"][0]["description"] = "Built APIs.\n- Cut latency 60%"
+    chatbot._translate_cv_payload(llm, json.loads(json.dumps(cv_data)), "arabic")
+    assert calls == [["- Cut latency 60%"]]
+
+    # The reverse pair was stored too, and the memory outlives the process.
+    calls.clear()
+    assert llm.translate_text("ع[Engineer]\n\nع[Python]", "english") == "Engineer\n\nPython"
+    assert calls == []
+    memory = TranslationMemory(get_translation_memory().path)
+    assert memory.lookup(["Backend engineer."], "arabic") == {"Backend engineer.": "ع[Backend engineer.]"}